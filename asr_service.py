@@ -0,0 +1,272 @@
+# asr_service.py
+"""
+Whisper transcription across a pool of worker processes.
+Each worker is its own Python process (python asr_service.py --worker ...)
+holding its own WhisperModel with cpu_threads sized so the pool fills the
+CPU, so concurrent transcriptions run side by side instead of contending
+for one model. Jobs wait in a single queue; one dispatcher thread per
+worker feeds its process over a socketpair connection.
+
+Workers are started as plain scripts rather than multiprocessing children:
+spawning would re-import the API module (GPIO, Flask, models) in each one.
+There is one pool per machine, started on its first job, so cpu_threads is
+sized from every core: roverseer_api.py runs it in the standalone process or
+the hardware owner, and http workers send their audio there.
+"""
+
+import os
+import sys
+import time
+import queue
+import socket
+import threading
+import subprocess
+import numpy as np
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+
+ASR_WORKERS = int(os.environ.get("ROVERSEER_ASR_WORKERS", "2"))  # 0 = transcribe in the API process
+ASR_CPU_THREADS = int(os.environ.get("ROVERSEER_ASR_CPU_THREADS", "0")) or max(1, (os.cpu_count() or 4) // max(1, ASR_WORKERS))
+ASR_START_TIMEOUT = 180.0       # Loading a model on a Pi is slow
+ASR_JOB_TIMEOUT = float(os.environ.get("ROVERSEER_ASR_JOB_TIMEOUT_S", "120"))  # Plus the audio's own length
+ASR_RESTART_DELAY = 2.0
+ASR_MAX_LAUNCH_FAILURES = 3     # Consecutive failed starts before a worker gives up
+
+
+class ASRUnavailable(Exception):
+    """No worker process can take the job"""
+
+
+def worker_main(fd, model_size, compute_type, cpu_threads):
+    """Worker process: load a model, then answer (audio, options) jobs until the pipe closes"""
+    conn = Connection(fd)
+    try:
+        from faster_whisper import WhisperModel
+        model = WhisperModel(model_size, compute_type=compute_type, cpu_threads=cpu_threads)
+    except Exception as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        audio, options = job
+        try:
+            segments, info = model.transcribe(audio, **options)
+            conn.send(("ok", " ".join(segment.text for segment in segments)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class ASRWorker:
+    """Parent-side state for one worker process"""
+
+    def __init__(self, worker_id):
+        self.id = worker_id
+        self.process = None
+        self.conn = None
+        self.state = "starting"  # starting, idle, busy, failed
+        self.ready_at = None
+        self.busy_since = None
+        self.busy_seconds = 0.0
+        self.jobs = 0
+        self.errors = 0
+        self.restarts = 0
+        self.launch_failures = 0
+
+    def stats(self):
+        now = time.time()
+        busy = self.busy_seconds + (now - self.busy_since if self.busy_since else 0.0)
+        uptime = now - self.ready_at if self.ready_at else 0.0
+        return {
+            "id": self.id,
+            "pid": self.process.pid if self.process else None,
+            "state": self.state,
+            "jobs": self.jobs,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "busy_seconds": round(busy, 2),  # Since the process last (re)started, like utilization
+            "utilization": round(busy / uptime, 3) if uptime > 0 else 0.0
+        }
+
+
+class ASRWorkerPool:
+    """
+    Queue of transcription jobs in front of ASR_WORKERS processes.
+    transcribe() blocks the caller until a worker has the text; a worker that
+    crashes, or takes longer than job_timeout(), fails its job and is restarted.
+    """
+
+    def __init__(self, workers=ASR_WORKERS, model_size="base", compute_type="int8", cpu_threads=ASR_CPU_THREADS):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.workers = [ASRWorker(worker_id) for worker_id in range(workers)]
+        self.jobs = queue.Queue()
+        self.running = False
+        self.stopped = False
+        self.start_lock = threading.Lock()
+        self.submitted = 0
+
+    def start(self):
+        """Launch the workers; submit() calls this, so nothing loads until there is audio"""
+        with self.start_lock:
+            if self.running or self.stopped:
+                return
+            self.running = True
+        for worker in self.workers:
+            threading.Thread(target=self.dispatch, args=(worker,), daemon=True).start()
+        print(f"ASR pool: {len(self.workers)} Whisper workers x {self.cpu_threads} threads")
+
+    def stop(self):
+        self.stopped = True
+        self.running = False
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            if worker.process and worker.process.poll() is None:
+                worker.process.terminate()
+
+    @property
+    def available(self):
+        return not self.stopped and any(worker.state != "failed" for worker in self.workers)
+
+    def launch(self, worker):
+        """Start the worker process and wait for its model to load"""
+        parent_sock, child_sock = socket.socketpair()
+        worker.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(child_sock.fileno()),
+             self.model_size, self.compute_type, str(self.cpu_threads)],
+            pass_fds=(child_sock.fileno(),)
+        )
+        child_sock.close()
+        worker.conn = Connection(parent_sock.detach())
+        worker.state = "starting"
+
+        try:
+            if not worker.conn.poll(ASR_START_TIMEOUT):
+                raise RuntimeError(f"no response within {ASR_START_TIMEOUT:.0f}s")
+            status, detail = worker.conn.recv()
+            if status != "ready":
+                raise RuntimeError(detail)
+        except (RuntimeError, EOFError, OSError) as e:
+            print(f"ASR worker {worker.id} failed to start: {e}")
+            self.discard(worker)
+            worker.launch_failures += 1
+            if worker.launch_failures >= ASR_MAX_LAUNCH_FAILURES:
+                worker.state = "failed"
+            return False
+
+        worker.launch_failures = 0
+        worker.ready_at = time.time()
+        worker.busy_seconds = 0.0
+        worker.state = "idle"
+        return True
+
+    def job_timeout(self, audio):
+        """How long a worker may take before it is presumed hung"""
+        if isinstance(audio, np.ndarray):
+            return ASR_JOB_TIMEOUT + len(audio) / 16000  # Whisper takes 16 kHz samples
+        return ASR_JOB_TIMEOUT
+
+    def discard(self, worker):
+        if worker.conn:
+            worker.conn.close()
+            worker.conn = None
+        if worker.process and worker.process.poll() is None:
+            worker.process.kill()
+        if worker.process:
+            worker.process.wait()
+
+    def dispatch(self, worker):
+        while self.running:
+            if worker.state == "failed":
+                self.fail_queued_if_unavailable()
+                return
+            if worker.conn is None and not self.launch(worker):
+                time.sleep(ASR_RESTART_DELAY)
+                continue
+
+            job = self.jobs.get()
+            if job is None:
+                break
+            future, audio, options = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            worker.state = "busy"
+            worker.busy_since = time.time()
+            try:
+                worker.conn.send((audio, options))
+                timeout = self.job_timeout(audio)
+                if not worker.conn.poll(timeout):
+                    raise TimeoutError(f"no result within {timeout:.0f}s")
+                status, result = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                # Crashed or hung - either way the process is killed and relaunched
+                worker.errors += 1
+                worker.restarts += 1
+                self.discard(worker)
+                reason = str(e) or type(e).__name__
+                future.set_exception(RuntimeError(f"ASR worker {worker.id} failed: {reason}"))
+                print(f"ASR worker {worker.id} failed, restarting: {reason}")
+                continue
+            finally:
+                worker.busy_seconds += time.time() - worker.busy_since
+                worker.busy_since = None
+                if worker.state == "busy":
+                    worker.state = "idle"
+
+            worker.jobs += 1
+            if status == "ok":
+                future.set_result(result)
+            else:
+                worker.errors += 1
+                future.set_exception(RuntimeError(result))
+
+        self.discard(worker)
+
+    def fail_queued_if_unavailable(self):
+        """Once every worker has given up, fail whatever is still queued"""
+        if self.available:
+            return
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and job[0].set_running_or_notify_cancel():
+                job[0].set_exception(ASRUnavailable("no ASR workers could start"))
+
+    def submit(self, audio, **options):
+        """Queue audio (a path or float32 16 kHz samples); returns a Future for the text"""
+        if not self.available:
+            raise ASRUnavailable("no ASR workers running")
+        self.start()
+        future = Future()
+        self.submitted += 1
+        self.jobs.put((future, audio, options))
+        return future
+
+    def transcribe(self, audio, **options):
+        return self.submit(audio, **options).result()
+
+    def stats(self):
+        return {
+            "workers": len(self.workers),
+            "started": self.running,
+            "cpu_threads": self.cpu_threads,
+            "model": f"{self.model_size} ({self.compute_type})",
+            "submitted": self.submitted,
+            "queued": self.jobs.qsize(),
+            "per_worker": [worker.stats() for worker in self.workers]
+        }
+
+
+if __name__ == "__main__" and len(sys.argv) == 6 and sys.argv[1] == "--worker":
+    worker_main(int(sys.argv[2]), sys.argv[3], sys.argv[4], int(sys.argv[5]))
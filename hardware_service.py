@@ -0,0 +1,264 @@
+# hardware_service.py
+"""
+IPC for the hardware owner process.
+Exactly one process drives the Rainbow HAT (LEDs, display, buzzer, buttons)
+and the audio output device. API worker processes reach it over a
+multiprocessing.connection socket: named hardware functions are called
+remotely, and spoken audio is streamed as raw PCM into the owner's aplay.
+"""
+
+import os
+import time
+import secrets
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+# The connection unpickles what it receives, so both the socket and the key
+# stay private to the user running RoverSeer
+HARDWARE_RUN_DIR = os.environ.get(
+    "ROVERSEER_RUN_DIR",
+    os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"roverseer-{os.getuid()}")
+)
+HARDWARE_ADDRESS = os.environ.get("ROVERSEER_HARDWARE_ADDRESS", os.path.join(HARDWARE_RUN_DIR, "hardware.sock"))
+HARDWARE_KEY_FILE = os.path.join(HARDWARE_RUN_DIR, "hardware.key")
+HARDWARE_RETRY_S = 5.0  # Don't retry an unreachable owner on every LED blink
+
+
+def private_run_dir():
+    """Create HARDWARE_RUN_DIR (mode 0700) and refuse one that another user could get into"""
+    os.makedirs(HARDWARE_RUN_DIR, mode=0o700, exist_ok=True)
+    info = os.stat(HARDWARE_RUN_DIR)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{HARDWARE_RUN_DIR} must be owned by this user with mode 0700")
+    return HARDWARE_RUN_DIR
+
+
+def hardware_authkey():
+    """
+    ROVERSEER_HARDWARE_AUTHKEY if set, otherwise a random key shared through a
+    0600 file in the run directory (created by whichever process gets there first).
+    """
+    key = os.environ.get("ROVERSEER_HARDWARE_AUTHKEY")
+    if key:
+        return key.encode()
+
+    private_run_dir()
+    if not os.path.exists(HARDWARE_KEY_FILE):
+        # Write a complete file, then link it into place so nobody reads a half-written key
+        fd, temp_path = tempfile.mkstemp(dir=HARDWARE_RUN_DIR)  # mkstemp files are 0600
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+            os.link(temp_path, HARDWARE_KEY_FILE)
+        except FileExistsError:
+            pass  # Another process won the race; use its key
+        finally:
+            os.unlink(temp_path)
+
+    with open(HARDWARE_KEY_FILE, "r") as f:
+        return f.read().strip().encode()
+
+
+class HardwareUnavailable(Exception):
+    """The hardware owner process could not be reached"""
+
+
+class HardwareServer:
+    """
+    Runs in the owner process. Each client connection gets a thread that
+    either answers ("call", name, args, kwargs) messages one after another,
+    or, after ("audio", sample_rate), plays the PCM byte chunks that follow
+    until an empty chunk ends the stream.
+    """
+
+    def __init__(self, functions, open_audio_sink, audio_lock=None,
+                 address=HARDWARE_ADDRESS, authkey=None):
+        self.functions = functions  # name -> callable
+        self.open_audio_sink = open_audio_sink
+        self.audio_lock = audio_lock or threading.Lock()
+        self.address = address
+        self.authkey = authkey or hardware_authkey()
+        self.listener = None
+        self.calls = 0
+        self.audio_streams = 0
+        self.clients = 0
+
+    def start(self):
+        if self.address == HARDWARE_ADDRESS and os.path.dirname(self.address) == HARDWARE_RUN_DIR:
+            private_run_dir()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)  # Stale socket from a previous run
+        self.listener = Listener(self.address, authkey=self.authkey)
+        if isinstance(self.address, str):
+            os.chmod(self.address, 0o600)
+        threading.Thread(target=self.serve, daemon=True).start()
+        print(f"Hardware owner listening on {self.address}")
+
+    def stop(self):
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+
+    def serve(self):
+        while self.listener:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError as e:
+                print(f"Hardware owner rejected a client: {e}")
+                continue
+            except (OSError, EOFError) as e:
+                if self.listener:
+                    print(f"Hardware owner accept failed: {e}")
+                continue
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        self.clients += 1
+        try:
+            while True:
+                message = conn.recv()
+                if message[0] == "call":
+                    _, name, args, kwargs = message
+                    conn.send(self.call(name, args, kwargs))
+                elif message[0] == "audio":
+                    self.play_audio(conn, message[1])
+                    return
+        except (EOFError, OSError):
+            pass  # Client went away
+        finally:
+            self.clients -= 1
+            conn.close()
+
+    def call(self, name, args, kwargs):
+        func = self.functions.get(name)
+        if func is None:
+            return ("error", f"unknown hardware function {name}")
+        self.calls += 1
+        try:
+            return ("ok", func(*args, **kwargs))
+        except Exception as e:
+            print(f"Hardware call {name} failed: {e}")
+            return ("error", f"{type(e).__name__}: {e}")
+
+    def play_audio(self, conn, sample_rate):
+        """Feed streamed PCM to a local sink; one remote stream plays at a time"""
+        self.audio_streams += 1
+        with self.audio_lock:
+            sink = self.open_audio_sink(sample_rate)
+            try:
+                while True:
+                    pcm = conn.recv_bytes()
+                    if not pcm:
+                        break
+                    if not sink.write(pcm):
+                        conn.send(("stopped",))  # Interrupted on this side
+                        break
+            finally:
+                sink.close()
+                try:
+                    conn.send(("closed",))
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            "address": self.address,
+            "clients": self.clients,
+            "calls": self.calls,
+            "audio_streams": self.audio_streams
+        }
+
+
+class RemoteAudioSink:
+    """Client side of an audio stream; same write/close interface as PCMAudioSink"""
+
+    def __init__(self, conn, sample_rate):
+        self.conn = conn
+        self.stopped = False
+        self.conn.send(("audio", sample_rate))
+
+    def write(self, pcm):
+        """Send PCM; returns False once the owner has stopped playback"""
+        if self.stopped:
+            return False
+        try:
+            if self.conn.poll():
+                self.stopped = True
+                return False
+            self.conn.send_bytes(pcm)
+            return True
+        except (EOFError, OSError):
+            self.stopped = True
+            return False
+
+    def close(self):
+        """Wait until the owner has played everything written"""
+        try:
+            if not self.stopped:
+                self.conn.send_bytes(b"")
+            while self.conn.recv()[0] != "closed":
+                pass
+        except (EOFError, OSError):
+            pass
+        finally:
+            self.conn.close()
+
+
+class HardwareClient:
+    """
+    Runs in API worker processes. Calls are synchronous over one connection
+    per thread; an unreachable owner raises HardwareUnavailable and isn't
+    retried for HARDWARE_RETRY_S.
+    """
+
+    def __init__(self, address=HARDWARE_ADDRESS, authkey=None):
+        self.address = address
+        self.authkey = authkey or hardware_authkey()
+        self.local = threading.local()
+        self.down_until = 0
+        self.calls = 0
+        self.failures = 0
+
+    def connect(self):
+        if time.time() < self.down_until:
+            raise HardwareUnavailable(f"hardware owner at {self.address} is down")
+        try:
+            return Client(self.address, authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            self.mark_down(e)
+            raise HardwareUnavailable(f"hardware owner at {self.address} unreachable: {e}") from e
+
+    def mark_down(self, error):
+        if time.time() >= self.down_until:
+            print(f"Hardware owner unavailable, retrying in {HARDWARE_RETRY_S:.0f}s: {error}")
+        self.failures += 1
+        self.down_until = time.time() + HARDWARE_RETRY_S
+
+    def call(self, name, *args, **kwargs):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = self.connect()
+        try:
+            conn.send(("call", name, args, kwargs))
+            status, result = conn.recv()
+        except (EOFError, OSError) as e:
+            self.local.conn = None
+            self.mark_down(e)
+            raise HardwareUnavailable(f"lost connection to hardware owner: {e}") from e
+        self.calls += 1
+        if status == "error":
+            raise RuntimeError(f"Hardware call {name} failed: {result}")
+        return result
+
+    def open_audio(self, sample_rate):
+        return RemoteAudioSink(self.connect(), sample_rate)
+
+    def stats(self):
+        return {
+            "address": self.address,
+            "calls": self.calls,
+            "failures": self.failures,
+            "available": time.time() >= self.down_until
+        }
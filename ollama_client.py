@@ -0,0 +1,427 @@
+# ollama_client.py
+"""
+Shared HTTP client for all Ollama traffic.
+One pooled keep-alive Session per base URL, connect/read timeouts,
+and per-endpoint latency counters for the /stats page.
+With several hosts listed under ollama_backends in config/rovernet.yaml,
+an OllamaBackendPool spreads requests across them.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+OLLAMA_DEFAULT_PORT = 11434
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "3"))
+OLLAMA_READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "300"))  # Big models on a Pi are slow
+OLLAMA_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", "8"))
+LATENCY_SAMPLES = 200  # Recent samples kept per endpoint for percentiles
+ROVERNET_CONFIG = os.environ.get(
+    "ROVERNET_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "rovernet.yaml")
+)
+BACKEND_HEALTH_INTERVAL = float(os.environ.get("OLLAMA_HEALTH_INTERVAL", "15"))
+BACKEND_HEALTH_TIMEOUT = (OLLAMA_CONNECT_TIMEOUT, 5)
+MODEL_AFFINITY_WEIGHT = 1  # Extra outstanding requests tolerated to stay on the host that last ran a model
+
+
+def is_connect_error(error):
+    """
+    True if the request never reached the host (refused, unresolvable or connect timeout).
+    A connection dropped after sending ("Connection aborted") may have run there.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    # NewConnectionError is a ConnectTimeoutError too
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def normalize_base_url(host):
+    """
+    Accept the same forms as Ollama's own OLLAMA_HOST ("0.0.0.0", "host:port",
+    "http://host:port") and return a usable base URL.
+    """
+    host = host.strip().rstrip("/")
+    if "://" not in host:
+        host = f"http://{host}"
+    parsed = urlparse(host)
+    hostname = parsed.hostname or "localhost"
+    if hostname == "0.0.0.0":
+        # A bind-all address isn't something we can connect to
+        hostname = "localhost"
+    port = parsed.port or OLLAMA_DEFAULT_PORT
+    return f"{parsed.scheme}://{hostname}:{port}{parsed.path}"
+
+
+class LatencyStats:
+    """Call counts, errors and latency percentiles for one endpoint"""
+
+    def __init__(self, max_samples=LATENCY_SAMPLES):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = None
+        self.samples = deque(maxlen=max_samples)
+
+    def record(self, elapsed, error=False):
+        self.calls += 1
+        if error:
+            self.errors += 1
+            return
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.last_time = elapsed
+        self.samples.append(elapsed)
+
+    def percentile(self, fraction):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self):
+        successes = self.calls - self.errors
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_s": round(self.total_time / successes, 3) if successes else None,
+            "p50_s": round(self.percentile(0.5), 3) if self.samples else None,
+            "p95_s": round(self.percentile(0.95), 3) if self.samples else None,
+            "max_s": round(self.max_time, 3) if successes else None,
+            "last_s": round(self.last_time, 3) if self.last_time is not None else None
+        }
+
+
+class OllamaClient:
+    """
+    Thin wrapper around a pooled requests.Session.
+    Streaming calls are timed to the response headers (time to first byte);
+    everything else is timed to the complete body.
+    """
+
+    def __init__(self, base_url=OLLAMA_HOST, connect_timeout=OLLAMA_CONNECT_TIMEOUT,
+                 read_timeout=OLLAMA_READ_TIMEOUT, pool_size=OLLAMA_POOL_SIZE):
+        self.base_url = normalize_base_url(base_url)
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lock = threading.Lock()
+        self.latency = {}  # "METHOD /path" -> LatencyStats
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    @property
+    def is_local(self):
+        """Whether Ollama runs on this machine (so this machine's free RAM is its RAM)"""
+        return urlparse(self.base_url).hostname in ("localhost", "127.0.0.1", "::1")
+
+    def record(self, label, elapsed, error=False):
+        with self.lock:
+            if label not in self.latency:
+                self.latency[label] = LatencyStats()
+            self.latency[label].record(elapsed, error)
+
+    def request(self, method, path, stream=False, timeout=None, **kwargs):
+        """Send a request through the shared session; raises requests exceptions on failure"""
+        label = f"{method} {path}" + (" (stream)" if stream else "")
+        start = time.time()
+        try:
+            response = self.session.request(
+                method, self.url(path),
+                stream=stream,
+                timeout=timeout or self.timeout,
+                **kwargs
+            )
+        except requests.RequestException:
+            self.record(label, time.time() - start, error=True)
+            raise
+        self.record(label, time.time() - start, error=not response.ok)
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def list_models(self, timeout=None):
+        """The /api/tags model entries; raises requests exceptions on failure"""
+        response = self.get("/api/tags", timeout=timeout)
+        response.raise_for_status()
+        return response.json().get("models", [])
+
+    def client_for(self, model):
+        """The client to load or unload model on (there's only one host)"""
+        return self
+
+    def stats(self):
+        with self.lock:
+            return {
+                "base_url": self.base_url,
+                "timeouts_s": {"connect": self.timeout[0], "read": self.timeout[1]},
+                "endpoints": {label: stats.to_dict() for label, stats in self.latency.items()}
+            }
+
+
+class OllamaBackend:
+    """One host in an OllamaBackendPool: its client, health and the models it has"""
+
+    def __init__(self, base_url, **client_kwargs):
+        self.client = OllamaClient(base_url, **client_kwargs)
+        self.base_url = self.client.base_url
+        self.healthy = True  # Until a health check says otherwise
+        self.models = {}  # name -> /api/tags entry
+        self.outstanding = 0
+        self.served = 0
+        self.last_check = None
+        self.last_error = None
+
+
+class OllamaBackendPool:
+    """
+    Several Ollama hosts behind the OllamaClient interface.
+    Requests naming a model (in the JSON body) go to a healthy host that has it,
+    fewest outstanding requests first, with a bias towards the host that ran the
+    model last since it is probably still loaded there. Requests that don't name
+    a model (/api/tags, /api/ps) go to the first healthy host in config order.
+    A host that refuses the connection is marked down and the request moves on.
+    """
+
+    def __init__(self, base_urls, health_interval=BACKEND_HEALTH_INTERVAL, **client_kwargs):
+        if not base_urls:
+            raise ValueError("OllamaBackendPool needs at least one base URL")
+        self.backends = [OllamaBackend(url, **client_kwargs) for url in base_urls]
+        self.timeout = self.backends[0].client.timeout
+        self.health_interval = health_interval
+        self.lock = threading.Lock()
+        self.affinity = {}  # model -> backend that served it last
+        self.stop_event = threading.Event()
+        self.health_thread = None
+
+    def check_health(self, timeout=BACKEND_HEALTH_TIMEOUT):
+        """Refresh every backend's health and model list from /api/tags"""
+        for backend in self.backends:
+            try:
+                response = backend.client.get("/api/tags", timeout=timeout)
+                response.raise_for_status()
+                models = {tag["name"]: tag for tag in response.json().get("models", []) if tag.get("name")}
+                error = None
+            except (requests.RequestException, ValueError) as e:
+                models, error = None, str(e)
+
+            with self.lock:
+                backend.last_check = time.time()
+                backend.healthy = error is None
+                backend.last_error = error
+                if models is not None:
+                    backend.models = models
+
+    def start_health_checks(self):
+        """Check every backend now, then every health_interval seconds in the background"""
+        self.check_health()
+
+        def run():
+            while not self.stop_event.wait(self.health_interval):
+                self.check_health()
+
+        self.health_thread = threading.Thread(target=run, daemon=True)
+        self.health_thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def choose(self, model=None, exclude=()):
+        """Pick a backend for a request and count it as outstanding (None if all are excluded)"""
+        with self.lock:
+            candidates = [backend for backend in self.backends if backend.healthy and backend not in exclude]
+            if not candidates:
+                # Everything failed its last check - try anyway, it may be back
+                candidates = [backend for backend in self.backends if backend not in exclude]
+            if not candidates:
+                return None
+
+            if model is None:
+                backend = candidates[0]
+            else:
+                # A model nobody lists still gets sent somewhere so Ollama can report it
+                candidates = [backend for backend in candidates if model in backend.models] or candidates
+                preferred = self.affinity.get(model)
+                backend = min(
+                    candidates,
+                    key=lambda candidate: (
+                        candidate.outstanding - (MODEL_AFFINITY_WEIGHT if candidate is preferred else 0),
+                        candidate is not preferred
+                    )
+                )
+                self.affinity[model] = backend
+
+            backend.outstanding += 1
+            backend.served += 1
+            return backend
+
+    def client_for(self, model):
+        """
+        The client of the backend that holds model - where it last ran, or where
+        the next request for it will go - so loading and unloading it happen there.
+        """
+        with self.lock:
+            backend = self.affinity.get(model)
+            if backend is None or not backend.healthy:
+                candidates = [candidate for candidate in self.backends if candidate.healthy] or self.backends
+                candidates = [candidate for candidate in candidates if model in candidate.models] or candidates
+                backend = min(candidates, key=lambda candidate: candidate.outstanding)
+                self.affinity[model] = backend
+            return backend.client
+
+    def finish(self, backend):
+        with self.lock:
+            backend.outstanding -= 1
+
+    def mark_down(self, backend, error):
+        with self.lock:
+            backend.healthy = False
+            backend.last_error = str(error)
+
+    def release_on_close(self, response, backend):
+        """A streaming response keeps its backend busy until it is closed"""
+        close = response.close
+        state = {"open": True}
+
+        def close_and_release():
+            close()
+            with self.lock:
+                if not state["open"]:
+                    return
+                state["open"] = False
+                backend.outstanding -= 1
+
+        response.close = close_and_release
+
+    def request(self, method, path, stream=False, timeout=None, **kwargs):
+        """Send a request to the chosen backend; raises requests exceptions on failure"""
+        payload = kwargs.get("json")
+        model = payload.get("model") if isinstance(payload, dict) else None
+        tried = []
+        last_error = None
+
+        while True:
+            backend = self.choose(model, exclude=tried)
+            if backend is None:
+                raise last_error
+            tried.append(backend)
+
+            try:
+                response = backend.client.request(method, path, stream=stream, timeout=timeout, **kwargs)
+            except requests.ConnectionError as e:
+                self.finish(backend)
+                if not is_connect_error(e):
+                    raise
+                # Never reached the host, so nothing ran there - try the next one
+                self.mark_down(backend, e)
+                last_error = e
+                continue
+            except Exception:
+                self.finish(backend)
+                raise
+
+            if stream:
+                self.release_on_close(response, backend)
+            else:
+                self.finish(backend)
+            return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def list_models(self, timeout=None):
+        """
+        Every model on a healthy backend (first host wins on duplicate names), from
+        the background health checks; only checks now if none has run yet.
+        """
+        if all(backend.last_check is None for backend in self.backends):
+            self.check_health(timeout or BACKEND_HEALTH_TIMEOUT)
+        models = {}
+        with self.lock:
+            healthy = [backend for backend in self.backends if backend.healthy]
+            if not healthy:
+                raise requests.ConnectionError(
+                    "No Ollama backend reachable: " + "; ".join(backend.last_error or "" for backend in self.backends)
+                )
+            for backend in healthy:
+                for name, tag in backend.models.items():
+                    models.setdefault(name, tag)
+        return list(models.values())
+
+    def stats(self):
+        with self.lock:
+            backends = [
+                {
+                    "base_url": backend.base_url,
+                    "healthy": backend.healthy,
+                    "last_error": backend.last_error,
+                    "last_check": backend.last_check,
+                    "outstanding": backend.outstanding,
+                    "served": backend.served,
+                    "models": sorted(backend.models)
+                }
+                for backend in self.backends
+            ]
+            affinity = {model: backend.base_url for model, backend in self.affinity.items()}
+
+        for entry, backend in zip(backends, self.backends):
+            entry["endpoints"] = backend.client.stats()["endpoints"]
+
+        return {
+            "timeouts_s": {"connect": self.timeout[0], "read": self.timeout[1]},
+            "health_interval_s": self.health_interval,
+            "backends": backends,
+            "affinity": affinity
+        }
+
+
+def load_backend_urls(config_path=ROVERNET_CONFIG):
+    """Base URLs listed under ollama_backends in rovernet.yaml ([] if none or PyYAML is missing)"""
+    if yaml is None or not os.path.exists(config_path):
+        return []
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f) or {}
+    entries = config.get("ollama_backends") or []
+    return [entry["url"] if isinstance(entry, dict) else entry for entry in entries]
+
+
+def create_ollama_client(config_path=ROVERNET_CONFIG):
+    """An OllamaBackendPool for the configured backends, or a single OllamaClient for OLLAMA_HOST"""
+    try:
+        base_urls = load_backend_urls(config_path)
+    except Exception as e:
+        print(f"Error reading ollama_backends from {config_path}: {e}")
+        base_urls = []
+
+    if not base_urls:
+        return OllamaClient()
+
+    pool = OllamaBackendPool(base_urls)
+    pool.start_health_checks()
+    return pool
@@ -1,9 +1,10 @@
-from flask import Flask, request, jsonify, send_file, redirect, render_template_string, send_file, url_for
+from flask import Flask, Request, request, jsonify, send_file, redirect, render_template_string, send_file, url_for, Response, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from flask_cors import CORS
 from flasgger import Swagger, swag_from
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, decode_audio
+import numpy as np
 import os
-import requests
 import subprocess
 import uuid
 import re
@@ -14,13 +15,26 @@ import threading
 import random
 from datetime import datetime
 from pathlib import Path
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from contextlib import contextmanager, asynccontextmanager, AsyncExitStack
 import hashlib
+import io
+import wave
+import struct
+import math
+import asyncio
+import functools
 
 import sys
 sys.path.insert(0, "/home/codemusic/custom_drivers")
 
 from rainbow_driver import RainbowDriver
 from gpiozero.tones import Tone
+from ollama_client import create_ollama_client, LatencyStats
+from state_store import create_state_store, StoredDict
+from hardware_service import HardwareServer, HardwareClient, HardwareUnavailable
+from asr_service import ASRWorkerPool, ASRUnavailable, ASR_WORKERS
 
 # -------- SOUND QUEUE SYSTEM -------- #
 import queue
@@ -72,15 +86,18 @@ MIC_DEVICE = detect_usb_mic_device()  # Initialize microphone device
 VOICES_DIR = "/home/codemusic/piper/voices"
 DEFAULT_MODEL = "tinydolphin:1.1b"
 DEFAULT_VOICE = os.environ.get("PIPER_VOICE", "en_GB-jarvis")
-history = []
-MAX_HISTORY = 10  # Max number of exchanges to retain for context
-
-# Separate history for button-initiated conversations
-button_history = []
-MAX_BUTTON_HISTORY = 10  # Max number of button chat exchanges to retain
 
 # -------- VOICE INTRO SYSTEM -------- #
-INTROS_DIR = Path.home() / "roverseer_voice_intros"
+# Voice-specific intro messages (audio lives in the TTS cache)
+VOICE_INTRO_MESSAGES = {
+    "en_GB-jarvis": "Ahh yes, hmm... let me gather my thoughts on this before I reply.",
+    "en_US-amy": "Hello! Just a moment while I think about that.",
+    "en_GB-northern_english": "Right then, let me have a think about that.",
+    "en_US-danny": "Hey there! Give me a second to process that.",
+    "en_GB-alba": "Curiouser, and Curiouser. Let me ponder on that for a minute.",
+    "en_US-ryan": "Hi! I'm processing your query now.",
+}
+DEFAULT_VOICE_INTRO = "Curious, let me think about that."
 
 
 def sound_queue_worker():
@@ -125,19 +142,65 @@ def stop_sound_queue_worker():
             sound_worker_thread.join(timeout=2)
         print("Sound queue worker stopped")
 
+# -------- SHARED STATE + HARDWARE OWNER -------- #
+# ROVERSEER_ROLE splits the rover across processes:
+#   standalone - one process owns the hardware and serves HTTP (default)
+#   hardware   - owns the Rainbow HAT, buttons, audio output and the Whisper models; serves them over IPC, no HTTP
+#   http       - serves HTTP only (run as many as you like, e.g. gunicorn -w 4 roverseer_api:app);
+#                hardware calls and transcription go to the owner process
+# With more than one process, point ROVERSEER_STATE_STORE at sqlite so they share state.
+ROVERSEER_ROLE = os.environ.get("ROVERSEER_ROLE", "standalone")
+state_store = create_state_store()
+if ROVERSEER_ROLE != "standalone" and state_store.backend == "memory":
+    print(f"ROVERSEER_ROLE={ROVERSEER_ROLE} with an in-process state store - state won't be shared between processes")
+
+# Functions that touch GPIO, the display or the speaker, by name, for the owner to run
+HARDWARE_FUNCTIONS = {}
+hardware_client = HardwareClient() if ROVERSEER_ROLE == "http" else None
+hardware_server = None
+
+def hardware_owned(func):
+    """
+    Run func in the hardware owner process. In the http role the call goes over
+    IPC (arguments and result must pickle); if the owner can't be reached, or in
+    any other role, it runs here - without a RainbowDriver that's a no-op.
+    """
+    HARDWARE_FUNCTIONS[func.__name__] = func
+    
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        if hardware_client is not None:
+            try:
+                return hardware_client.call(func.__name__, *args, **kwargs)
+            except HardwareUnavailable:
+                pass
+        return func(*args, **kwargs)
+    return call
+
 # Global state for audio coordination
 tune_playing = threading.Event()
 current_display_value = None  # Track what's currently on display
 
 # Global state for model selection and recording
-available_models = []
+# The model list lives in the state store (see get_available_models); the
+# button selection is only ever used by the hardware owner
 selected_model_index = 0
 
-# Global audio playback process for interruption
+# Audio playback process for interruption. A process handle can't be shared,
+# so it stays with the process that owns the audio device; state_store's
+# "audio_output" entry tells every process whether something is playing.
 current_audio_process = None
 
-# Pipeline stage tracking for LED states
-pipeline_stages = {
+# Cancellation token of the button request being answered (see CANCELLATION)
+current_voice_request = None
+
+# Pipelined speech state (see STREAMING SPEECH PIPELINE)
+speech_pipeline_active = threading.Event()
+speech_interrupted = threading.Event()
+audio_output_lock = threading.Lock()  # Held while a reply is being spoken
+
+# Pipeline stage tracking for LED states (shared, so every process sees the LED stage)
+pipeline_stages = StoredDict(state_store, "pipeline_stages", {
     'asr_active': False,
     'asr_complete': False,
     'llm_active': False,
@@ -145,8 +208,17 @@ pipeline_stages = {
     'tts_active': False,
     'tts_complete': False,
     'aplay_active': False
-}
+})
+if ROVERSEER_ROLE != "http":
+    # The pipeline runs here: anything stored is left over from a previous run (e.g. a crash)
+    pipeline_stages.set_all(False)
+    state_store.delete("audio_output")
 
+def get_available_models():
+    """Models for button selection and routing, smallest first"""
+    return state_store.get("available_models", [])
+
+@hardware_owned
 def update_pipeline_leds():
     """Update LEDs based on current pipeline stage states"""
     if not rainbow:
@@ -173,11 +245,10 @@ def update_pipeline_leds():
     else:
         rainbow.button_leds['C'].off()
 
+@hardware_owned
 def reset_pipeline_stages():
     """Reset all pipeline stages to inactive"""
-    global pipeline_stages
-    for key in pipeline_stages:
-        pipeline_stages[key] = False
+    pipeline_stages.set_all(False)
     # Turn off all LEDs
     if rainbow:
         for led in ['A', 'B', 'C']:
@@ -225,10 +296,23 @@ def blink_processing_led(led_color='B'):
         if not pipeline_stages.get('aplay_active'):
             update_pipeline_leds()
 
+@hardware_owned
 def interrupt_audio_playback():
     """Interrupt any currently playing audio"""
     global current_audio_process
     
+    interrupted = False
+    
+    # Abort the LLM generation / synthesis still running for a button request
+    if current_voice_request is not None and not current_voice_request.cancelled:
+        current_voice_request.cancel("interrupted by button")
+        interrupted = True
+    
+    # Stop a pipelined spoken reply even if it is between sentences
+    if speech_pipeline_active.is_set() and not speech_interrupted.is_set():
+        speech_interrupted.set()
+        interrupted = True
+    
     if current_audio_process and current_audio_process.poll() is None:
         # Audio is still playing, terminate it
         try:
@@ -241,7 +325,9 @@ def interrupt_audio_playback():
                 pass
         
         current_audio_process = None
-        
+        interrupted = True
+    
+    if interrupted:
         # Reset pipeline since we interrupted
         reset_pipeline_stages()
         
@@ -263,9 +349,6 @@ TICK_TYPE = "clock" # "clock" or "music"
 logical_model = "DolphinSeek-R1:latest"
 creative_model = "LaPenguin:latest"
 
-# Initialize convergence model as None - will be set randomly for each request
-convergence_model = None
-
 consice_comment = "BE VERY CONCISE. Your respones should be distilled and clear. Do not be verbose."
 creative_message = f"You are the Creative Mind. Think in metaphors, colors, and emotions. Offer a fresh, imaginative perspective. {consice_comment}"
 logical_message = f"You are the Logical Mind. Think in structure, reason, and clarity. Offer a concise, analytical perspective. {consice_comment}"
@@ -278,6 +361,15 @@ Do not mention or describe the original perspectives.
 Do not reflect on your own reasoning process. 
 Simply provide the final, synthesized insight as your complete response. {consice_comment}"""
 
+# PenphinMind ensemble: each mind is a model with its own perspective, run in parallel
+ENSEMBLE_MINDS = [
+    {"name": "Logical", "model": logical_model, "system": logical_message},
+    {"name": "Creative", "model": creative_model, "system": creative_message}
+]
+ENSEMBLE_MIND_TIMEOUT = float(os.environ.get("ROVERSEER_MIND_TIMEOUT", "180"))
+# Converge with whatever has returned after this many seconds (unset = wait for every mind)
+ENSEMBLE_LATENCY_BUDGET = float(os.environ.get("ROVERSEER_ENSEMBLE_BUDGET", "0")) or None
+
 recording_in_progress = False
 # Global system processing indicator
 system_processing = False
@@ -303,41 +395,236 @@ def load_model_stats():
             return {}
     return {}
 
+# Parsed stats file for read-only callers, kept until the file's mtime changes
+model_stats_cache = {"mtime": None, "stats": {}}
+
+def read_model_stats():
+    """Model statistics without re-reading the file on every request; don't modify the result"""
+    try:
+        mtime = STATS_FILE.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if model_stats_cache["mtime"] != mtime:
+        model_stats_cache.update(mtime=mtime, stats=load_model_stats())
+    return model_stats_cache["stats"]
+
 def save_model_stats(stats):
     """Save model statistics to JSON file"""
     ensure_log_dir()  # Make sure directory exists
     with open(STATS_FILE, 'w') as f:
         json.dump(stats, f, indent=2)
 
-def update_model_runtime(model_name, runtime):
-    """Update runtime statistics for a model"""
-    stats = load_model_stats()
-    
-    if model_name not in stats:
-        stats[model_name] = {
-            "total_runtime": 0,
-            "run_count": 0,
-            "average_runtime": 0,
-            "last_runtime": 0,
-            "last_run": None
+# Serializes read-modify-write of the stats file between request threads
+model_stats_lock = threading.Lock()
+
+def update_model_runtime(model_name, runtime, prompt_chars=None):
+    """Update runtime statistics for a model (prompt_chars adds a sample for latency routing)"""
+    with model_stats_lock:
+        stats = load_model_stats()
+        
+        # The entry may already exist with only throughput data
+        if "run_count" not in stats.get(model_name, {}):
+            stats.setdefault(model_name, {}).update({
+                "total_runtime": 0,
+                "run_count": 0,
+                "average_runtime": 0,
+                "last_runtime": 0,
+                "last_run": None
+            })
+        
+        stats[model_name]["total_runtime"] += runtime
+        stats[model_name]["run_count"] += 1
+        stats[model_name]["average_runtime"] = stats[model_name]["total_runtime"] / stats[model_name]["run_count"]
+        stats[model_name]["last_runtime"] = runtime
+        stats[model_name]["last_run"] = datetime.now().isoformat()
+        
+        if prompt_chars is not None:
+            samples = stats[model_name].setdefault("samples", [])
+            samples.append([prompt_chars, round(runtime, 3)])
+            del samples[:-MAX_RUNTIME_SAMPLES]
+        
+        save_model_stats(stats)
+        return stats[model_name]["average_runtime"]
+
+# load_duration above this means Ollama had to (re)load the model for the call
+MODEL_LOAD_THRESHOLD_S = 0.5
+
+def parse_ollama_usage(response_data):
+    """Token counts and timings from a final Ollama response (Ollama durations are in nanoseconds)"""
+    prompt_tokens = response_data.get("prompt_eval_count", 0)
+    completion_tokens = response_data.get("eval_count", 0)
+    prompt_eval_s = response_data.get("prompt_eval_duration", 0) / 1e9
+    eval_s = response_data.get("eval_duration", 0) / 1e9
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_eval_s": round(prompt_eval_s, 3),
+        "eval_s": round(eval_s, 3),
+        "load_s": round(response_data.get("load_duration", 0) / 1e9, 3),
+        "total_s": round(response_data.get("total_duration", 0) / 1e9, 3),
+        "prompt_tokens_per_s": round(prompt_tokens / prompt_eval_s, 1) if prompt_eval_s else None,
+        "tokens_per_s": round(completion_tokens / eval_s, 1) if eval_s else None
+    }
+
+def update_model_throughput(model_name, usage):
+    """Accumulate token counts, eval time and load overhead for a model"""
+    with model_stats_lock:
+        stats = load_model_stats()
+        throughput = stats.setdefault(model_name, {}).setdefault("throughput", {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "prompt_eval_s": 0,
+            "completion_tokens": 0,
+            "eval_s": 0,
+            "loads": 0,
+            "load_s": 0
+        })
+        
+        throughput["calls"] += 1
+        throughput["prompt_tokens"] += usage["prompt_tokens"]
+        throughput["prompt_eval_s"] += usage["prompt_eval_s"]
+        throughput["completion_tokens"] += usage["completion_tokens"]
+        throughput["eval_s"] += usage["eval_s"]
+        if usage["load_s"] > MODEL_LOAD_THRESHOLD_S:
+            throughput["loads"] += 1
+            throughput["load_s"] += usage["load_s"]
+        
+        save_model_stats(stats)
+
+def get_model_throughput():
+    """Per-model prompt processing and generation speed, plus cold-load overhead"""
+    summary = {}
+    for model_name, stats in load_model_stats().items():
+        throughput = stats.get("throughput")
+        if not throughput or not throughput["calls"]:
+            continue
+        summary[model_name] = {
+            "calls": throughput["calls"],
+            "prompt_tokens_per_s": round(throughput["prompt_tokens"] / throughput["prompt_eval_s"], 1) if throughput["prompt_eval_s"] else None,
+            "generation_tokens_per_s": round(throughput["completion_tokens"] / throughput["eval_s"], 1) if throughput["eval_s"] else None,
+            "avg_prompt_tokens": round(throughput["prompt_tokens"] / throughput["calls"], 1),
+            "avg_completion_tokens": round(throughput["completion_tokens"] / throughput["calls"], 1),
+            "cold_loads": throughput["loads"],
+            "avg_load_s": round(throughput["load_s"] / throughput["loads"], 2) if throughput["loads"] else None
         }
-    
-    stats[model_name]["total_runtime"] += runtime
-    stats[model_name]["run_count"] += 1
-    stats[model_name]["average_runtime"] = stats[model_name]["total_runtime"] / stats[model_name]["run_count"]
-    stats[model_name]["last_runtime"] = runtime
-    stats[model_name]["last_run"] = datetime.now().isoformat()
-    
-    save_model_stats(stats)
-    return stats[model_name]["average_runtime"]
+    return summary
 
 def get_model_runtime(model_name):
     """Get average runtime for a model"""
-    stats = load_model_stats()
+    stats = read_model_stats()
     if model_name in stats:
         return stats[model_name].get("average_runtime", None)
     return None
 
+# -------- LATENCY-AWARE MODEL ROUTING -------- #
+MAX_RUNTIME_SAMPLES = 200      # (prompt_chars, runtime) samples kept per model
+ROUTING_MIN_SAMPLES = 3        # Don't predict from fewer runs than this
+ROUTING_QUANTILE = 0.9         # Plan for the slow end of a model's distribution
+AUTO_MODEL_LATENCY_BUDGET = float(os.environ.get("ROVERSEER_AUTO_LATENCY_S", "30"))
+MODEL_SIZES_TTL = float(os.environ.get("ROVERSEER_MODEL_SIZES_TTL_S", "300"))  # Seconds between /api/tags size lookups
+
+def count_prompt_chars(messages, system_message=None):
+    """Prompt size as sent to Ollama, in characters"""
+    chars = sum(len(str(msg.get("content", ""))) for msg in messages)
+    if system_message and not any(msg.get("role") == "system" for msg in messages):
+        chars += len(system_message)
+    return chars
+
+def predict_model_latency(model_stats, prompt_chars, quantile=ROUTING_QUANTILE):
+    """
+    Expected runtime for a prompt of this size, or None without enough data.
+    Fits runtime = intercept + slope * prompt_chars over the recorded samples
+    and adds the given quantile of the residuals.
+    """
+    samples = model_stats.get("samples", [])
+    if len(samples) < ROUTING_MIN_SAMPLES:
+        # Stats recorded before samples were kept only have the average
+        if model_stats.get("run_count", 0) >= ROUTING_MIN_SAMPLES:
+            return model_stats.get("average_runtime")
+        return None
+    
+    mean_chars = sum(chars for chars, _ in samples) / len(samples)
+    mean_runtime = sum(runtime for _, runtime in samples) / len(samples)
+    variance = sum((chars - mean_chars) ** 2 for chars, _ in samples)
+    covariance = sum((chars - mean_chars) * (runtime - mean_runtime) for chars, runtime in samples)
+    slope = max(0.0, covariance / variance) if variance else 0.0  # Longer prompts are never faster
+    intercept = mean_runtime - slope * mean_chars
+    
+    residuals = sorted(runtime - (intercept + slope * chars) for chars, runtime in samples)
+    margin = residuals[int(quantile * (len(residuals) - 1))]
+    return max(0.0, intercept + slope * prompt_chars + margin)
+
+def get_model_sizes(refresh=False):
+    """
+    model -> size in bytes from /api/tags, leaving out models Ollama reports no size for.
+    Fetched at most once per MODEL_SIZES_TTL (refresh_available_models forces it).
+    """
+    cached = state_store.get("model_sizes")
+    if cached and not refresh and time.time() - cached["fetched"] < MODEL_SIZES_TTL:
+        return cached["sizes"]
+    
+    try:
+        tags = ollama.list_models(timeout=OLLAMA_TAGS_TIMEOUT)
+        sizes = {tag["name"]: tag["size"] for tag in tags if tag.get("name") and tag.get("size")}
+    except Exception as e:
+        print(f"Error fetching model sizes: {e}")
+        # Keep the last sizes, and don't ask again until the TTL is up
+        sizes = cached["sizes"] if cached else {}
+    state_store.set("model_sizes", {"fetched": time.time(), "sizes": sizes})
+    return sizes
+
+def route_model(messages, max_latency_s, system_message=None, preferred_model=None):
+    """
+    Pick the largest model (by size in /api/tags) expected to answer within max_latency_s.
+    Models of unknown size only win when no sized model fits.
+    A preferred model is kept if it fits (or has no data to judge by);
+    if nothing fits, the fastest known model is used.
+    Returns (model, predicted_latency or None).
+    """
+    model_stats = read_model_stats()
+    prompt_chars = count_prompt_chars(messages, system_message)
+    
+    def predict(model):
+        return predict_model_latency(model_stats.get(model, {}), prompt_chars)
+    
+    if preferred_model and preferred_model != "auto":
+        predicted = predict(preferred_model)
+        if predicted is None or predicted <= max_latency_s:
+            return preferred_model, predicted
+    
+    candidates = [model for model in get_available_models() if model.lower() != "penphinmind"] or [DEFAULT_MODEL]
+    predictions = {model: predict(model) for model in candidates}
+    known = [model for model in candidates if predictions[model] is not None]
+    fitting = [model for model in known if predictions[model] <= max_latency_s]
+    
+    if fitting:
+        # Bigger is more capable; unknown sizes rank below every sized model
+        model_sizes = get_model_sizes()
+        best = max(fitting, key=lambda model: model_sizes.get(model, 0))
+        return best, predictions[best]
+    if known:
+        fastest = min(known, key=predictions.get)
+        return fastest, predictions[fastest]
+    if preferred_model and preferred_model != "auto":
+        return preferred_model, None
+    return DEFAULT_MODEL, None
+
+def resolve_requested_model(data, messages, system_message=None):
+    """
+    Model for a chat request: as given, or routed when model is "auto"
+    or a max_latency_s budget is set. Returns (model, predicted_latency or None).
+    """
+    model = data.get("model", DEFAULT_MODEL)
+    max_latency_s = data.get("max_latency_s")
+    if model != "auto" and max_latency_s is None:
+        return model, None
+    
+    budget = float(max_latency_s) if max_latency_s is not None else AUTO_MODEL_LATENCY_BUDGET
+    routed_model, predicted = route_model(messages, budget, system_message, preferred_model=model)
+    print(f"Routed to {routed_model} (predicted {predicted if predicted is None else round(predicted, 1)}s, budget {budget}s)")
+    return routed_model, predicted
+
 def get_log_filename(log_type):
     """Get the log filename for today's date"""
     today = datetime.now().strftime("%Y-%m-%d")
@@ -356,22 +643,23 @@ def log_llm_usage(model_name, system_message, user_prompt, response, processing_
             f.write(f" [{processing_time:.2f}s]")
         f.write("\n--\n\n")
 
-def log_penphin_mind_usage(logical_model, creative_model, convergence_model, 
-                          system_message, user_prompt, 
-                          logical_response, logical_time,
-                          creative_response, creative_time,
-                          convergence_response, convergence_time):
-    """Log PenphinMind bicameral flow to daily file"""
+def log_penphin_mind_usage(mind_results, convergence_model,
+                          system_message, user_prompt,
+                          convergence_response, convergence_time, total_time):
+    """Log a PenphinMind ensemble run (every mind plus convergence) to daily file"""
     ensure_log_dir()
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    total_time = logical_time + creative_time + convergence_time
+    minds_summary = ", ".join(f"{mind['name']}: {mind['model']}" for mind in mind_results)
     
     with open(get_log_filename("penphin_mind"), "a", encoding="utf-8") as f:
-        f.write(f"[ Logical: {logical_model}, Creative: {creative_model}, Convergence: {convergence_model}\n")
+        f.write(f"[ {minds_summary}, Convergence: {convergence_model}\n")
         f.write(f"  {timestamp}, {system_message}\n")
         f.write(f"  User: {user_prompt}\n")
-        f.write(f"  \n\nLogical Agent's Reply: {logical_response} [{logical_time:.2f}s]\n")
-        f.write(f"  \n\nCreative Agent's Reply: {creative_response} [{creative_time:.2f}s]\n")
+        for mind in mind_results:
+            if mind["status"] == "ok":
+                f.write(f"  \n\n{mind['name']} Agent's Reply: {mind['response']} [{mind['time']:.2f}s]\n")
+            else:
+                f.write(f"  \n\n{mind['name']} Agent's Reply: ({mind['status']}: {mind.get('error', 'left out of convergence')})\n")
         f.write(f"  \n\nConvergence Reply: {convergence_response} [{convergence_time:.2f}s]\n")
         f.write(f"  \n")
         f.write(f"  Total processing time = {total_time:.2f}s\n")
@@ -518,6 +806,7 @@ def parse_log_file(log_type, limit=50, date=None):
         return []
 
 # Define tune sequences for different operations
+@hardware_owned
 def play_ollama_tune(model_name=None):
     """Play a curious ascending tune when starting Ollama requests - uses model name to guide composition"""
     if rainbow and hasattr(rainbow, 'buzzer'):
@@ -577,6 +866,7 @@ def play_ollama_tune(model_name=None):
         finally:
             tune_playing.clear()
 
+@hardware_owned
 def play_ollama_complete_tune():
     """Play a victorious tune when Ollama completes successfully"""
     if rainbow and hasattr(rainbow, 'buzzer'):
@@ -595,6 +885,7 @@ def play_ollama_complete_tune():
         finally:
             tune_playing.clear()
 
+@hardware_owned
 def play_transcribe_tune():
     """Play a puzzle-solving pattern for transcription requests"""
     if rainbow and hasattr(rainbow, 'buzzer'):
@@ -613,6 +904,7 @@ def play_transcribe_tune():
         finally:
             tune_playing.clear()
 
+@hardware_owned
 def play_tts_tune(voice_name=None):
     """Play an announcing fanfare for TTS requests - unique tune based on voice model"""
     if rainbow and hasattr(rainbow, 'buzzer'):
@@ -700,6 +992,7 @@ def play_tts_tune(voice_name=None):
         finally:
             tune_playing.clear()
 
+@hardware_owned
 def play_bicameral_connection_tune():
     """Play a unique connecting tune representing two hemispheres joining - three-part harmony"""
     if rainbow and hasattr(rainbow, 'buzzer'):
@@ -756,6 +1049,7 @@ def play_bicameral_connection_tune():
         finally:
             tune_playing.clear()
 
+@hardware_owned
 def get_sensor_data():
     """Get sensor data from BMP280 and system"""
     data = {
@@ -812,6 +1106,7 @@ def get_sensor_data():
     return data
 
 isScrolling = False
+@hardware_owned
 def scroll_text_on_display(text, scroll_speed=0.3):
     """Scroll text across the 4-digit display"""
     global current_display_value, isScrolling
@@ -920,6 +1215,7 @@ def display_timer(start_time, stop_event, sound_fx=False):
         except Exception as e:
             print(f"Error displaying timer: {e}")
 
+@hardware_owned
 def blink_number(number, duration=4, blink_speed=0.3):
     """Blink a number on the display for specified duration"""
     global current_display_value, isScrolling
@@ -950,12 +1246,15 @@ def blink_number(number, duration=4, blink_speed=0.3):
         except Exception as e:
             print(f"Error blinking number: {e}")
 
+# Shared keep-alive connection pool for all Ollama calls: the hosts under
+# ollama_backends in config/rovernet.yaml, or just OLLAMA_HOST
+ollama = create_ollama_client()
+OLLAMA_TAGS_TIMEOUT = (ollama.timeout[0], 10)
+
 def get_model_tags():
     try:
-        res = requests.get("http://roverseer.local:11434/api/tags")
-        if res.ok:
-            tags = res.json().get("models", [])
-            return sorted(tag.get("name") for tag in tags if tag.get("name"))
+        tags = ollama.list_models(timeout=OLLAMA_TAGS_TIMEOUT)
+        return sorted(tag.get("name") for tag in tags if tag.get("name"))
     except Exception as e:
         print(f"Error fetching model tags: {e}")
     return []
@@ -1043,21 +1342,26 @@ def sort_models_by_size(models, models_info=None):
 
 def refresh_available_models():
     """Refresh the available models list from Ollama"""
-    global available_models
     models = get_model_tags()
     if models:  # Only update if we got models
         available_models = sort_models_by_size(models)
+        state_store.set("available_models", available_models)
+        get_model_sizes(refresh=True)
         print(f"Refreshed model list: {len(available_models)} models found (including PenphinMind)")
         return True
     return False
 
 def setup_button_handlers():
     """Setup button handlers for model selection and voice recording"""
-    global available_models, selected_model_index, recording_in_progress
+    global selected_model_index, recording_in_progress
     
     if not rainbow:
         return
     
+    # Open the mic now so button recordings start instantly, with pre-roll
+    if mic_ring is not None:
+        mic_ring.start()
+    
     # Initial attempt to get models with retries
     print("Fetching available models...")
     max_retries = 5
@@ -1071,12 +1375,16 @@ def setup_button_handlers():
             time.sleep(retry_delay)
     
     # If still no models, use default
-    if not available_models:
-        available_models = [DEFAULT_MODEL]
+    if not get_available_models():
+        state_store.set("available_models", [DEFAULT_MODEL])
         print(f"No models found after {max_retries} attempts, using default: {DEFAULT_MODEL}")
     
+    # Have the initially selected model loaded before the first button press
+    model_residency.select(get_available_models()[selected_model_index])
+    
     # Track which buttons are currently pressed
     buttons_pressed = {'A': False, 'B': False, 'C': False}
+    recording_start = {'position': None}  # Mic ring position when B went down
     clear_history_timer = None
     
     def check_clear_history():
@@ -1142,8 +1450,10 @@ def setup_button_handlers():
             play_sound_async(play_toggle_left_sound)
             
             # Refresh models if we only have the default
+            available_models = get_available_models() or [DEFAULT_MODEL]
             if len(available_models) == 1 and available_models[0] == DEFAULT_MODEL:
                 refresh_available_models()
+                available_models = get_available_models() or [DEFAULT_MODEL]
             
             # Cycle to previous model
             selected_model_index = (selected_model_index - 1) % len(available_models)
@@ -1167,6 +1477,9 @@ def setup_button_handlers():
             
             # Show model index after scrolling
             rainbow.display_number(selected_model_index)
+            
+            # Load the newly selected model so pressing B doesn't wait for it
+            model_residency.select(available_models[selected_model_index])
     
     def handle_button_a_release():
         """Handle button A release"""
@@ -1191,8 +1504,10 @@ def setup_button_handlers():
             play_sound_async(play_toggle_right_sound)
             
             # Refresh models if we only have the default
+            available_models = get_available_models() or [DEFAULT_MODEL]
             if len(available_models) == 1 and available_models[0] == DEFAULT_MODEL:
                 refresh_available_models()
+                available_models = get_available_models() or [DEFAULT_MODEL]
             
             # Cycle to next model
             selected_model_index = (selected_model_index + 1) % len(available_models)
@@ -1216,6 +1531,9 @@ def setup_button_handlers():
             
             # Show model index after scrolling
             rainbow.display_number(selected_model_index)
+            
+            # Load the newly selected model so pressing B doesn't wait for it
+            model_residency.select(available_models[selected_model_index])
     
     def handle_button_c_release():
         """Handle button C release"""
@@ -1240,6 +1558,10 @@ def setup_button_handlers():
         
         # LED solid on while button is held
         rainbow.button_leds['B'].on()
+        
+        # Anything said while the button is held is part of the recording
+        if mic_ring is not None:
+            recording_start['position'] = mic_ring.position()
     
     def handle_button_b_release():
         """Start the recording pipeline on button release"""
@@ -1254,7 +1576,10 @@ def setup_button_handlers():
         # Don't start LED here - let transcribe_audio handle it
         
         def recording_pipeline():
-            global recording_in_progress, current_audio_process
+            global recording_in_progress, current_voice_request
+            # Push-to-talk goes ahead of HTTP traffic in the LLM queue
+            llm_priority_context.priority = PRIORITY_VOICE
+            voice_request = CancellationToken("voice request")
             try:
                 print(f"Starting recording pipeline with MIC_DEVICE: {MIC_DEVICE}")
                 
@@ -1264,8 +1589,15 @@ def setup_button_handlers():
                 # Play confirmation sound
                 play_sound_async(play_confirmation_sound)
                 
-                # Record audio for 10 seconds
+                # Record until the speaker goes quiet (RECORD_MAX_SECONDS at most)
                 temp_recording = f"/tmp/recording_{uuid.uuid4().hex}.wav"
+                transcriber = IncrementalTranscriber() if ASR_INCREMENTAL else None
+                recording = VoiceRecording(
+                    on_segment=transcriber.add if transcriber else None,
+                    ring=mic_ring,
+                    start_position=recording_start['position']
+                )
+                recording_start['position'] = None
                 
                 # Start LED blinking for recording (Button B)
                 recording_led_blink = threading.Event()
@@ -1284,52 +1616,39 @@ def setup_button_handlers():
                 blink_thread.daemon = True
                 blink_thread.start()
                 
-                # Display countdown during recording
+                # Count down the time left: the hard cap, or the silence timeout once speech has ended
                 def show_countdown():
-                    for i in range(10, 0, -1):
-                        if rainbow:
-                            rainbow.display_number(i)
-                        time.sleep(1)
-                
-                # Start recording with arecord
-                record_cmd = [
-                    'arecord',
-                    '-D', MIC_DEVICE,
-                    '-f', 'S16_LE',
-                    '-r', '16000',
-                    '-c', '1',
-                    '-d', '10',
-                    temp_recording
-                ]
-                
-                print(f"Recording command: {' '.join(record_cmd)}")
-                
-                # Test if recording device exists
-                test_cmd = ['arecord', '-l']
-                test_result = subprocess.run(test_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                print(f"Available recording devices:\n{test_result.stdout}")
-                if test_result.stderr:
-                    print(f"Recording device test stderr: {test_result.stderr}")
+                    shown = None
+                    while not recording.done.is_set():
+                        remaining = max(0, math.ceil(recording.seconds_remaining()))
+                        if remaining != shown and rainbow:
+                            rainbow.display_number(remaining)
+                            shown = remaining
+                        time.sleep(0.1)
                 
-                # Run recording and countdown in parallel
-                record_process = subprocess.Popen(record_cmd, 
-                                                stdout=subprocess.PIPE, 
-                                                stderr=subprocess.PIPE)
+                # Test if recording device exists (the mic ring already has it open)
+                if mic_ring is None or not mic_ring.alive:
+                    test_cmd = ['arecord', '-l']
+                    test_result = subprocess.run(test_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                    print(f"Available recording devices:\n{test_result.stdout}")
+                    if test_result.stderr:
+                        print(f"Recording device test stderr: {test_result.stderr}")
                 
+                # Run recording and countdown in parallel
                 countdown_thread = threading.Thread(target=show_countdown)
                 countdown_thread.start()
                 
                 # Wait for recording to complete
-                return_code = record_process.wait()
-                stdout, stderr = record_process.communicate()
+                return_code = recording.record()
+                stderr = recording.stderr
                 
                 print(f"Recording completed with return code: {return_code}")
-                if stdout:
-                    print(f"Recording stdout: {stdout.decode()}")
                 if stderr:
                     print(f"Recording stderr: {stderr.decode()}")
                 
                 countdown_thread.join()
+                if return_code == 0 and recording.pcm:
+                    recording.save(temp_recording)
                 
                 # Stop LED blinking
                 recording_led_blink.set()
@@ -1384,16 +1703,38 @@ def setup_button_handlers():
                 # Play recording complete sound
                 play_sound_async(play_recording_complete_sound)
                 
+                # From here on a button press aborts the request (see interrupt_audio_playback)
+                current_voice_request = voice_request
+                cancel_context.token = voice_request
+                
                 # 1. Speech to Text - Start ASR LED
                 start_system_processing('A')  # Red LED for ASR
                 transcript = None
                 try:
-                    transcript = transcribe_audio(temp_recording)
+                    last_segment = recording.remaining_segment()
+                    if transcriber and (recording.segments or last_segment):
+                        # Most of the speech was transcribed while recording
+                        play_sound_async(play_transcribe_tune)
+                        asr_start = time.time()
+                        transcript = transcriber.finish(last_segment)
+                        if transcriber.failed_segments:
+                            # A segment is missing from the text - start over on the whole recording
+                            print(f"Incremental ASR failed on {transcriber.failed_segments} segment(s), "
+                                  f"transcribing the full recording")
+                            transcript = transcribe_audio(temp_recording)
+                        else:
+                            log_asr_usage(temp_recording, transcript, time.time() - asr_start)
+                            print(f"Incremental ASR: {recording.segments} segments during recording, "
+                                  f"{time.time() - asr_start:.2f}s after it ended")
+                    else:
+                        # No speech found by the endpointer - let Whisper look at all of it
+                        transcript = transcribe_audio(temp_recording)
                     os.remove(temp_recording)
                     print(f"Transcription successful: {transcript[:50]}...")
                 except Exception as e:
                     print(f"Transcription error: {e}")
                     transcript = "Hello, testing the system."
+                voice_request.check()
                 
                 # ASR complete, transition to LLM stage
                 stop_system_processing()  # This marks ASR complete
@@ -1404,30 +1745,23 @@ def setup_button_handlers():
                 play_sound_async(play_voice_intro, voice)
                 
                 # 2. Run LLM with selected model (will keep LED blinking)
-                selected_model = available_models[selected_model_index]
+                available_models = get_available_models() or [DEFAULT_MODEL]
+                selected_model = available_models[selected_model_index % len(available_models)]
+                
+                # Streamed reply tokens when the sentence pipeline is enabled
+                reply_stream = None
                 
                 # Check if PenphinMind is selected
                 if selected_model.lower() == "penphinmind":
                     # Use bicameral_chat_direct function
                     try:
                         reply = bicameral_chat_direct(transcript, voice=voice)
+                    except RequestCancelled:
+                        raise
                     except Exception as e:
                         reply = f"Bicameral processing error: {e}"
                 else:
                     # Normal single model flow
-                    # Build message history with model context
-                    messages = []
-                    
-                    # Add conversation history (including which model said what)
-                    for hist_user, hist_reply, hist_model in button_history[-MAX_BUTTON_HISTORY:]:
-                        # Include model name in assistant messages for context
-                        model_prefix = f"[{hist_model.split(':')[0]}]: " if hist_model != selected_model else ""
-                        messages.append({"role": "user", "content": hist_user})
-                        messages.append({"role": "assistant", "content": model_prefix + hist_reply})
-                    
-                    # Add current user message
-                    messages.append({"role": "user", "content": transcript})
-                    
                     # System message that includes model switching context
                     system_message = (
                         "You are RoverSeer, a helpful voice assistant. Keep responses concise and conversational. "
@@ -1436,66 +1770,34 @@ def setup_button_handlers():
                         "You can reference what other models said if asked."
                     )
                     
-                    reply = run_chat_completion(selected_model, messages, system_message)
-                
-                # Save to button history
-                button_history.append((transcript, reply, selected_model))
-                if len(button_history) > MAX_BUTTON_HISTORY * 2:  # Keep some buffer
-                    button_history.pop(0)
-                
-                print(f"Button chat history: {len(button_history)} exchanges")
+                    # Conversation history (including which model said what) plus the current message
+                    messages = button_history.build_messages(selected_model, transcript, system_message, label_models=True)
+                    
+                    if SPEECH_PIPELINE_ENABLED:
+                        reply_stream = stream_chat_completion(selected_model, messages, system_message)
+                    else:
+                        reply = run_chat_completion(selected_model, messages, system_message)
                 
                 # 3. Text to Speech with default voice
                 voice = DEFAULT_VOICE
                 
-                # Generate and play audio response
-                model_path, config_path = find_voice_files(voice)
-                tmp_wav = f"/tmp/{uuid.uuid4().hex}.wav"
-                
-                # LLM complete, transition to TTS stage
-                stop_system_processing()  # This marks LLM complete
-                start_system_processing('C')  # Start TTS stage
+                if reply_stream is None:
+                    # LLM complete, transition to TTS stage
+                    stop_system_processing()  # This marks LLM complete
+                    start_system_processing('C')  # Start TTS stage
                 play_sound_async(play_tts_tune, voice)
                 
-                # Sanitize text for speech
-                clean_reply = sanitize_for_speech(reply)
+                # Sanitize and speak sentence by sentence (while the LLM is still generating when streaming)
+                reply = speak_streamed_reply(reply_stream if reply_stream is not None else [reply], voice)
                 
-                tts_start_time = time.time()
-                tts_result = subprocess.run(
-                    ["/home/codemusic/roverseer_venv/bin/piper",
-                     "--model", model_path,
-                     "--config", config_path,
-                     "--output_file", tmp_wav],
-                    input=clean_reply.encode(),
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                tts_processing_time = time.time() - tts_start_time
+                # Save to button history
+                button_history.append(transcript, reply, selected_model)
                 
-                if tts_result.returncode == 0:
-                    # Log TTS usage
-                    log_tts_usage(voice, clean_reply, tmp_wav, tts_processing_time)
-                    
-                    # TTS complete, transition to audio playback
-                    stop_system_processing()  # This marks TTS complete
-                    start_system_processing('aplay')
-                    
-                    # Play the audio response using Popen to make it interruptible
-                    current_audio_process = subprocess.Popen(
-                        ["aplay", "-D", AUDIO_DEVICE, tmp_wav],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                    
-                    # Wait for playback to complete
-                    current_audio_process.wait()
-                    current_audio_process = None
-                    
-                    os.remove(tmp_wav)
-                    
-                    # All complete - stop resets everything
-                    stop_system_processing()
+                print(f"Button chat history: {len(button_history)} exchanges")
 
+            except RequestCancelled as e:
+                print(f"Recording pipeline stopped: {e}")
+                reset_pipeline_stages()
             except Exception as e:
                 print(f"Error in recording pipeline: {e}")
                 import traceback
@@ -1513,6 +1815,12 @@ def setup_button_handlers():
             finally:
                 # Reset recording flag
                 recording_in_progress = False
+                current_voice_request = None
+                cancel_context.token = None
+                
+                # Stop a transcriber the pipeline bailed out on
+                if 'transcriber' in locals() and transcriber:
+                    transcriber.close()
                 
                 # Make sure LED blinking is stopped
                 if 'recording_led_blink' in locals():
@@ -1621,6 +1929,7 @@ def play_toggle_right_echo():
         except Exception as e:
             print(f"Error playing toggle right echo: {e}")
 
+@hardware_owned
 def start_system_processing(led_color='B'):
     """Start the current blinking LED and mark stage as active"""
     global system_processing, pipeline_stages, processing_led_thread
@@ -1643,6 +1952,7 @@ def start_system_processing(led_color='B'):
     processing_led_thread.daemon = True
     processing_led_thread.start()
 
+@hardware_owned
 def stop_system_processing():
     """Stop the current blinking LED and mark stage as complete"""
     global system_processing, pipeline_stages
@@ -1760,13 +2070,177 @@ def sanitize_for_speech(text):
     
     return result
 
+# -------- PENPHINMIND ENSEMBLE ENGINE -------- #
+# Minds run in parallel on a shared pool. Minds still pending when a timeout or
+# the latency budget ends the wait are cancelled, which stops their generation.
+ensemble_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="mind")
+
+def build_convergence_prompt(prompt, responses, system=""):
+    """Build the convergence request that merges every mind's response"""
+    inputs = "\n\n".join(f"Input {i}:\n{response}" for i, response in enumerate(responses, 1))
+    convergence_prompt = f"""[IMPORTANT: You are a unified intelligence — a balanced mind that merges diverse perspectives into a single, coherent, and actionable insight.
+
+Draw equally from all provided inputs, honoring each viewpoint without bias or preference. Your goal is not to summarize or compare, but to integrate — forming a new whole that speaks with clarity, depth, and nuance.
+
+Respond as a single voice. 
+Do not mention or describe the original perspectives. 
+Do not reflect on your own reasoning process. 
+Simply provide the final, synthesized insight as your complete response.]
+
+[Original request:
+{prompt}
+
+{inputs}]"""
+    
+    # If system message provided, prepend it
+    if system:
+        return system + ". " + convergence_prompt
+    return convergence_prompt
+
+def converge_by_synthesis(prompt, system, results):
+    """One of the responding models merges all perspectives (the original PenphinMind step)"""
+    model = random.choice([result["model"] for result in results])
+    messages = [{"role": "user", "content": build_convergence_prompt(prompt, [result["response"] for result in results], system)}]
+    return run_chat_completion(model, messages, convergence_message, skip_logging=True), model
+
+def converge_with_fastest(prompt, system, results):
+    """Skip the extra generation and answer with whichever mind returned first"""
+    fastest = min(results, key=lambda result: result["time"])
+    return fastest["response"], fastest["model"]
+
+# Convergence step: fn(prompt, system, results) -> (final_response, convergence_model)
+CONVERGENCE_STRATEGIES = {
+    "synthesize": converge_by_synthesis,
+    "fastest": converge_with_fastest
+}
+
+def run_ensemble(prompt, system="", minds=None, mind_timeout=ENSEMBLE_MIND_TIMEOUT,
+                 latency_budget=ENSEMBLE_LATENCY_BUDGET, min_responses=1, convergence="synthesize"):
+    """
+    Ask every mind for its perspective concurrently, then converge the answers.
+    
+    minds: list of {"name", "model", "system"} dicts (defaults to ENSEMBLE_MINDS)
+    mind_timeout: seconds after which a mind that hasn't answered is left out
+    latency_budget: once this many seconds have passed and at least min_responses
+        minds have answered, converge with what has returned so far
+    convergence: key into CONVERGENCE_STRATEGIES
+    
+    Returns a dict with per-mind results, the final response and timings.
+    Raises RequestCancelled if the calling thread's cancellation token fires.
+    """
+    
+    minds = minds or ENSEMBLE_MINDS
+    converge = CONVERGENCE_STRATEGIES[convergence]
+    ensemble_start_time = time.time()
+    # Pool threads don't inherit the caller's priority or cancellation token
+    priority = current_llm_priority()
+    cancel = current_cancel_token()
+    # The minds' own token: cancelled with the caller's, or to stop minds left behind
+    minds_cancel = CancellationToken("ensemble minds")
+    
+    def ask_mind(mind):
+        mind_start_time = time.time()
+        mind_messages = [{"role": "user", "content": prompt}]
+        mind_response = run_chat_completion(mind["model"], mind_messages, mind.get("system"), skip_logging=True, feedback=False,
+                                            priority=priority, cancel=minds_cancel)
+        return mind_response, time.time() - mind_start_time
+    
+    results = [
+        {"name": mind.get("name", f"Mind {i}"), "model": mind["model"], "status": "timeout", "response": None, "time": None}
+        for i, mind in enumerate(minds, 1)
+    ]
+    
+    # One scroll + timer on the display covers all minds
+    start_time, stop_timer = begin_llm_feedback(minds[0]["model"], skip_logging=True)
+    
+    futures = {ensemble_executor.submit(ask_mind, mind): result for mind, result in zip(minds, results)}
+    pending = set(futures)
+    answered = []
+    errors = []
+    mind_deadline = ensemble_start_time + mind_timeout
+    budget_deadline = ensemble_start_time + latency_budget if latency_budget else None
+    
+    # Resolves on cancel so the wait below wakes up for it too
+    cancelled = Future()
+    
+    def on_caller_cancel():
+        cancelled.set_result(True)
+        minds_cancel.cancel(cancel.reason)
+    
+    cancel_callback = cancel.on_cancel(on_caller_cancel) if cancel is not None else None
+    
+    while pending:
+        wait_until = mind_deadline
+        if budget_deadline and len(answered) >= min_responses:
+            wait_until = min(wait_until, budget_deadline)
+        
+        done, _ = wait(pending | {cancelled}, timeout=max(0, wait_until - time.time()), return_when=FIRST_COMPLETED)
+        if not done or cancelled.done():
+            break  # Out of time (converge with what we have) or cancelled
+        pending -= done
+        
+        for future in done:
+            result = futures[future]
+            try:
+                result["response"], result["time"] = future.result()
+                result["status"] = "ok"
+                answered.append(result)
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+                errors.append(e)
+    
+    stop_timer.set()
+    if cancel_callback is not None:
+        cancel.remove_callback(cancel_callback)
+    if pending:
+        # Out of time or cancelled: minds still queued never start, running ones stop generating
+        for future in pending:
+            future.cancel()
+        minds_cancel.cancel("left out of the ensemble")
+    if cancelled.done():
+        stop_system_processing()
+        cancel.check()
+    
+    if not answered:
+        stop_system_processing()
+        if errors:
+            raise errors[0]
+        raise Exception(f"No mind responded within {mind_timeout:.0f}s")
+    
+    finish_llm_feedback(minds[0]["model"], None, prompt, "", start_time, stop_timer, skip_logging=True)
+    
+    # Converge (a single answer needs no merging)
+    convergence_start_time = time.time()
+    if len(answered) == 1:
+        final_response, convergence_model = answered[0]["response"], answered[0]["model"]
+    else:
+        final_response, convergence_model = converge(prompt, system, answered)
+    convergence_time = time.time() - convergence_start_time
+    total_time = time.time() - ensemble_start_time
+    state_store.set("convergence_model", convergence_model)  # Last model to converge, for /stats
+    
+    # Log PenphinMind usage
+    log_penphin_mind_usage(
+        results, convergence_model,
+        f"Bicameral processing for: {prompt[:50]}...", prompt,
+        final_response, convergence_time, total_time
+    )
+    
+    return {
+        "minds": results,
+        "final_response": final_response,
+        "convergence_model": convergence_model,
+        "convergence_strategy": convergence,
+        "convergence_time": round(convergence_time, 2),
+        "total_time": round(total_time, 2)
+    }
+
 def bicameral_chat_direct(prompt, system="", voice=DEFAULT_VOICE):
     """
     Direct bicameral processing without HTTP overhead.
     Returns the final synthesis text.
     """
-    global convergence_model
-    
     if not prompt.strip():
         raise ValueError("No prompt provided")
 
@@ -1774,78 +2248,10 @@ def bicameral_chat_direct(prompt, system="", voice=DEFAULT_VOICE):
         # Play the unique bicameral connection tune
         play_sound_async(play_bicameral_connection_tune)
         
-        # Randomly decide which model will handle convergence
-        convergence_model = random.choice([logical_model, creative_model])
-        first_model = logical_model if convergence_model == creative_model else creative_model
-        
-        # 1. Send to First Mind
-        first_start_time = time.time()
-        first_messages = [{"role": "user", "content": prompt}]
-        first_system = logical_message if first_model == logical_model else creative_message
-        
-        first_response = run_chat_completion(first_model, first_messages, first_system, skip_logging=True)
-        first_time = time.time() - first_start_time
-        
-        # Keep LLM LED state, don't stop
-        time.sleep(0.5)  # Brief pause between minds
-        
-        # 2. Send to Second Mind (which will also handle convergence)
-        second_start_time = time.time()
-        second_messages = [{"role": "user", "content": prompt}]
-        second_system = logical_message if convergence_model == logical_model else creative_message
-        
-        second_response = run_chat_completion(convergence_model, second_messages, second_system, skip_logging=True)
-        second_time = time.time() - second_start_time
-        
-        # Keep LLM LED state, don't stop
-        time.sleep(0.5)  # Brief pause before convergence
-        
-        # 3. Send all to Convergence Mind (using the same model as second mind)
-        convergence_start_time = time.time()
-        
-        # Build convergence prompt base
-        convergence_prompt_base = f"""
-                    [IMPORTANT: You are a unified intelligence — a balanced mind that merges diverse perspectives into a single, coherent, and actionable insight.
-
-                    Draw equally from all provided inputs, honoring each viewpoint without bias or preference. Your goal is not to summarize or compare, but to integrate — forming a new whole that speaks with clarity, depth, and nuance.
-
-                    Respond as a single voice. 
-                    Do not mention or describe the original perspectives. 
-                    Do not reflect on your own reasoning process. 
-                    Simply provide the final, synthesized insight as your complete response.]
-
-                [Original request:
-                {prompt}
-
-                Input 1:
-                {first_response}
-
-                Input 2:
-                {second_response}]"""
-        
-        # If system message provided, prepend it
-        if system:
-            convergence_prompt = system + ". " + convergence_prompt_base
-        else:
-            convergence_prompt = convergence_prompt_base
-        
-        convergence_messages = [{"role": "user", "content": convergence_prompt}]
-
-        final_response = run_chat_completion(convergence_model, convergence_messages, convergence_message, skip_logging=True)
-        convergence_time = time.time() - convergence_start_time
-        
-        # Log PenphinMind usage
-        bicameral_system_message = f"Bicameral processing for: {prompt[:50]}..."
-        log_penphin_mind_usage(
-            first_model, convergence_model, convergence_model,
-            bicameral_system_message, prompt,
-            first_response, first_time,
-            second_response, second_time,
-            final_response, convergence_time
-        )
-        
-        return final_response
+        return run_ensemble(prompt, system)["final_response"]
         
+    except RequestCancelled:
+        raise
     except Exception as e:
         error_msg = str(e)
         if "Connection refused" in error_msg:
@@ -1880,39 +2286,479 @@ def check_tcp_ports():
         sock.close()
     return results
 
-whisper_model = WhisperModel("base", compute_type="int8")  # or "medium" if you want higher quality
+# -------- VOICE ACTIVITY RECORDING -------- #
+# The button recording streams raw mic PCM through an energy endpointer and
+# stops once the speaker has been quiet for VAD_SILENCE_SECONDS, instead of
+# always recording for RECORD_MAX_SECONDS (which is kept as a hard cap).
+RECORD_SAMPLE_RATE = 16000
+RECORD_MAX_SECONDS = float(os.environ.get("ROVERSEER_RECORD_MAX_S", "10"))
+VAD_ENABLED = os.environ.get("ROVERSEER_VAD", "1") != "0"
+VAD_SILENCE_SECONDS = float(os.environ.get("ROVERSEER_VAD_SILENCE_S", "1.0"))
+VAD_NO_SPEECH_SECONDS = float(os.environ.get("ROVERSEER_VAD_NO_SPEECH_S", "5"))  # Give up if nobody speaks
+VAD_FRAME_MS = 30
+VAD_MIN_SPEECH_SECONDS = 0.2  # Speech needed before trailing silence can end the recording
+VAD_ENERGY_RATIO = 3.0        # Speech is this much louder than the noise floor...
+VAD_MIN_RMS = 300             # ...and at least this loud (int16 RMS)
+VAD_NOISE_ADAPT = 0.05        # How fast the noise floor follows quiet frames
+# Incremental ASR: speech is cut into segments at short pauses and transcribed while recording continues
+ASR_INCREMENTAL = os.environ.get("ROVERSEER_INCREMENTAL_ASR", "1") != "0"
+ASR_SEGMENT_PAUSE_SECONDS = min(0.35, VAD_SILENCE_SECONDS / 2)
+ASR_MIN_SEGMENT_SECONDS = 1.0  # Whisper does poorly on tiny fragments
+ASR_PROMPT_CHARS = 200         # Earlier text passed as initial_prompt for continuity
+# Optional always-open mic: recordings are slices of a ring buffer, starting a little before the press
+MIC_RING_ENABLED = os.environ.get("ROVERSEER_MIC_RING", "0") == "1"
+MIC_PREROLL_SECONDS = float(os.environ.get("ROVERSEER_MIC_PREROLL_S", "0.5"))
+MIC_RING_SECONDS = RECORD_MAX_SECONDS + 20  # A whole recording plus time the button is held
+MIC_RING_RESTART_DELAY = 1.0
+
+class EnergyEndpointer:
+    """
+    Frame-energy voice activity detector. The noise floor tracks quiet frames;
+    a frame is speech when its RMS clears both the floor ratio and VAD_MIN_RMS.
+    """
+    
+    def __init__(self, sample_rate=RECORD_SAMPLE_RATE, silence_seconds=VAD_SILENCE_SECONDS,
+                 max_seconds=RECORD_MAX_SECONDS, no_speech_seconds=VAD_NO_SPEECH_SECONDS):
+        self.frame_seconds = VAD_FRAME_MS / 1000
+        self.frame_bytes = int(sample_rate * self.frame_seconds) * 2
+        self.silence_seconds = silence_seconds
+        self.max_seconds = max_seconds
+        self.no_speech_seconds = no_speech_seconds
+        self.noise_floor = None
+        self.elapsed = 0.0
+        self.speech_seconds = 0.0
+        self.trailing_silence = 0.0
+        self.speech_frame = False
+    
+    @property
+    def heard_speech(self):
+        return self.speech_seconds >= VAD_MIN_SPEECH_SECONDS
+    
+    def feed(self, frame):
+        """Process one frame of int16 PCM; returns whether it was speech"""
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+        if self.noise_floor is None:
+            # Start no higher than the absolute threshold in case the first frame is already speech
+            self.noise_floor = min(rms, VAD_MIN_RMS / VAD_ENERGY_RATIO)
+        
+        self.speech_frame = rms >= max(VAD_MIN_RMS, self.noise_floor * VAD_ENERGY_RATIO)
+        if self.speech_frame:
+            self.speech_seconds += self.frame_seconds
+            self.trailing_silence = 0.0
+        else:
+            self.noise_floor += (rms - self.noise_floor) * VAD_NOISE_ADAPT
+            self.trailing_silence += self.frame_seconds
+        self.elapsed += self.frame_seconds
+        return self.speech_frame
+    
+    def seconds_remaining(self):
+        """Time until the recording stops if nothing changes, for the countdown"""
+        remaining = self.max_seconds - self.elapsed
+        if self.heard_speech:
+            remaining = min(remaining, self.silence_seconds - self.trailing_silence)
+        else:
+            remaining = min(remaining, self.no_speech_seconds - self.elapsed)
+        return remaining
+
+class MicRingBuffer:
+    """
+    Keeps MIC_DEVICE open and the last MIC_RING_SECONDS of audio in a numpy
+    int16 ring. Positions are absolute sample counts since capture started,
+    so a recording can begin at a position from before the button press.
+    """
+    
+    def __init__(self, device=None, seconds=MIC_RING_SECONDS, sample_rate=RECORD_SAMPLE_RATE):
+        self.device = device or MIC_DEVICE
+        self.sample_rate = sample_rate
+        self.ring = np.zeros(int(seconds * sample_rate), dtype=np.int16)
+        self.written = 0
+        self.condition = threading.Condition()
+        self.process = None
+        self.running = False
+        self.restarts = 0
+    
+    @property
+    def alive(self):
+        return self.running and self.process is not None and self.process.poll() is None
+    
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        threading.Thread(target=self.capture, daemon=True).start()
+        print(f"Mic ring buffer capturing from {self.device} ({len(self.ring) / self.sample_rate:.0f}s)")
+    
+    def stop(self):
+        self.running = False
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+        with self.condition:
+            self.condition.notify_all()
+    
+    def capture(self):
+        chunk_bytes = int(self.sample_rate * VAD_FRAME_MS / 1000) * 2
+        while self.running:
+            self.process = subprocess.Popen(
+                ['arecord', '-q', '-D', self.device, '-f', 'S16_LE',
+                 '-r', str(self.sample_rate), '-c', '1', '-t', 'raw'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            while self.running:
+                data = self.process.stdout.read(chunk_bytes)
+                if len(data) < 2:
+                    break
+                self.append(np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16))
+            if self.process.poll() is None:
+                self.process.terminate()
+            self.process.wait()
+            if self.running:
+                self.restarts += 1
+                print(f"Mic ring capture stopped, restarting in {MIC_RING_RESTART_DELAY:.0f}s")
+                time.sleep(MIC_RING_RESTART_DELAY)
+    
+    def append(self, samples):
+        with self.condition:
+            start = self.written % len(self.ring)
+            first = min(len(samples), len(self.ring) - start)
+            self.ring[start:start + first] = samples[:first]
+            self.ring[:len(samples) - first] = samples[first:]
+            self.written += len(samples)
+            self.condition.notify_all()
+    
+    def position(self):
+        with self.condition:
+            return self.written
+    
+    def read(self, start, count, timeout=1.0):
+        """
+        Samples [start, start + count) as PCM bytes, waiting for them to be
+        captured. Returns (pcm, next_start), or None if capture stalled. A start
+        that has already left the ring moves up to the oldest sample kept.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.written >= start + count or not self.running, timeout)
+            if self.written < start + count:
+                return None
+            start = max(start, self.written - len(self.ring))
+            pcm = self.ring.take(np.arange(start, start + count), mode="wrap").tobytes()
+            return pcm, start + count
+
+mic_ring = MicRingBuffer() if MIC_RING_ENABLED else None
+
+class VoiceRecording:
+    """
+    One push-to-talk recording from MIC_DEVICE. arecord writes raw PCM to a
+    pipe (or, with the mic ring running, frames are sliced from the ring from
+    start_position minus the pre-roll), the endpointer decides when to stop,
+    and the PCM is kept in memory.
+    With on_segment, each stretch of speech ending in a pause is handed over
+    as soon as the pause is heard, so it can be transcribed during recording.
+    """
+    
+    def __init__(self, device=None, max_seconds=RECORD_MAX_SECONDS, use_vad=VAD_ENABLED, on_segment=None,
+                 ring=None, start_position=None):
+        self.device = device or MIC_DEVICE
+        self.ring = ring
+        self.start_position = start_position
+        self.endpointer = EnergyEndpointer(max_seconds=max_seconds)
+        self.use_vad = use_vad
+        self.on_segment = on_segment
+        self.pcm = bytearray()
+        self.segment_start = 0  # Byte offset of audio not yet handed to on_segment
+        self.segment_has_speech = False
+        self.segments = 0
+        self.done = threading.Event()
+        self.process = None
+        self.return_code = None
+        self.stderr = b""
+        self.stop_reason = None
+    
+    def seconds_remaining(self):
+        if self.use_vad:
+            return self.endpointer.seconds_remaining()
+        return self.endpointer.max_seconds - self.endpointer.elapsed
+    
+    def record(self):
+        """Record until end of speech or the hard cap; returns arecord's status (0 when we stopped it)"""
+        if self.ring is not None and self.ring.alive:
+            return self.record_from_ring()
+        
+        record_cmd = [
+            'arecord', '-q',
+            '-D', self.device,
+            '-f', 'S16_LE',
+            '-r', str(RECORD_SAMPLE_RATE),
+            '-c', '1',
+            '-t', 'raw',
+            '-d', str(int(math.ceil(self.endpointer.max_seconds)) + 1),  # Backstop if we stop reading
+        ]
+        print(f"Recording command: {' '.join(record_cmd)}")
+        self.process = subprocess.Popen(record_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            frame_bytes = self.endpointer.frame_bytes
+            while True:
+                frame = self.process.stdout.read(frame_bytes)
+                if len(frame) < frame_bytes:
+                    self.stop_reason = "device closed"
+                    break
+                if self.add_frame(frame):
+                    break
+        finally:
+            stopped_early = self.process.poll() is None
+            if stopped_early:
+                self.process.terminate()
+            self.return_code = self.process.wait()
+            self.stderr = self.process.stderr.read()
+            self.done.set()
+        
+        if stopped_early and self.pcm:
+            self.return_code = 0  # We ended it; SIGTERM isn't a failure
+        self.report()
+        return self.return_code
+    
+    def record_from_ring(self):
+        """Take frames from the mic ring - the device is already open, so nothing is clipped"""
+        now = self.ring.position()
+        start = min(now if self.start_position is None else self.start_position, now)
+        start = max(0, start - int(MIC_PREROLL_SECONDS * RECORD_SAMPLE_RATE))
+        # The cap, no-speech timeout and countdown run from now; earlier audio is a head start
+        self.endpointer.elapsed = -(now - start) / RECORD_SAMPLE_RATE
+        frame_samples = self.endpointer.frame_bytes // 2
+        try:
+            while True:
+                result = self.ring.read(start, frame_samples)
+                if result is None:
+                    self.stop_reason = "device closed"
+                    break
+                frame, start = result
+                if self.add_frame(frame):
+                    break
+        finally:
+            self.done.set()
+        
+        self.return_code = 0 if self.pcm else 1
+        self.report()
+        return self.return_code
+    
+    def add_frame(self, frame):
+        """Keep and analyse one frame; returns True when the recording should stop"""
+        self.pcm.extend(frame)
+        if self.endpointer.feed(frame):
+            self.segment_has_speech = True
+        elif self.on_segment and self.segment_ended():
+            self.cut_segment()
+        if self.seconds_remaining() > 0:
+            return False
+        if self.endpointer.elapsed >= self.endpointer.max_seconds:
+            self.stop_reason = "time limit"
+        else:
+            self.stop_reason = "end of speech" if self.endpointer.heard_speech else "no speech"
+        return True
+    
+    def report(self):
+        print(f"Recorded {len(self.pcm) / (RECORD_SAMPLE_RATE * 2):.1f}s ({self.stop_reason}), "
+              f"speech {self.endpointer.speech_seconds:.1f}s")
+    
+    def segment_ended(self):
+        long_enough = len(self.pcm) - self.segment_start >= ASR_MIN_SEGMENT_SECONDS * RECORD_SAMPLE_RATE * 2
+        return self.segment_has_speech and long_enough and self.endpointer.trailing_silence >= ASR_SEGMENT_PAUSE_SECONDS
+    
+    def cut_segment(self):
+        segment = bytes(self.pcm[self.segment_start:])
+        self.segment_start = len(self.pcm)
+        self.segment_has_speech = False
+        self.segments += 1
+        self.on_segment(segment)
+    
+    def remaining_segment(self):
+        """Audio after the last cut, or None if there was no speech in it"""
+        if not self.segment_has_speech:
+            return None
+        return bytes(self.pcm[self.segment_start:])
+    
+    def save(self, output_path):
+        write_wav_file(output_path, bytes(self.pcm), RECORD_SAMPLE_RATE)
+
+# -------- SPEECH RECOGNITION -------- #
+WHISPER_MODEL_SIZE = "base"  # or "medium" if you want higher quality
+WHISPER_COMPUTE_TYPE = "int8"
+
+# One set of Whisper models per machine: ROVERSEER_ASR_WORKERS processes (see
+# asr_service.py, started on the first job) or, with 0, a model in this process.
+# Both live in the standalone process or the hardware owner; http workers load
+# nothing and send audio to the owner (whisper_transcribe is hardware_owned).
+whisper_model = None
+whisper_model_lock = threading.Lock()  # Load at most one fallback model
+asr_pool = None
+if ROVERSEER_ROLE != "http":
+    if ASR_WORKERS > 0:
+        asr_pool = ASRWorkerPool(ASR_WORKERS, WHISPER_MODEL_SIZE, WHISPER_COMPUTE_TYPE)
+    else:
+        whisper_model = WhisperModel(WHISPER_MODEL_SIZE, compute_type=WHISPER_COMPUTE_TYPE)
 
-def transcribe_audio(file_path):
+@hardware_owned
+def whisper_transcribe(audio, **options):
+    """Text of audio (a path or float32 16 kHz samples) from the worker pool, or from the in-process model"""
+    global whisper_model
+    if asr_pool is not None:
+        try:
+            return asr_pool.transcribe(audio, **options)
+        except ASRUnavailable as e:
+            print(f"ASR pool unavailable ({e}), transcribing in-process")
+    with whisper_model_lock:
+        if whisper_model is None:
+            whisper_model = WhisperModel(WHISPER_MODEL_SIZE, compute_type=WHISPER_COMPUTE_TYPE)
+    segments, info = whisper_model.transcribe(audio, **options)
+    return " ".join([segment.text for segment in segments])
+
+@hardware_owned
+def asr_stats():
+    return asr_pool.stats() if asr_pool else None
+
+def transcribe_audio(audio, log_name=None):
+    """Transcribe a file path, or float32 16 kHz mono samples (log_name names them in the ASR log)"""
     # Don't start LED here - caller should handle LED state
     play_sound_async(play_transcribe_tune)  # Play tune asynchronously when transcribing
     start_time = time.time()
-    segments, info = whisper_model.transcribe(file_path)
-    transcript = " ".join([segment.text for segment in segments])
+    transcript = whisper_transcribe(audio)
     processing_time = time.time() - start_time
     
     # Log ASR usage
-    log_asr_usage(file_path, transcript, processing_time)
+    log_asr_usage(log_name or audio, transcript, processing_time)
     
     return transcript
 
-def run_chat_completion(model, messages, system_message=None, skip_logging=False):
-    # Don't start LED here - caller should have already set correct LED state
-    play_sound_async(play_ollama_tune, model)  # Play curious tune asynchronously
+def pcm_to_float32(pcm):
+    """16-bit PCM bytes to the float32 samples Whisper takes directly"""
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+def transcribe_samples(samples, initial_prompt=None):
+    return " ".join(whisper_transcribe(samples, initial_prompt=initial_prompt).split())
+
+class IncrementalTranscriber:
+    """
+    Transcribes speech segments in order on a background thread while the
+    recording continues. finish() adds the last segment and waits, so only
+    audio after the final pause is left to transcribe once recording ends.
+    Segments Whisper failed on are counted in failed_segments; the transcript
+    is then missing words and the caller should transcribe the whole recording.
+    """
     
-    # Start timer and display handling
-    start_time = time.time()
-    stop_timer = threading.Event()
+    def __init__(self):
+        self.segments = queue.Queue()
+        self.texts = []
+        self.failed_segments = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
     
-    # Extract model name (before the colon if present)
-    model_display_name = model.split(':')[0] if ':' in model else model
+    def add(self, pcm):
+        self.segments.put(pcm)
     
-    if skip_logging: #hack
-        model_display_name = "PenphinMind"
+    def run(self):
+        while True:
+            pcm = self.segments.get()
+            if pcm is None:
+                break
+            try:
+                # Earlier text keeps Whisper's spelling and casing consistent across segments
+                prompt = " ".join(self.texts)[-ASR_PROMPT_CHARS:] or None
+                text = transcribe_samples(pcm_to_float32(pcm), initial_prompt=prompt)
+                if text:
+                    self.texts.append(text)
+            except Exception as e:
+                self.failed_segments += 1
+                print(f"Incremental transcription error: {e}")
     
-    # Extract user prompt from last message
-    user_prompt = ""
-    if messages and messages[-1].get("role") == "user":
-        user_prompt = messages[-1].get("content", "")
+    def finish(self, last_pcm=None):
+        """Transcribe last_pcm after everything queued and return the whole transcript"""
+        if last_pcm:
+            self.add(last_pcm)
+        self.close()
+        self.thread.join()
+        return " ".join(self.texts)
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.segments.put(None)
+
+# Uploaded audio is decoded in memory straight to Whisper's input format
+WHISPER_SAMPLE_RATE = 16000
+UPLOAD_MAX_BYTES = int(float(os.environ.get("ROVERSEER_UPLOAD_MAX_MB", "25")) * 1024 * 1024)
+
+class AudioUploadError(Exception):
+    """An audio upload that is too large or can't be decoded"""
+    
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def audio_upload_error_response(error):
+    return jsonify({"error": str(error)}), error.status
+
+def upload_too_large_error():
+    return AudioUploadError(f"Upload exceeds {UPLOAD_MAX_BYTES // (1024 * 1024)} MB", status=413)
+
+def read_upload(file):
+    """The uploaded file's bytes (already held in memory, within MAX_CONTENT_LENGTH)"""
+    data = file.stream.read()
+    if not data:
+        raise AudioUploadError("Uploaded audio file is empty")
+    return data
+
+def decode_wav_samples(data):
+    """16 kHz PCM WAV to float32 mono, or None when it needs the general decoder"""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav_file:
+            channels = wav_file.getnchannels()
+            sample_width = wav_file.getsampwidth()
+            if wav_file.getframerate() != WHISPER_SAMPLE_RATE or sample_width not in (2, 4):
+                return None  # Resampling and odd sample formats go through decode_audio
+            frames = wav_file.readframes(wav_file.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    dtype, scale = (np.int16, 32768.0) if sample_width == 2 else (np.int32, 2147483648.0)
+    samples = np.frombuffer(frames[:len(frames) // (sample_width * channels) * sample_width * channels], dtype=dtype)
+    samples = samples.astype(np.float32) / scale
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+def decode_audio_upload(file):
+    """
+    Decode an uploaded audio file to float32 16 kHz mono without touching disk.
+    Plain 16 kHz WAV is converted with numpy; anything else (other rates,
+    mp3, m4a, webm...) is decoded and resampled by faster-whisper's PyAV decoder.
+    """
+    data = read_upload(file)
+    samples = decode_wav_samples(data)
+    if samples is None:
+        try:
+            samples = decode_audio(io.BytesIO(data), sampling_rate=WHISPER_SAMPLE_RATE)
+        except Exception as e:
+            raise AudioUploadError(f"Could not decode audio: {e}")
+    if len(samples) == 0:
+        raise AudioUploadError("Uploaded audio contains no samples")
+    return samples
+
+def transcribe_upload(file):
+    return transcribe_audio(decode_audio_upload(file), log_name=f"upload:{file.filename or 'audio'}")
+
+# -------- LLM FEEDBACK DISPLAY -------- #
+# Model name scroll + elapsed-time displays running on the hardware owner, by id
+feedback_displays = {}
+
+@hardware_owned
+def start_feedback_display(model_display_name, start_time):
+    """Scroll the model name, then count seconds from start_time until stop_feedback_display"""
+    display_id = uuid.uuid4().hex
+    stop_timer = threading.Event()
+    feedback_displays[display_id] = stop_timer
     
     # Start a thread to handle display
     def display_handler():
@@ -1935,174 +2781,2005 @@ def run_chat_completion(model, messages, system_message=None, skip_logging=False
         
         # Then show the timer with sound effects (now that tune is done)
         display_timer(start_time, stop_timer, sound_fx=True)
+        feedback_displays.pop(display_id, None)
     
     display_thread = threading.Thread(target=display_handler)
     display_thread.daemon = True
     display_thread.start()
     
-    try:
-        if system_message and not any(msg.get("role") == "system" for msg in messages):
-            messages.insert(0, {"role": "system", "content": system_message})
+    return display_id
 
-        response = requests.post(
-            "http://localhost:11434/api/chat",
-            headers={"Content-Type": "application/json"},
-            json={
-                "model": model, 
-                "messages": messages,
-                "stream": False
-            }
-        )
-        response.raise_for_status()
-        
-        # Debug: Check what we actually got from Ollama
-        if not response.text.strip():
-            raise Exception(f"Ollama returned empty response for model {model}")
-        
+@hardware_owned
+def stop_feedback_display(display_id):
+    stop_timer = feedback_displays.pop(display_id, None)
+    if stop_timer:
+        stop_timer.set()
+
+class FeedbackTimer:
+    """Handle for a feedback display; set() stops it like the threading.Event it replaces"""
+    
+    def __init__(self, display_id):
+        self.display_id = display_id
+        self.stopped = False
+    
+    def set(self):
+        if not self.stopped:
+            self.stopped = True
+            stop_feedback_display(self.display_id)
+    
+    def is_set(self):
+        return self.stopped
+
+def begin_llm_feedback(model, skip_logging=False):
+    """Play the Ollama tune and start the model name scroll + timer display.
+
+    Returns (start_time, stop_timer) for use with finish_llm_feedback.
+    """
+    play_sound_async(play_ollama_tune, model)  # Play curious tune asynchronously
+    
+    # Start timer and display handling
+    start_time = time.time()
+    
+    # Extract model name (before the colon if present)
+    model_display_name = model.split(':')[0] if ':' in model else model
+    
+    if skip_logging: #hack
+        model_display_name = "PenphinMind"
+    
+    stop_timer = FeedbackTimer(start_feedback_display(model_display_name, start_time))
+    return start_time, stop_timer
+
+def finish_llm_feedback(model, system_message, user_prompt, result, start_time, stop_timer, skip_logging=False, prompt_chars=None):
+    """Stop the timer, log the completion and blink the elapsed time"""
+    # Stop timer and calculate elapsed time
+    stop_timer.set()
+    elapsed_time = time.time() - start_time
+    
+    # Only log if not part of PenphinMind
+    if not skip_logging:
+        # Log LLM usage
+        log_llm_usage(model, system_message or "Default system message", user_prompt, result, elapsed_time)
+        
+        # Update model runtime statistics
+        update_model_runtime(model, elapsed_time, prompt_chars)
+    
+    # Play victory tune
+    play_sound_async(play_ollama_complete_tune)  # Play victory tune asynchronously
+    
+    # Blink the elapsed time in a separate thread (non-blocking)
+    def blink_async():
+        blink_number(int(elapsed_time), duration=4, blink_speed=0.3)
+    
+    blink_thread = threading.Thread(target=blink_async)
+    blink_thread.daemon = True
+    blink_thread.start()
+    
+    return elapsed_time
+
+# -------- LLM RESPONSE CACHE -------- #
+def make_chat_request_key(model, messages, system_message=None, options=None):
+    """Hash a chat request the same way run_chat_completion will send it"""
+    normalized = [
+        {"role": msg.get("role", "user"), "content": " ".join(str(msg.get("content", "")).split())}
+        for msg in messages
+    ]
+    if system_message and not any(msg["role"] == "system" for msg in normalized):
+        normalized.insert(0, {"role": "system", "content": " ".join(system_message.split())})
+    
+    key_data = json.dumps({"model": model, "messages": normalized, "options": options or {}}, sort_keys=True)
+    return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("ROVERSEER_RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.environ.get("ROVERSEER_RESPONSE_CACHE_TTL", "3600"))
+# Persist cached replies across restarts (off by default)
+RESPONSE_CACHE_FILE = LOG_DIR / "response_cache.json" if os.environ.get("ROVERSEER_RESPONSE_CACHE_DISK", "0") == "1" else None
+
+class ResponseCache:
+    """
+    Exact-match cache of LLM replies with a TTL.
+    Keyed by hash of (model, system message, normalized messages, sampling options),
+    evicted least-recently-used by entry count, optionally mirrored to a JSON file.
+    """
+    
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL, cache_file=RESPONSE_CACHE_FILE):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> {"response", "model", "usage", "expires"}, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.load()
+    
+    def make_key(self, model, messages, system_message=None, options=None):
+        return make_chat_request_key(model, messages, system_message, options)
+    
+    def load(self):
+        if not self.cache_file or not self.cache_file.exists():
+            return
         try:
-            response_data = response.json()
-        except json.JSONDecodeError as e:
-            raise Exception(f"Invalid JSON response from Ollama for model {model}. Response: {response.text[:200]}...")
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                saved_entries = json.load(f)
+        except Exception as e:
+            print(f"Error loading response cache: {e}")
+            return
         
-        # Check if response has expected structure
-        if "message" not in response_data:
-            raise Exception(f"Unexpected response structure from Ollama for model {model}. Got: {response_data}")
+        now = time.time()
+        for key, entry in saved_entries.items():
+            if entry["expires"] > now:
+                self.entries[key] = entry
+    
+    def save(self):
+        """Write the cache file atomically (caller holds the lock)"""
+        if not self.cache_file:
+            return
+        try:
+            ensure_log_dir()
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"Error saving response cache: {e}")
+    
+    def get(self, key):
+        """Return the cached entry ({"response", "usage", ...}), or None on a miss or expired entry"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["expires"] <= time.time():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key, model, response, ttl=None, usage=None):
+        with self.lock:
+            self.entries[key] = {
+                "response": response,
+                "model": model,
+                "usage": usage,
+                "expires": time.time() + (ttl or self.ttl)
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.save()
+    
+    def record_bypass(self):
+        with self.lock:
+            self.bypasses += 1
+    
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "persistent": self.cache_file is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
+
+response_cache = ResponseCache()
+
+def get_response_cache_policy(data, headers=None):
+    """
+    Decide (cache_read, cache_write) for a request.
+    Caching is opt-in with "cache": true in the body; a Cache-Control header of
+    no-cache forces a fresh generation and no-store keeps the reply out of the cache.
+    headers defaults to the current Flask request's.
+    """
+    if not data or not data.get("cache", False):
+        return False, False
+    
+    if headers is None:
+        headers = request.headers
+    cache_control = headers.get("Cache-Control", "").lower()
+    cache_read = "no-cache" not in cache_control and "no-store" not in cache_control
+    cache_write = "no-store" not in cache_control
+    if not cache_read:
+        response_cache.record_bypass()
+    return cache_read, cache_write
+
+def cache_status_header(cache_read, cache_write, cached):
+    """Value for the X-RoverSeer-Cache response header"""
+    if cached:
+        return "HIT"
+    return "MISS" if cache_read else ("BYPASS" if cache_write else "OFF")
+
+# -------- CANCELLATION -------- #
+# A CancellationToken follows one request (a button press or an HTTP call)
+# through the LLM queue, the Ollama call, the ensemble and Piper synthesis.
+# Cancelling it closes the open Ollama response, which stops the generation.
+class RequestCancelled(Exception):
+    """Raised by work whose CancellationToken was cancelled"""
+
+class CancellationToken:
+    """Set once to abort a request; callbacks tear down blocking work (HTTP responses, waits)"""
+    
+    def __init__(self, name="request"):
+        self.name = name
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.callbacks = []
+        self.reason = None
+    
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+    
+    def cancel(self, reason="cancelled"):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.reason = reason
+            self.event.set()
+            callbacks, self.callbacks = self.callbacks, []
         
-        if "content" not in response_data["message"]:
-            raise Exception(f"Missing content in Ollama response for model {model}. Message: {response_data['message']}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error cancelling {self.name}: {e}")
+    
+    def check(self):
+        """Raise RequestCancelled if cancelled"""
+        if self.event.is_set():
+            raise RequestCancelled(f"{self.name} {self.reason}")
+    
+    def on_cancel(self, callback):
+        """Run callback on cancel (right away if already cancelled); returns it for remove_callback"""
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return callback
+        callback()
+        return callback
+    
+    def remove_callback(self, callback):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+cancel_context = threading.local()
+
+def current_cancel_token():
+    """Cancellation token for work done on this thread, or None"""
+    return getattr(cancel_context, "token", None)
+
+@contextmanager
+def closed_on_cancel(cancel, resource):
+    """Close resource (e.g. a streaming Ollama response) if cancel fires while the block runs"""
+    if cancel is None:
+        yield resource
+        return
+    callback = cancel.on_cancel(resource.close)
+    try:
+        yield resource
+    finally:
+        cancel.remove_callback(callback)
+
+# -------- LLM SCHEDULER -------- #
+# Priority classes - lower runs first. The rover's own voice loop beats HTTP
+# callers, which beat background housekeeping.
+PRIORITY_VOICE = 0
+PRIORITY_API = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_VOICE: "voice", PRIORITY_API: "api", PRIORITY_BACKGROUND: "background"}
+
+LLM_MAX_CONCURRENT_PER_MODEL = int(os.environ.get("ROVERSEER_LLM_PER_MODEL", "1"))
+LLM_MAX_CONCURRENT_TOTAL = int(os.environ.get("ROVERSEER_LLM_TOTAL", "2"))
+# Requests waiting beyond this are rejected with 429 (voice requests are always queued)
+LLM_QUEUE_BUDGET = int(os.environ.get("ROVERSEER_LLM_QUEUE_MAX", "8"))
+
+llm_priority_context = threading.local()
+
+def current_llm_priority():
+    """Priority for LLM calls made from this thread (API unless set otherwise)"""
+    return getattr(llm_priority_context, "priority", PRIORITY_API)
+
+@contextmanager
+def llm_priority(priority):
+    """Run LLM calls in this block at the given priority"""
+    previous = current_llm_priority()
+    llm_priority_context.priority = priority
+    try:
+        yield
+    finally:
+        llm_priority_context.priority = previous
+
+class SchedulerBusyError(Exception):
+    """Raised when the LLM queue is over budget; retry_after is a hint in seconds"""
+    
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LLMScheduler:
+    """
+    Admission control and priority queueing for Ollama generations.
+    Each request takes a slot for its model; when a slot is released it is
+    handed directly to the highest-priority waiter that fits (grant-on-release),
+    so a burst of API traffic can't starve the push-to-talk loop.
+    """
+    
+    def __init__(self, per_model=LLM_MAX_CONCURRENT_PER_MODEL, total=LLM_MAX_CONCURRENT_TOTAL, queue_budget=LLM_QUEUE_BUDGET):
+        self.per_model = max(1, per_model)
+        self.total = max(1, total)
+        self.queue_budget = queue_budget
+        self.lock = threading.Lock()
+        self.waiting = []  # Tickets in (priority, arrival) order
+        self.running = {}  # model -> running count
+        self.running_total = 0
+        self.sequence = 0
+        self.granted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.rejected = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.wait_times = {name: LatencyStats() for name in PRIORITY_NAMES.values()}
+    
+    def has_capacity(self, model):
+        """Caller holds the lock"""
+        return self.running_total < self.total and self.running.get(model, 0) < self.per_model
+    
+    def start_running(self, ticket):
+        """Caller holds the lock"""
+        self.running[ticket["model"]] = self.running.get(ticket["model"], 0) + 1
+        self.running_total += 1
+        priority_name = PRIORITY_NAMES[ticket["priority"]]
+        self.granted[priority_name] += 1
+        self.wait_times[priority_name].record(time.time() - ticket["queued_at"])
+        ticket["granted"].set()
+        if ticket.get("on_grant"):
+            ticket["on_grant"]()
+    
+    def busy_error(self, model, queue_depth):
+        """
+        Rejection with a rough retry_after; reads the runtime stats file,
+        so call it after releasing the lock
+        """
+        average_runtime = get_model_runtime(model) or 10
+        return SchedulerBusyError(
+            f"LLM queue is full ({queue_depth} waiting), try again later",
+            retry_after=max(1, int(average_runtime * (queue_depth + 1) / self.total))
+        )
+    
+    def check_admission(self, model, priority):
+        """Raise SchedulerBusyError if a request at this priority would be rejected"""
+        with self.lock:
+            queue_depth = self.reject_depth(priority)
+        if queue_depth is not None:
+            raise self.busy_error(model, queue_depth)
+    
+    def reject_depth(self, priority):
+        """Queue depth if a request at this priority is rejected, otherwise None (caller holds the lock)"""
+        if priority == PRIORITY_VOICE or len(self.waiting) < self.queue_budget:
+            return None
+        self.rejected[PRIORITY_NAMES[priority]] += 1
+        return len(self.waiting)
+    
+    def enqueue(self, model, priority, on_grant=None):
+        """Start a ticket right away if a slot is free, otherwise queue it (raises SchedulerBusyError)"""
+        with self.lock:
+            ticket = {
+                "model": model,
+                "priority": priority,
+                "sequence": self.sequence,
+                "queued_at": time.time(),
+                "granted": threading.Event(),
+                "on_grant": on_grant
+            }
+            self.sequence += 1
+            
+            # Releases hand free slots straight to waiters, so anyone still waiting
+            # is blocked on their own model - a free slot here can be taken now
+            if self.has_capacity(model):
+                self.start_running(ticket)
+                return ticket
             
-        result = response_data["message"]["content"]
+            queue_depth = self.reject_depth(priority)
+            if queue_depth is None:
+                self.waiting.append(ticket)
+                self.waiting.sort(key=lambda waiter: (waiter["priority"], waiter["sequence"]))
+                return ticket
+        raise self.busy_error(model, queue_depth)
+    
+    def withdraw(self, ticket):
+        """Take a ticket back after its waiter gave up; releases it if it was granted meanwhile"""
+        with self.lock:
+            granted = ticket not in self.waiting
+            if not granted:
+                self.waiting.remove(ticket)
+        if granted:
+            self.release(ticket)
+    
+    def acquire(self, model, priority=PRIORITY_API, cancel=None):
+        """
+        Block until a slot for model is granted; returns the ticket to release.
+        Raises RequestCancelled if cancel fires while waiting.
+        """
+        ticket = self.enqueue(model, priority)
+        if ticket["granted"].is_set():
+            return ticket
         
-        # Stop timer and calculate elapsed time
-        stop_timer.set()
-        elapsed_time = time.time() - start_time
+        if cancel is None:
+            ticket["granted"].wait()
+            return ticket
+        
+        # Cancelling wakes us up too; a ticket still in the queue was never granted
+        callback = cancel.on_cancel(ticket["granted"].set)
+        ticket["granted"].wait()
+        cancel.remove_callback(callback)
+        if cancel.cancelled:
+            self.withdraw(ticket)
+            cancel.check()
+        return ticket
+    
+    async def acquire_async(self, model, priority=PRIORITY_API):
+        """Like acquire, but waits on the event loop instead of blocking a thread"""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+        
+        def on_grant():
+            # Called with the scheduler lock held, possibly from another thread
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
         
-        # Only log if not part of PenphinMind
-        if not skip_logging:
-            # Log LLM usage
-            log_llm_usage(model, system_message or "Default system message", user_prompt, result, elapsed_time)
+        ticket = self.enqueue(model, priority, on_grant)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            self.withdraw(ticket)
+            raise
+        return ticket
+    
+    def release(self, ticket):
+        """Free the ticket's slot and grant waiters that now fit, best priority first"""
+        with self.lock:
+            self.running[ticket["model"]] -= 1
+            self.running_total -= 1
+            for waiter in list(self.waiting):
+                if self.running_total >= self.total:
+                    break
+                if self.has_capacity(waiter["model"]):
+                    self.waiting.remove(waiter)
+                    self.start_running(waiter)
+    
+    def running_models(self):
+        with self.lock:
+            return {model for model, count in self.running.items() if count > 0}
+    
+    @contextmanager
+    def slot(self, model, priority=PRIORITY_API, cancel=None):
+        ticket = self.acquire(model, priority, cancel)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+    
+    def stats(self):
+        with self.lock:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for waiter in self.waiting:
+                queued[PRIORITY_NAMES[waiter["priority"]]] += 1
+            return {
+                "max_per_model": self.per_model,
+                "max_total": self.total,
+                "queue_budget": self.queue_budget,
+                "running": dict(self.running),
+                "queue_depth": len(self.waiting),
+                "queued": queued,
+                "granted": dict(self.granted),
+                "rejected": dict(self.rejected),
+                "wait_time": {name: stats.to_dict() for name, stats in self.wait_times.items()}
+            }
+
+llm_scheduler = LLMScheduler()
+
+def scheduler_busy_response(error):
+    """429 response for a request rejected by the LLM scheduler"""
+    response = jsonify({"status": "error", "message": str(error)})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+# -------- MODEL RESIDENCY -------- #
+# Keep the models people actually use loaded in Ollama, warm the rover's
+# selected model before the first question, and unload idle models when a
+# new one wouldn't fit in RAM.
+MODEL_KEEP_ALIVE_HOT = os.environ.get("ROVERSEER_KEEP_ALIVE_HOT", "30m")
+MODEL_KEEP_ALIVE_DEFAULT = os.environ.get("ROVERSEER_KEEP_ALIVE", "5m")
+MODEL_HOT_USES = 3               # Uses within the window that make a model "hot"
+MODEL_USAGE_WINDOW_S = 3600
+MODEL_WARMUP_DEBOUNCE_S = 1.0    # Let button cycling settle before loading anything
+MODEL_RAM_HEADROOM_BYTES = int(os.environ.get("ROVERSEER_RAM_HEADROOM_MB", "256")) * 1024 * 1024
+
+def read_available_memory():
+    """MemAvailable from /proc/meminfo in bytes, or None if unavailable"""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+class ModelResidencyManager:
+    """Chooses keep_alive per model from recent usage and warms/evicts models in Ollama"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.uses = {}       # model -> deque of recent use timestamps
+        self.last_used = {}  # model -> last use timestamp
+        self.selected = set()  # Models selected on the rover (PenphinMind selects all its minds)
+        self.model_sizes = {}  # model -> bytes, from /api/tags
+        self.warm_timer = None
+        self.warmups = 0
+        self.evictions = 0
+        self.last_warmup = None
+    
+    def record_use(self, model):
+        now = time.time()
+        with self.lock:
+            recent = self.uses.setdefault(model, deque())
+            recent.append(now)
+            while recent and recent[0] < now - MODEL_USAGE_WINDOW_S:
+                recent.popleft()
+            self.last_used[model] = now
+    
+    def keep_alive_for(self, model):
+        """Long keep_alive for the selected model and frequently used ones, default otherwise"""
+        cutoff = time.time() - MODEL_USAGE_WINDOW_S
+        with self.lock:
+            recent_uses = sum(1 for used_at in self.uses.get(model, ()) if used_at >= cutoff)
+            hot = model in self.selected or recent_uses >= MODEL_HOT_USES
+        return MODEL_KEEP_ALIVE_HOT if hot else MODEL_KEEP_ALIVE_DEFAULT
+    
+    def select(self, model):
+        """The rover's selected model changed - warm it once the selection settles"""
+        if model.lower() == "penphinmind":
+            models = [mind["model"] for mind in ENSEMBLE_MINDS]
+        else:
+            models = [model]
+        
+        with self.lock:
+            self.selected = set(models)
+            if self.warm_timer:
+                self.warm_timer.cancel()
+            self.warm_timer = threading.Timer(MODEL_WARMUP_DEBOUNCE_S, self.warm_models, args=(models,))
+            self.warm_timer.daemon = True
+            self.warm_timer.start()
+    
+    def warm_models(self, models):
+        for model in models:
+            self.warm(model)
+    
+    def loaded_models(self, client=None):
+        """Models Ollama currently holds in memory (name -> /api/ps entry)"""
+        res = (client or ollama).get("/api/ps", timeout=OLLAMA_TAGS_TIMEOUT)
+        res.raise_for_status()
+        return {entry["name"]: entry for entry in res.json().get("models", [])}
+    
+    def model_size(self, model):
+        if model not in self.model_sizes:
+            tags = ollama.list_models(timeout=OLLAMA_TAGS_TIMEOUT)
+            self.model_sizes = {tag["name"]: tag.get("size", 0) for tag in tags}
+        return self.model_sizes.get(model, 0)
+    
+    def make_room(self, model, loaded, client):
+        """Unload least recently used idle models on client's host until model fits in available RAM"""
+        if not client.is_local:
+            return  # MemAvailable says nothing about another machine
+        available = read_available_memory()
+        if available is None:
+            return
+        
+        needed = self.model_size(model) + MODEL_RAM_HEADROOM_BYTES
+        busy = llm_scheduler.running_models()
+        with self.lock:
+            protected = self.selected | busy
+            candidates = sorted(
+                (name for name in loaded if name not in protected),
+                key=lambda name: self.last_used.get(name, 0)
+            )
+        
+        for victim in candidates:
+            if available >= needed:
+                break
+            self.unload(victim, client)
+            available += loaded[victim].get("size", 0)
+    
+    def unload(self, model, client=None):
+        res = (client or ollama).post("/api/generate", json={"model": model, "keep_alive": 0}, timeout=OLLAMA_TAGS_TIMEOUT)
+        res.raise_for_status()
+        with self.lock:
+            self.evictions += 1
+        print(f"Unloaded idle model {model} to free memory")
+    
+    def warm(self, model):
+        """Load model into Ollama (an empty prompt loads without generating)"""
+        try:
+            # Load it on the backend its requests go to, and make room there
+            client = ollama.client_for(model)
+            loaded = self.loaded_models(client)
+            if model in loaded:
+                return
             
-            # Update model runtime statistics
-            update_model_runtime(model, elapsed_time)
+            # Queue behind voice and API requests instead of taking a slot ahead of them
+            with llm_scheduler.slot(model, PRIORITY_BACKGROUND):
+                with self.lock:
+                    if model not in self.selected:
+                        return  # The selection moved on while we waited
+                loaded = self.loaded_models(client)  # May have changed while queued
+                if model in loaded:
+                    return
+                self.make_room(model, loaded, client)
+                
+                warm_start_time = time.time()
+                res = client.post("/api/generate", json={"model": model, "keep_alive": self.keep_alive_for(model)})
+                res.raise_for_status()
+                warm_time = time.time() - warm_start_time
+            
+            with self.lock:
+                self.warmups += 1
+                self.last_warmup = {"model": model, "seconds": round(warm_time, 2), "at": datetime.now().isoformat()}
+            print(f"Warmed up {model} in {warm_time:.1f}s")
+        except Exception as e:
+            print(f"Error warming model {model}: {e}")
+    
+    def stats(self):
+        try:
+            loaded = {name: {"size": entry.get("size", 0), "expires_at": entry.get("expires_at")}
+                      for name, entry in self.loaded_models().items()}
+        except Exception as e:
+            loaded = {"error": str(e)}
         
-        # Play victory tune
-        play_sound_async(play_ollama_complete_tune)  # Play victory tune asynchronously
+        with self.lock:
+            used_models = list(self.uses)
+        keep_alive = {model: self.keep_alive_for(model) for model in used_models}
         
-        # Blink the elapsed time in a separate thread (non-blocking)
-        def blink_async():
-            blink_number(int(elapsed_time), duration=4, blink_speed=0.3)
+        with self.lock:
+            return {
+                "selected": sorted(self.selected),
+                "loaded": loaded,
+                "keep_alive": keep_alive,
+                "available_memory": read_available_memory(),
+                "warmups": self.warmups,
+                "evictions": self.evictions,
+                "last_warmup": self.last_warmup
+            }
+
+model_residency = ModelResidencyManager()
+
+# -------- REQUEST COALESCING -------- #
+CANCEL_POLL_S = 0.1  # How often a coalesced follower checks its own cancellation
+REQUEST_COALESCING_ENABLED = os.environ.get("ROVERSEER_COALESCE", "1") != "0"
+
+class StreamFlight:
+    """One in-flight token stream, buffered so late subscribers get it from the start"""
+    
+    def __init__(self, start_stream):
+        # Fired when the last subscriber leaves, so the generation stops right away
+        self.cancel = CancellationToken("shared stream")
+        self.source = start_stream(self.cancel)
+        self.chunks = []
+        self.done = False
+        self.cancelled = False
+        self.error = None
+        self.subscribers = 0
+        self.cond = threading.Condition()
+    
+    def pump(self):
+        """Drive the source generator until it ends or every subscriber has gone"""
+        try:
+            for chunk in self.source:
+                with self.cond:
+                    if self.subscribers == 0:
+                        self.cancelled = True
+                        break
+                    self.chunks.append(chunk)
+                    self.cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.source.close()  # Aborts the Ollama generation if we stopped early
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+class StreamSubscription:
+    """
+    Iterator over a StreamFlight; close() detaches, and the last one out cancels the stream.
+    Cancelling the subscriber's own token detaches it and raises RequestCancelled.
+    """
+    
+    def __init__(self, flight, cancel=None):
+        self.flight = flight
+        self.index = 0
+        self.closed = False
+        self.cancel = cancel
+        self.cancel_callback = None
+        if cancel is not None:
+            self.cancel_callback = cancel.on_cancel(self.abort)
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        flight = self.flight
+        with flight.cond:
+            while self.index >= len(flight.chunks) and not flight.done and not self.closed:
+                flight.cond.wait()
+            if self.index < len(flight.chunks) and not self.closed:
+                chunk = flight.chunks[self.index]
+                self.index += 1
+                return chunk
+            error = flight.error
         
-        blink_thread = threading.Thread(target=blink_async)
-        blink_thread.daemon = True
-        blink_thread.start()
+        self.close()
+        if self.cancel is not None:
+            self.cancel.check()
+        if error:
+            raise error
+        raise StopIteration
+    
+    def abort(self):
+        """Detach and wake up a consumer blocked in __next__"""
+        self.close()
+        with self.flight.cond:
+            self.flight.cond.notify_all()
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.cancel_callback is not None:
+            self.cancel.remove_callback(self.cancel_callback)
+        with self.flight.cond:
+            self.flight.subscribers -= 1
+            abandoned = self.flight.subscribers == 0 and not self.flight.done
+            if abandoned:
+                self.flight.cancelled = True
+        if abandoned:
+            self.flight.cancel.cancel("abandoned by its subscribers")
+    
+    def __del__(self):
+        self.close()
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent requests: the first caller (leader) does the work,
+    callers arriving while it is in flight wait for and share its result or stream.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}    # key -> {"event", "result", "error"}
+        self.streams = {}  # key -> StreamFlight
+        self.requests = 0
+        self.coalesced = 0
+    
+    def do(self, key, fn, cancel=None):
+        """
+        Run fn() once per key at a time. Returns (result, was_leader).
+        A follower whose leader was cancelled runs the call itself instead.
+        """
+        with self.lock:
+            self.requests += 1
         
-        return result
+        while True:
+            with self.lock:
+                call = self.calls.get(key)
+                leader = call is None
+                if leader:
+                    call = {"event": threading.Event(), "result": None, "error": None}
+                    self.calls[key] = call
+            
+            if leader:
+                break
+            if cancel is None:
+                call["event"].wait()
+            else:
+                while not call["event"].wait(CANCEL_POLL_S):
+                    cancel.check()
+            if isinstance(call["error"], RequestCancelled):
+                continue  # Leader gave up - take over or join the next one
+            with self.lock:
+                self.coalesced += 1
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], False
         
+        try:
+            call["result"] = fn()
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["event"].set()
+        return call["result"], True
+    
+    def subscribe(self, key, start_stream, cancel=None):
+        """
+        Attach to the in-flight stream for key, starting it with start_stream(flight_cancel) if needed.
+        cancel detaches this subscriber only; the stream stops once nobody is left.
+        """
+        with self.lock:
+            self.requests += 1
+            flight = self.streams.get(key)
+            leader = True
+            if flight is not None:
+                # Checked under the same lock as the count so the last subscriber can't abandon it in between
+                with flight.cond:
+                    if not flight.cancelled:
+                        flight.subscribers += 1
+                        leader = False
+            if leader:
+                flight = StreamFlight(start_stream)
+                flight.subscribers = 1
+                self.streams[key] = flight
+            else:
+                self.coalesced += 1
+        
+        if leader:
+            def run_flight():
+                flight.pump()
+                with self.lock:
+                    if self.streams.get(key) is flight:
+                        del self.streams[key]
+            
+            threading.Thread(target=run_flight, daemon=True).start()
+        
+        return StreamSubscription(flight, cancel)
+    
+    def stats(self):
+        with self.lock:
+            return {
+                "enabled": REQUEST_COALESCING_ENABLED,
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "in_flight": len(self.calls) + len(self.streams)
+            }
+
+chat_flights = SingleFlight()
+
+def run_chat_completion(model, messages, system_message=None, skip_logging=False, feedback=True, options=None, priority=None, cancel=None):
+    return run_chat_completion_with_details(model, messages, system_message, skip_logging, feedback, options,
+                                            priority=priority, cancel=cancel)["content"]
+
+def run_chat_completion_with_details(model, messages, system_message=None, skip_logging=False, feedback=True,
+                                     options=None, cache_read=False, cache_write=False, priority=None, cancel=None):
+    """
+    Non-streaming chat completion.
+    Returns {"content": reply, "usage": Ollama token counts and timings, "cached": bool, "coalesced": bool}.
+    cache_read/cache_write opt in to the response cache; identical requests
+    already in flight are joined instead of sent to Ollama again.
+    priority and cancel default to the calling thread's llm_priority and cancellation token.
+    Raises RequestCancelled if cancel fires before the reply is complete.
+    """
+    if priority is None:
+        priority = current_llm_priority()
+    if cancel is None:
+        cancel = current_cancel_token()
+    
+    request_key = make_chat_request_key(model, messages, system_message, options)
+    if cache_read:
+        cached_entry = response_cache.get(request_key)
+        if cached_entry is not None:
+            return {"content": cached_entry["response"], "usage": cached_entry.get("usage"), "cached": True, "coalesced": False}
+    
+    if REQUEST_COALESCING_ENABLED:
+        result, leader = chat_flights.do(
+            request_key,
+            lambda: request_chat_completion(model, messages, system_message, skip_logging, feedback, options, priority, cancel),
+            cancel
+        )
+    else:
+        result, leader = request_chat_completion(model, messages, system_message, skip_logging, feedback, options, priority, cancel), True
+    
+    if cache_write and leader:
+        response_cache.put(request_key, model, result["content"], usage=result["usage"])
+    
+    return {"content": result["content"], "usage": result["usage"], "cached": False, "coalesced": not leader}
+
+def openai_usage(usage, messages, reply):
+    """OpenAI-style usage block from Ollama's token counts (word-count estimate if unavailable)"""
+    if usage:
+        return {
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "total_tokens": usage["total_tokens"]
+        }
+    prompt_tokens = len(json.dumps(messages).split())
+    completion_tokens = len(reply.split())
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+def request_chat_completion(model, messages, system_message=None, skip_logging=False, feedback=True, options=None,
+                            priority=PRIORITY_API, cancel=None):
+    """
+    Send one chat request to Ollama (in a scheduler slot) and collect the whole reply.
+    Ollama is asked to stream so that closing the response on cancel stops the generation.
+    Returns {"content": reply, "usage": token counts and timings}.
+    """
+    # Wait for a slot first so queueing time stays out of the runtime stats
+    with llm_scheduler.slot(model, priority, cancel):
+        # Don't start LED here - caller should have already set correct LED state
+        # feedback=False skips tunes and the display timer (for calls running in parallel)
+        if feedback:
+            start_time, stop_timer = begin_llm_feedback(model, skip_logging)
+        else:
+            start_time, stop_timer = time.time(), threading.Event()
+        
+        # Extract user prompt from last message
+        user_prompt = ""
+        if messages and messages[-1].get("role") == "user":
+            user_prompt = messages[-1].get("content", "")
+        
+        try:
+            if system_message and not any(msg.get("role") == "system" for msg in messages):
+                messages.insert(0, {"role": "system", "content": system_message})
+
+            model_residency.record_use(model)
+            payload = {
+                "model": model, 
+                "messages": messages,
+                "stream": True,
+                "keep_alive": model_residency.keep_alive_for(model)
+            }
+            if options:
+                payload["options"] = options
+            
+            if cancel is not None:
+                cancel.check()
+            response = ollama.post("/api/chat", json=payload, stream=True)
+            parts = []
+            final_chunk = None
+            try:
+                with closed_on_cancel(cancel, response):
+                    response.raise_for_status()
+                    for chunk in read_ollama_chunks(response, model):
+                        parts.append(chunk.get("message", {}).get("content", ""))
+                        if chunk.get("done"):
+                            final_chunk = chunk
+                            break
+            finally:
+                response.close()
+            
+            if final_chunk is None:
+                raise Exception(f"Ollama response for model {model} ended before completion")
+            
+            result = "".join(parts)
+            # The final chunk carries the token counts and timings
+            usage = parse_ollama_usage(final_chunk)
+            update_model_throughput(model, usage)
+            
+            if feedback:
+                finish_llm_feedback(model, system_message, user_prompt, result, start_time, stop_timer, skip_logging,
+                                    prompt_chars=count_prompt_chars(messages))
+            elif not skip_logging:
+                elapsed_time = time.time() - start_time
+                log_llm_usage(model, system_message or "Default system message", user_prompt, result, elapsed_time)
+                update_model_runtime(model, elapsed_time, count_prompt_chars(messages))
+            
+            return {"content": result, "usage": usage}
+            
+        except Exception as e:
+            stop_timer.set()
+            if feedback:
+                stop_system_processing()
+            if cancel is not None:
+                # Closing the response mid-read surfaces as a connection error
+                cancel.check()
+            raise e
+
+def stream_chat_completion(model, messages, system_message=None, skip_logging=False, priority=None, cancel=None):
+    """
+    Streaming variant of run_chat_completion: an iterator of content deltas.
+    Identical streams already in flight are joined (replayed from the start);
+    close() or cancel detaches, and the generation is aborted once nobody is listening.
+    Raises SchedulerBusyError up front if the LLM queue is over budget.
+    """
+    if priority is None:
+        priority = current_llm_priority()
+    if cancel is None:
+        cancel = current_cancel_token()
+    llm_scheduler.check_admission(model, priority)
+    
+    if not REQUEST_COALESCING_ENABLED:
+        return request_chat_stream(model, messages, system_message, skip_logging, priority, cancel)
+    
+    return chat_flights.subscribe(
+        "stream:" + make_chat_request_key(model, messages, system_message),
+        lambda flight_cancel: request_chat_stream(model, messages, system_message, skip_logging, priority, flight_cancel),
+        cancel
+    )
+
+def request_chat_stream(model, messages, system_message=None, skip_logging=False, priority=PRIORITY_API, cancel=None):
+    """
+    Consume Ollama's NDJSON stream and yield content deltas as they arrive.
+    Logging, runtime stats and tunes happen once the stream is finished.
+    """
+    # Generation starts on the first next(), which waits for a scheduler slot
+    with llm_scheduler.slot(model, priority, cancel):
+        yield from stream_ollama_chat(model, messages, system_message, skip_logging, cancel)
+
+def parse_ollama_line(line, model):
+    """One line of Ollama's NDJSON stream as a chunk dict (None for blank lines); raises on error chunks"""
+    if not line:
+        return None
+    try:
+        chunk = json.loads(line)
+    except json.JSONDecodeError:
+        raise Exception(f"Invalid JSON chunk from Ollama for model {model}: {line[:200]}")
+    
+    if "error" in chunk:
+        raise Exception(f"Ollama error for model {model}: {chunk['error']}")
+    return chunk
+
+def read_ollama_chunks(response, model):
+    """Parse Ollama's NDJSON stream into chunk dicts, raising on error chunks"""
+    for line in response.iter_lines():
+        chunk = parse_ollama_line(line, model)
+        if chunk is not None:
+            yield chunk
+
+def stream_ollama_chat(model, messages, system_message=None, skip_logging=False, cancel=None):
+    # Don't start LED here - caller should have already set correct LED state
+    start_time, stop_timer = begin_llm_feedback(model, skip_logging)
+    
+    # Extract user prompt from last message
+    user_prompt = ""
+    if messages and messages[-1].get("role") == "user":
+        user_prompt = messages[-1].get("content", "")
+    
+    if system_message and not any(msg.get("role") == "system" for msg in messages):
+        messages = [{"role": "system", "content": system_message}] + list(messages)
+    
+    model_residency.record_use(model)
+    response = None
+    cancel_callback = None
+    finished = False
+    parts = []
+    try:
+        if cancel is not None:
+            cancel.check()
+        response = ollama.post(
+            "/api/chat",
+            json={
+                "model": model,
+                "messages": messages,
+                "stream": True,
+                "keep_alive": model_residency.keep_alive_for(model)
+            },
+            stream=True
+        )
+        if cancel is not None:
+            cancel_callback = cancel.on_cancel(response.close)
+        response.raise_for_status()
+        
+        for chunk in read_ollama_chunks(response, model):
+            content = chunk.get("message", {}).get("content", "")
+            if content:
+                parts.append(content)
+                yield content
+            
+            if chunk.get("done"):
+                # The final chunk carries the token counts and timings
+                update_model_throughput(model, parse_ollama_usage(chunk))
+                finished = True
+                break
+        
+        if not finished:
+            raise Exception(f"Ollama stream for model {model} ended before completion")
+        
+        finish_llm_feedback(model, system_message, user_prompt, "".join(parts), start_time, stop_timer, skip_logging,
+                            prompt_chars=count_prompt_chars(messages))
+        
+    except GeneratorExit:
+        # Consumer went away - closing the response below aborts the generation
+        stop_timer.set()
+        raise
     except Exception as e:
         stop_timer.set()
         stop_system_processing()
+        if cancel is not None:
+            # Closing the response mid-read surfaces as a connection error
+            cancel.check()
         raise e
+    finally:
+        if cancel_callback is not None:
+            cancel.remove_callback(cancel_callback)
+        if response is not None:
+            response.close()
+
+
+
+# -------- CONVERSATION CONTEXT -------- #
+# History is trimmed by estimated tokens rather than exchange count. When it
+# outgrows the budget, the oldest exchanges are folded into a summary by a
+# small model in the background. The summary and the exchanges after it only
+# change at compaction time, so the prompt prefix stays byte-identical between
+# turns and Ollama can reuse its prompt cache.
+CHARS_PER_TOKEN = 4  # Rough estimate for English text
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("ROVERSEER_CONTEXT_TOKENS", "1024"))
+MODEL_CONTEXT_BUDGETS = {
+    # Per-model overrides; small models get slow (and confused) on long prompts
+    "tinydolphin:1.1b": 768,
+}
+CONTEXT_SUMMARY_MODEL = os.environ.get("ROVERSEER_SUMMARY_MODEL", DEFAULT_MODEL)
+CONTEXT_COMPACT_FRACTION = 0.5  # Fold exchanges until history is back under half the budget
+CONTEXT_MIN_RECENT = 2          # Always keep the last exchanges verbatim
+SUMMARY_PROMPT = (
+    "Summarize the conversation below in a few short sentences for your own memory. "
+    "Keep names, facts, decisions and open questions. Reply with the summary only."
+)
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def context_budget_for(model):
+    return MODEL_CONTEXT_BUDGETS.get(model, CONTEXT_TOKEN_BUDGET)
+
+class ConversationContext:
+    """
+    Conversation history of (user, reply, model) exchanges with a rolling summary.
+    Iterating yields the exchanges not yet folded into the summary.
+    The exchanges and summary live in the state store, so every API process
+    continues the same conversation; compaction bookkeeping is per process.
+    """
+    
+    def __init__(self, name, summary_model=CONTEXT_SUMMARY_MODEL, store=None):
+        self.name = name
+        self.summary_model = summary_model
+        self.store = store or state_store
+        self.key = f"conversation:{name}"
+        self.lock = threading.Lock()
+        self.compacting = False
+        self.compactions = 0
+    
+    @staticmethod
+    def empty_state():
+        # generation is bumped on clear so a late summary is discarded
+        return {"turns": [], "summary": "", "summarized_turns": 0, "generation": 0}
+    
+    def state(self):
+        return self.store.get(self.key) or self.empty_state()
+    
+    def update(self, fn):
+        return self.store.update(self.key, fn, self.empty_state())
+    
+    def __iter__(self):
+        return iter([tuple(turn) for turn in self.state()["turns"]])
+    
+    def __len__(self):
+        return len(self.state()["turns"])
+    
+    def append(self, user_msg, reply, model):
+        def add_turn(state):
+            state["turns"].append([user_msg, reply, model])
+            return state
+        self.update(add_turn)
+    
+    def clear(self):
+        self.update(lambda state: dict(self.empty_state(), generation=state["generation"] + 1))
+    
+    @staticmethod
+    def turn_messages(turn, label_for_model=None):
+        user_msg, reply, turn_model = turn
+        if label_for_model and turn_model != label_for_model:
+            # Note which model said what when the rover switches models mid-conversation
+            reply = f"[{turn_model.split(':')[0]}]: {reply}"
+        return [
+            {"role": "user", "content": user_msg},
+            {"role": "assistant", "content": reply}
+        ]
+    
+    @staticmethod
+    def summary_messages(summary):
+        return [
+            {"role": "user", "content": f"Summary of our conversation so far: {summary}"},
+            {"role": "assistant", "content": "Got it."}
+        ]
+    
+    def build_messages(self, model, user_input, system_message=None, label_models=False):
+        """
+        Messages for the next request to model, ending with user_input.
+        Starts a background compaction when the history outgrows the model's budget.
+        """
+        budget = context_budget_for(model) - estimate_tokens(user_input) - estimate_tokens(system_message or "")
+        label_for_model = model if label_models else None
+        
+        state = self.state()
+        prefix = self.summary_messages(state["summary"]) if state["summary"] else []
+        
+        turn_blocks = [self.turn_messages(turn, label_for_model) for turn in state["turns"]]
+        used = sum(estimate_tokens(msg["content"]) for msg in prefix)
+        used += sum(estimate_tokens(msg["content"]) for block in turn_blocks for msg in block)
+        
+        if used > budget:
+            self.compact(budget, state)
+            # Until the summary lands, drop the oldest exchanges to stay within budget
+            while turn_blocks and used > budget:
+                used -= sum(estimate_tokens(msg["content"]) for msg in turn_blocks.pop(0))
+        
+        messages = list(prefix)
+        for block in turn_blocks:
+            messages.extend(block)
+        messages.append({"role": "user", "content": user_input})
+        return messages
+    
+    def compact(self, budget, state):
+        """Fold the oldest exchanges of state into the summary in the background"""
+        turns = state["turns"]
+        target = int(budget * CONTEXT_COMPACT_FRACTION)
+        remaining = sum(estimate_tokens(user_msg) + estimate_tokens(reply) for user_msg, reply, _ in turns)
+        count = 0
+        while count < len(turns) - CONTEXT_MIN_RECENT and remaining > target:
+            user_msg, reply, _ = turns[count]
+            remaining -= estimate_tokens(user_msg) + estimate_tokens(reply)
+            count += 1
+        if count == 0:
+            return
+        with self.lock:
+            if self.compacting:
+                return
+            self.compacting = True
+        
+        threading.Thread(
+            target=self.summarize,
+            args=(state["summary"], turns[:count], state["generation"]),
+            daemon=True
+        ).start()
+    
+    def summarize(self, previous_summary, to_fold, generation):
+        try:
+            transcript = []
+            if previous_summary:
+                transcript.append(f"Earlier: {previous_summary}")
+            for user_msg, reply, _ in to_fold:
+                transcript.append(f"User: {user_msg}")
+                transcript.append(f"Assistant: {reply}")
+            
+            summary = run_chat_completion(
+                self.summary_model,
+                [{"role": "user", "content": "\n".join(transcript)}],
+                SUMMARY_PROMPT,
+                skip_logging=True,
+                feedback=False,
+                priority=PRIORITY_BACKGROUND
+            ).strip()
+            
+            applied = []
+            
+            def fold(state):
+                if state["generation"] != generation or state["turns"][:len(to_fold)] != to_fold:
+                    return state  # History was cleared (or compacted elsewhere) while we were summarizing
+                applied.append(True)
+                state["summary"] = summary
+                state["turns"] = state["turns"][len(to_fold):]
+                state["summarized_turns"] += len(to_fold)
+                return state
+            
+            self.update(fold)
+            if applied:
+                with self.lock:
+                    self.compactions += 1
+                print(f"Compacted {len(to_fold)} {self.name} exchanges into a {len(summary)} character summary")
+        except Exception as e:
+            print(f"Error summarizing {self.name} history: {e}")
+        finally:
+            with self.lock:
+                self.compacting = False
+    
+    def stats(self):
+        state = self.state()
+        with self.lock:
+            compactions, compacting = self.compactions, self.compacting
+        return {
+            "turns": len(state["turns"]),
+            "summarized_turns": state["summarized_turns"],
+            "summary_chars": len(state["summary"]),
+            "estimated_tokens": estimate_tokens(state["summary"]) + sum(
+                estimate_tokens(user_msg) + estimate_tokens(reply) for user_msg, reply, _ in state["turns"]
+            ),
+            "compactions": compactions,
+            "compacting": compacting
+        }
+
+history = ConversationContext("web")
+button_history = ConversationContext("button")  # Separate history for button-initiated conversations
+
+
+
+# -------- STREAMING SPEECH PIPELINE -------- #
+SPEECH_PIPELINE_ENABLED = os.environ.get("ROVERSEER_SPEECH_PIPELINE", "1") != "0"
+SENTENCE_MIN_CHARS = 20   # Don't synthesize tiny fragments like "Hi."
+SENTENCE_MAX_CHARS = 300  # Force a cut on long run-on text at the last space
+
+# Sentence end punctuation (plus closing quotes/brackets) followed by whitespace, or a newline
+SENTENCE_BOUNDARY = re.compile(r'[.!?;:]["\')\]]*\s+|\n+')
+
+def find_sentence_cut(buffer, min_chars=SENTENCE_MIN_CHARS):
+    """Return the index just after the first sentence boundary past min_chars, or None"""
+    for match in SENTENCE_BOUNDARY.finditer(buffer):
+        if match.end() >= min_chars:
+            return match.end()
+    return None
+
+def split_stream_into_sentences(text_stream, min_chars=SENTENCE_MIN_CHARS, max_chars=SENTENCE_MAX_CHARS):
+    """Accumulate streamed text and yield it one sentence at a time"""
+    buffer = ""
+    for piece in text_stream:
+        buffer += piece
+        while True:
+            cut = find_sentence_cut(buffer, min_chars)
+            if cut is None and len(buffer) >= max_chars:
+                cut = buffer.rfind(" ", 0, max_chars) + 1 or max_chars
+            if cut is None:
+                break
+            sentence, buffer = buffer[:cut].strip(), buffer[cut:]
+            if sentence:
+                yield sentence
+    
+    if buffer.strip():
+        yield buffer.strip()
+
+def speak_streamed_reply(text_stream, voice, sanitize=True, cancel=None):
+    """
+    Speak a reply while it is still being generated.
+    text_stream can be a token generator (e.g. stream_chat_completion) or a list of text.
+    Sentences are synthesized in a worker thread and their raw PCM is streamed
+    into a single aplay process, so playback starts with the first samples.
+    cancel (default: this thread's token) stops synthesis like an interrupt.
+    Returns the full reply text.
+    """
+    if cancel is None:
+        cancel = current_cancel_token()
+    model_path, config_path = find_voice_files(voice)  # Fail fast on an unknown voice
+    sample_rate = get_voice_sample_rate(config_path)
+    audio_queue = queue.Queue()
+    reply_parts = []
+    errors = []
+    
+    speech_interrupted.clear()
+    speech_pipeline_active.set()
+    cancel_callback = cancel.on_cancel(speech_interrupted.set) if cancel is not None else None
+    
+    def capture_stream():
+        for piece in text_stream:
+            reply_parts.append(piece)
+            yield piece
+    
+    def synthesize_sentences():
+        try:
+            for sentence in split_stream_into_sentences(capture_stream()):
+                if speech_interrupted.is_set():
+                    break
+                
+                clean_sentence = sanitize_for_speech(sentence) if sanitize else sentence
+                if not clean_sentence:
+                    continue
+                
+                tts_start_time = time.time()
+                try:
+                    for pcm in stream_speech_pcm(voice, clean_sentence, cancel):
+                        if speech_interrupted.is_set():
+                            break
+                        audio_queue.put(pcm)
+                except RequestCancelled:
+                    break
+                except Exception as e:
+                    print(f"TTS failed for sentence: {e}")
+                    continue
+                
+                log_tts_usage(voice, clean_sentence, None, time.time() - tts_start_time)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Stop the LLM generation if we bailed out early
+            if hasattr(text_stream, "close"):
+                text_stream.close()
+            audio_queue.put(None)
+    
+    synth_thread = threading.Thread(target=synthesize_sentences)
+    synth_thread.daemon = True
+    synth_thread.start()
+    
+    sink = None
+    try:
+        while True:
+            pcm = audio_queue.get()
+            if pcm is None:
+                break
+            
+            if speech_interrupted.is_set():
+                continue
+            
+            if sink is None:
+                # First audio is ready - wait for any voice intro, then switch LEDs to playback
+                audio_output_lock.acquire()
+                stop_system_processing()
+                start_system_processing('aplay')
+                sink = open_audio_sink(sample_rate)
+            
+            if not sink.write(pcm):
+                # aplay is gone - interrupt_audio_playback killed it
+                speech_interrupted.set()
+    finally:
+        if sink is not None:
+            sink.close()  # Waits for the buffered audio to finish playing
+        synth_thread.join(timeout=5)
+        if cancel_callback is not None:
+            cancel.remove_callback(cancel_callback)
+        speech_pipeline_active.clear()
+        if sink is not None:
+            audio_output_lock.release()
+        # All complete - stop resets everything
+        stop_system_processing()
+        if sink is None:
+            reset_pipeline_stages()
+    
+    if errors and not speech_interrupted.is_set():
+        raise errors[0]
+    
+    return "".join(reply_parts)
+
+def speak_text(text, voice, sanitize=False):
+    """Speak already complete text on the device (sentence by sentence, no temp files)"""
+    return speak_streamed_reply([text], voice, sanitize=sanitize)
+
+def generate_voice_intro(voice_id):
+    """Return the cached intro audio (pcm, sample_rate) for a voice, synthesizing it on a cache miss"""
+    # Default intro if voice not in predefined messages
+    intro_text = VOICE_INTRO_MESSAGES.get(voice_id, DEFAULT_VOICE_INTRO)
+    
+    try:
+        return get_cached_speech(voice_id, intro_text)
+    except Exception as e:
+        print(f"Error generating intro for {voice_id}: {e}")
+        return None
+
+def play_voice_intro(voice_id):
+    """Play the intro for a specific voice, generating it if needed"""
+    intro_audio = generate_voice_intro(voice_id)
+    if not intro_audio:
+        return False
+    
+    # Skip the intro if the reply itself has already started speaking
+    if not audio_output_lock.acquire(blocking=False):
+        return False
+    
+    # Play the intro
+    try:
+        play_pcm(*intro_audio)
+        return True
+    except Exception as e:
+        print(f"Error playing intro for {voice_id}: {e}")
+        return False
+    finally:
+        audio_output_lock.release()
 
+# -------- DYNAMIC VOICE DETECTION -------- #
+def list_voice_ids():
+    base_names = set()
+    for fname in os.listdir(VOICES_DIR):
+        if fname.endswith(".onnx") and not fname.endswith(".onnx.json"):
+            base = fname.rsplit("-", 1)[0]
+            base_names.add(base)
+    return sorted(base_names)
 
+def find_voice_files(base_voice_id):
+    pattern_prefix = f"{base_voice_id}-"
+    model_file = None
+    config_file = None
+    for fname in os.listdir(VOICES_DIR):
+        if fname.startswith(pattern_prefix):
+            if fname.endswith(".onnx") and not fname.endswith(".onnx.json"):
+                model_file = os.path.join(VOICES_DIR, fname)
+            elif fname.endswith(".onnx.json"):
+                config_file = os.path.join(VOICES_DIR, fname)
+        if model_file and config_file:
+            break
+    if not model_file or not config_file:
+        raise FileNotFoundError(f"Missing model or config for voice: {base_voice_id}")
+    return model_file, config_file
+
+# -------- VOICE ENGINE -------- #
+# Piper voices stay loaded in-process (ONNX Runtime sessions) instead of
+# spawning the piper CLI and reloading the model for every utterance.
+try:
+    from piper import PiperVoice
+except ImportError:
+    PiperVoice = None
+
+PIPER_BIN = "/home/codemusic/roverseer_venv/bin/piper"
+MAX_RESIDENT_VOICES = int(os.environ.get("ROVERSEER_MAX_VOICES", "2"))
+
+def get_voice_sample_rate(config_path):
+    """Read the output sample rate from a Piper voice config"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("audio", {}).get("sample_rate", 22050)
+
+def write_wav_file(output_path, pcm, sample_rate):
+    """Write 16-bit mono PCM to a WAV file"""
+    import wave
+    with wave.open(str(output_path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm)
+
+class VoiceEngine:
+    """LRU of loaded Piper voices with a thread-safe synthesis API returning PCM"""
+    
+    def __init__(self, max_voices=MAX_RESIDENT_VOICES):
+        self.max_voices = max(1, max_voices)
+        self.voices = OrderedDict()  # (model_path, config_path) -> PiperVoice
+        self.lock = threading.Lock()
+        # espeak-ng phonemization inside Piper is process-global, so synthesis is serialized
+        self.synthesis_lock = threading.Lock()
+    
+    def get_voice(self, model_path, config_path):
+        """Return a loaded voice, loading it (and evicting the oldest) if needed"""
+        key = (model_path, config_path)
+        with self.lock:
+            if key in self.voices:
+                self.voices.move_to_end(key)
+                return self.voices[key]
+            
+            load_start = time.time()
+            voice = PiperVoice.load(model_path, config_path=config_path)
+            print(f"Loaded voice {os.path.basename(model_path)} in {time.time() - load_start:.2f}s")
+            
+            self.voices[key] = voice
+            while len(self.voices) > self.max_voices:
+                evicted_key, _ = self.voices.popitem(last=False)
+                print(f"Unloaded voice {os.path.basename(evicted_key[0])}")
+            return voice
+    
+    def resident_voices(self):
+        with self.lock:
+            return [os.path.basename(model_path) for model_path, _ in self.voices]
+    
+    def synthesize_stream(self, model_path, config_path, text, cancel=None):
+        """
+        Yield raw 16-bit mono PCM chunks (one per sentence Piper detects).
+        Raises RequestCancelled between chunks once cancel fires.
+        """
+        if PiperVoice is None:
+            yield self.synthesize_with_cli(model_path, config_path, text)
+            return
+        
+        voice = self.get_voice(model_path, config_path)
+        if hasattr(voice, "synthesize_stream_raw"):
+            # piper-tts 1.2
+            chunks = iter(voice.synthesize_stream_raw(text))
+        else:
+            # piper-tts 1.3+
+            chunks = (chunk.audio_int16_bytes for chunk in voice.synthesize(text))
+        
+        # Only hold the lock while synthesizing, not while the consumer plays the chunk
+        while True:
+            if cancel is not None:
+                cancel.check()
+            with self.synthesis_lock:
+                pcm = next(chunks, None)
+            if pcm is None:
+                break
+            yield pcm
+    
+    def synthesize(self, model_path, config_path, text):
+        """Synthesize text and return (pcm_bytes, sample_rate)"""
+        pcm = b"".join(self.synthesize_stream(model_path, config_path, text))
+        return pcm, get_voice_sample_rate(config_path)
+    
+    def synthesize_with_cli(self, model_path, config_path, text):
+        """Fallback when the piper module isn't importable: one CLI process, raw PCM on stdout"""
+        result = subprocess.run(
+            [PIPER_BIN,
+             "--model", model_path,
+             "--config", config_path,
+             "--output_raw"],
+            input=text.encode(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Piper TTS failed: {result.stderr.decode()}")
+        return result.stdout
+
+voice_engine = VoiceEngine()
+
+def read_wav_file(path):
+    """Read a 16-bit mono WAV file, returning (pcm_bytes, sample_rate)"""
+    import wave
+    with wave.open(str(path), "rb") as wav_file:
+        return wav_file.readframes(wav_file.getnframes()), wav_file.getframerate()
+
+# -------- TTS AUDIO CACHE -------- #
+TTS_CACHE_DIR = Path.home() / "roverseer_tts_cache"
+TTS_CACHE_MAX_BYTES = int(os.environ.get("ROVERSEER_TTS_CACHE_MB", "200")) * 1024 * 1024
+TTS_CACHE_INDEX_SAVE_S = 30  # Hits only touch access times, so their index writes are batched
+
+# Synthesis parameters that change Piper's output; part of every cache key
+TTS_SYNTHESIS_PARAMS = {"format": "s16le", "channels": 1, "sentence_silence": 0.0}
+
+class TTSCache:
+    """
+    Content-addressed WAV cache for synthesized speech.
+    Keyed by hash of (voice model file, voice config, text, synthesis parameters),
+    evicted least-recently-used by total bytes. The index survives restarts.
+    """
+    
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.index_file = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> entry dict, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.index_dirty = False
+        self.save_timer = None
+        self.load_index()
+    
+    def make_key(self, model_path, config_path, text, params=None):
+        """Hash the inputs that determine the synthesized audio"""
+        digest = hashlib.sha256()
+        # The ONNX model is large, so identify it by path, size and mtime rather than content
+        model_stat = os.stat(model_path)
+        digest.update(f"{model_path}|{model_stat.st_size}|{model_stat.st_mtime_ns}".encode())
+        with open(config_path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+        digest.update(json.dumps(params or TTS_SYNTHESIS_PARAMS, sort_keys=True).encode())
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+    
+    def path_for(self, key):
+        return self.cache_dir / f"{key}.wav"
+    
+    def load_index(self):
+        """Load the index from disk, dropping entries whose audio is gone"""
+        self.cache_dir.mkdir(exist_ok=True)
+        if not self.index_file.exists():
+            return
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                saved_entries = json.load(f)
+        except Exception as e:
+            print(f"Error loading TTS cache index: {e}")
+            return
+        
+        for entry in saved_entries:
+            if self.path_for(entry["key"]).exists():
+                self.entries[entry["key"]] = entry
+                self.total_bytes += entry["bytes"]
+    
+    def save_index(self):
+        """Write the index atomically (caller holds the lock)"""
+        tmp_index = self.index_file.with_suffix(".tmp")
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(list(self.entries.values()), f)
+        os.replace(tmp_index, self.index_file)
+        self.index_dirty = False
+    
+    def schedule_save(self):
+        """Save the index within TTS_CACHE_INDEX_SAVE_S (caller holds the lock)"""
+        self.index_dirty = True
+        if self.save_timer is None:
+            self.save_timer = threading.Timer(TTS_CACHE_INDEX_SAVE_S, self.flush)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+    
+    def flush(self):
+        with self.lock:
+            self.save_timer = None
+            if self.index_dirty:
+                self.save_index()
+    
+    def get(self, key):
+        """Return the cached audio for a key as (pcm_bytes, sample_rate), or None on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                entry["last_access"] = time.time()
+                entry["hits"] = entry.get("hits", 0) + 1
+        
+        audio = None
+        if entry is not None:
+            try:
+                # Read outside the lock; an eviction in the meantime just makes this a miss
+                audio = read_wav_file(self.path_for(key))
+            except FileNotFoundError:
+                pass
+        
+        with self.lock:
+            if audio is None:
+                if entry is not None and self.entries.get(key) is entry:
+                    self.total_bytes -= entry["bytes"]
+                    del self.entries[key]
+                    self.schedule_save()
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.schedule_save()
+        return audio
+    
+    def put(self, key, pcm, sample_rate, voice_id, text):
+        """Store synthesized PCM and evict old entries past the byte budget"""
+        cache_path = self.path_for(key)
+        tmp_path = self.cache_dir / f"{key}.{uuid.uuid4().hex}.tmp"
+        write_wav_file(tmp_path, pcm, sample_rate)
+        os.replace(tmp_path, cache_path)
+        size = cache_path.stat().st_size
+        
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries[key]["bytes"]
+            self.entries[key] = {
+                "key": key,
+                "bytes": size,
+                "voice": voice_id,
+                "text": text[:200],
+                "created": time.time(),
+                "last_access": time.time(),
+                "hits": 0
+            }
+            self.entries.move_to_end(key)
+            self.total_bytes += size
+            
+            # Evict least recently used, never the entry we just added
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                old_key, old_entry = self.entries.popitem(last=False)
+                self.total_bytes -= old_entry["bytes"]
+                self.evictions += 1
+                try:
+                    os.remove(self.path_for(old_key))
+                except FileNotFoundError:
+                    pass
+            
+            self.save_index()
+    
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions
+            }
 
-def ensure_intros_dir():
-    """Create the intros directory if it doesn't exist"""
-    INTROS_DIR.mkdir(exist_ok=True)
+tts_cache = TTSCache()
+# Storing new audio writes the WAV and index.json; one background thread does it
+# so the speaking thread never waits on the SD card between sentences
+tts_cache_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-cache")
 
-def get_intro_path(voice_id):
-    """Get the path for a voice's intro file"""
-    ensure_intros_dir()
-    return INTROS_DIR / f"{voice_id}_intro.wav"
+def store_speech_async(key, pcm, sample_rate, voice_id, text):
+    def store():
+        try:
+            tts_cache.put(key, pcm, sample_rate, voice_id, text)
+        except Exception as e:
+            print(f"Error caching speech for {voice_id}: {e}")
+    
+    tts_cache_writer.submit(store)
+
+def get_cached_speech(voice_id, text):
+    """Return (pcm_bytes, sample_rate) for this text from the TTS cache, synthesizing it on a miss"""
+    model_path, config_path = find_voice_files(voice_id)
+    key = tts_cache.make_key(model_path, config_path, text)
+    cached_audio = tts_cache.get(key)
+    if cached_audio:
+        return cached_audio
+    
+    pcm, sample_rate = voice_engine.synthesize(model_path, config_path, text)
+    store_speech_async(key, pcm, sample_rate, voice_id, text)
+    return pcm, sample_rate
 
-def generate_voice_intro(voice_id):
-    """Generate and save an intro for a specific voice"""
-    intro_path = get_intro_path(voice_id)
-    
-    # Voice-specific intro messages
-    intro_messages = {
-        "en_GB-jarvis": "Ahh yes, hmm... let me gather my thoughts on this before I reply.",
-        "en_US-amy": "Hello! Just a moment while I think about that.",
-        "en_GB-northern_english": "Right then, let me have a think about that.",
-        "en_US-danny": "Hey there! Give me a second to process that.",
-        "en_GB-alba": "Curiouser, and Curiouser. Let me ponder on that for a minute.",
-        "en_US-ryan": "Hi! I'm processing your query now.",
-    }
+def stream_speech_pcm(voice_id, text, cancel=None):
+    """
+    Yield raw PCM for text as soon as it is synthesized.
+    Cache hits are read back from disk; misses are streamed from the voice engine
+    and stored in the background once complete (a cancelled synthesis isn't cached).
+    """
+    model_path, config_path = find_voice_files(voice_id)
+    key = tts_cache.make_key(model_path, config_path, text)
+    cached_audio = tts_cache.get(key)
+    if cached_audio:
+        yield cached_audio[0]
+        return
     
-    # Default intro if voice not in predefined messages
-    default_intro = "Curious, let me think about that."
-    intro_text = intro_messages.get(voice_id, default_intro)
+    chunks = []
+    for pcm in voice_engine.synthesize_stream(model_path, config_path, text, cancel):
+        chunks.append(pcm)
+        yield pcm
+    store_speech_async(key, b"".join(chunks), get_voice_sample_rate(config_path), voice_id, text)
+
+def synthesize_speech(voice_id, text):
+    """Synthesize text with a voice id, returning (pcm_bytes, sample_rate)"""
+    return get_cached_speech(voice_id, text)
+
+def synthesize_to_wav(voice_id, text, output_path):
+    """Synthesize text to a WAV file. Returns processing time in seconds."""
+    tts_start_time = time.time()
+    write_wav_file(output_path, *get_cached_speech(voice_id, text))
+    return time.time() - tts_start_time
+
+# -------- AUDIO OUTPUT -------- #
+class PCMAudioSink:
+    """
+    Streams raw 16-bit mono PCM into aplay's stdin.
+    The process is registered as current_audio_process so
+    interrupt_audio_playback can cut it off instantly.
+    """
     
-    try:
-        model_path, config_path = find_voice_files(voice_id)
-        
-        # Generate intro audio
-        result = subprocess.run(
-            ["/home/codemusic/roverseer_venv/bin/piper",
-             "--model", model_path,
-             "--config", config_path,
-             "--output_file", str(intro_path)],
-            input=intro_text.encode(),
-            stdout=subprocess.PIPE,
+    def __init__(self, sample_rate, device=None):
+        global current_audio_process
+        self.process = subprocess.Popen(
+            ["aplay", "-q", "-D", device or AUDIO_DEVICE,
+             "-t", "raw", "-f", "S16_LE", "-r", str(sample_rate), "-c", "1", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE
         )
-        
-        if result.returncode == 0:
-            print(f"Generated intro for voice: {voice_id}")
-            return intro_path
-        else:
-            print(f"Failed to generate intro for {voice_id}: {result.stderr.decode()}")
-            return None
-            
-    except Exception as e:
-        print(f"Error generating intro for {voice_id}: {e}")
-        return None
-
-def play_voice_intro(voice_id):
-    """Play the intro for a specific voice, generating it if needed"""
-    intro_path = get_intro_path(voice_id)
+        current_audio_process = self.process
+        state_store.set("audio_output", {"pid": self.process.pid, "sample_rate": sample_rate, "started": time.time()})
     
-    # Generate intro if it doesn't exist
-    if not intro_path.exists():
-        print(f"Intro not found for {voice_id}, generating...")
-        generated_path = generate_voice_intro(voice_id)
-        if not generated_path:
+    def write(self, pcm):
+        """Write PCM; returns False once the player has been stopped"""
+        if self.process.poll() is not None:
+            return False
+        try:
+            self.process.stdin.write(pcm)
+            self.process.stdin.flush()
+            return True
+        except (BrokenPipeError, ValueError, OSError):
             return False
     
-    # Play the intro
-    try:
-        subprocess.run(["aplay", "-D", AUDIO_DEVICE, str(intro_path)])
-        return True
-    except Exception as e:
-        print(f"Error playing intro for {voice_id}: {e}")
-        return False
+    def close(self):
+        """Finish playback of everything written and release the device"""
+        global current_audio_process
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.wait()
+        if current_audio_process is self.process:
+            current_audio_process = None
+            state_store.delete("audio_output")
 
-# -------- DYNAMIC VOICE DETECTION -------- #
-def list_voice_ids():
-    base_names = set()
-    for fname in os.listdir(VOICES_DIR):
-        if fname.endswith(".onnx") and not fname.endswith(".onnx.json"):
-            base = fname.rsplit("-", 1)[0]
-            base_names.add(base)
-    return sorted(base_names)
+def open_audio_sink(sample_rate):
+    """A PCMAudioSink here, or a stream into the hardware owner's player in the http role"""
+    if hardware_client is not None:
+        try:
+            return hardware_client.open_audio(sample_rate)
+        except HardwareUnavailable:
+            pass
+    return PCMAudioSink(sample_rate)
+
+def play_pcm(pcm, sample_rate):
+    """Play a complete PCM buffer on the device (blocking, interruptible)"""
+    sink = open_audio_sink(sample_rate)
+    sink.write(pcm)
+    sink.close()
+
+# -------- HTTP AUDIO STREAMING -------- #
+# Chunked audio responses: "wav" sends a header with unknown (maximal) length
+# followed by PCM; "pcm" sends bare 16-bit little-endian mono samples.
+AUDIO_STREAM_FORMATS = ("wav", "pcm")
+WAV_STREAM_LENGTH = 0xFFFFFFFF
+
+def make_streaming_wav_header(sample_rate, channels=1, bits_per_sample=16):
+    """WAV header for a stream whose length isn't known up front"""
+    block_align = channels * bits_per_sample // 8
+    return (
+        b"RIFF" + struct.pack("<I", WAV_STREAM_LENGTH) + b"WAVE" +
+        b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate,
+                              sample_rate * block_align, block_align, bits_per_sample) +
+        b"data" + struct.pack("<I", WAV_STREAM_LENGTH)
+    )
+
+def stream_speech_response(text_stream, voice, audio_format="wav", download_name="speech.wav", sanitize=False):
+    """
+    Chunked HTTP response that sends audio as each sentence is synthesized.
+    text_stream can be a token generator (e.g. stream_chat_completion) or a list of text.
+    """
+    if audio_format not in AUDIO_STREAM_FORMATS:
+        raise ValueError(f"Unsupported audio format: {audio_format}")
+    
+    model_path, config_path = find_voice_files(voice)  # Fail before the response starts
+    sample_rate = get_voice_sample_rate(config_path)
+    
+    def generate():
+        tts_started = False
+        try:
+            if audio_format == "wav":
+                yield make_streaming_wav_header(sample_rate)
+            
+            for sentence in split_stream_into_sentences(text_stream):
+                clean_sentence = sanitize_for_speech(sentence) if sanitize else sentence
+                if not clean_sentence:
+                    continue
+                
+                if not tts_started:
+                    # Transition to TTS stage
+                    stop_system_processing()
+                    start_system_processing('C')
+                    tts_started = True
+                
+                tts_start_time = time.time()
+                for pcm in stream_speech_pcm(voice, clean_sentence):
+                    yield pcm
+                log_tts_usage(voice, clean_sentence, None, time.time() - tts_start_time)
+        except Exception as e:
+            # Headers are already sent, so the client just sees the stream end early
+            print(f"Error streaming speech: {e}")
+        finally:
+            # Stop the LLM generation if the client went away
+            if hasattr(text_stream, "close"):
+                text_stream.close()
+            stop_system_processing()
+    
+    if audio_format == "wav":
+        mimetype = "audio/wav"
+    else:
+        mimetype = "application/octet-stream"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename={download_name}",
+            "Cache-Control": "no-cache",
+            "X-Audio-Sample-Rate": str(sample_rate),
+            "X-Audio-Encoding": "s16le",
+            "X-Audio-Channels": "1"
+        }
+    )
 
-def find_voice_files(base_voice_id):
-    pattern_prefix = f"{base_voice_id}-"
-    model_file = None
-    config_file = None
-    for fname in os.listdir(VOICES_DIR):
-        if fname.startswith(pattern_prefix):
-            if fname.endswith(".onnx") and not fname.endswith(".onnx.json"):
-                model_file = os.path.join(VOICES_DIR, fname)
-            elif fname.endswith(".onnx.json"):
-                config_file = os.path.join(VOICES_DIR, fname)
-        if model_file and config_file:
-            break
-    if not model_file or not config_file:
-        raise FileNotFoundError(f"Missing model or config for voice: {base_voice_id}")
-    return model_file, config_file
+def preload_voice_async(voice_id):
+    """Load a voice in the background so the first reply doesn't pay the model load"""
+    def preload():
+        try:
+            model_path, config_path = find_voice_files(voice_id)
+            if PiperVoice is not None:
+                voice_engine.get_voice(model_path, config_path)
+        except Exception as e:
+            print(f"Error preloading voice {voice_id}: {e}")
+    
+    threading.Thread(target=preload, daemon=True).start()
 
 # -------- FLASK APP + SWAGGER -------- #
+class RoverSeerRequest(Request):
+    """
+    Keeps uploads in memory instead of spooling them to a temp file.
+    MAX_CONTENT_LENGTH bounds the body while it is parsed, chunked or not.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
 app = Flask(__name__)
+app.request_class = RoverSeerRequest
+app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_BYTES
 CORS(app)
 
 swagger = Swagger(app, template={
@@ -2128,6 +4805,14 @@ swagger = Swagger(app, template={
     "specs_route": "/docs"
 })
 
+@app.errorhandler(SchedulerBusyError)
+def handle_scheduler_busy(error):
+    return scheduler_busy_response(error)
+
+@app.errorhandler(RequestEntityTooLarge)
+def handle_upload_too_large(error):
+    return audio_upload_error_response(upload_too_large_error())
+
 @app.route('/docs/')
 def redirect_docs():
     return redirect("/docs", code=302)
@@ -2172,17 +4857,13 @@ def home():
             try:
                 reply_text = bicameral_chat_direct(user_input, system)
                 # Add to history
-                history.append((user_input, reply_text, "PenphinMind"))
+                history.append(user_input, reply_text, "PenphinMind")
             except Exception as e:
                 reply_text = f"Bicameral processing error: {e}"
         else:
             # Normal flow
             # Build message history context
-            messages = []
-            for user_msg, ai_reply, _ in history[-MAX_HISTORY:]:
-                messages.append({"role": "user", "content": user_msg})
-                messages.append({"role": "assistant", "content": ai_reply})
-            messages.append({"role": "user", "content": user_input})
+            messages = history.build_messages(model, user_input, system)
 
             try:
                 if output_type == 'text':
@@ -2195,52 +4876,31 @@ def home():
                     reply = run_chat_completion(model, messages, system)
                     
                     # Generate TTS
-                    model_path, config_path = find_voice_files(voice)
                     tmp_audio = f"{uuid.uuid4().hex}.wav"
                     
-                    tts_result = subprocess.run(
-                        ["/home/codemusic/roverseer_venv/bin/piper",
-                         "--model", model_path,
-                         "--config", config_path,
-                         "--output_file", f"/tmp/{tmp_audio}"],
-                        input=reply.encode(),
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                    
-                    if tts_result.returncode == 0:
+                    try:
+                        synthesize_to_wav(voice, reply, f"/tmp/{tmp_audio}")
                         audio_url = url_for('serve_static', filename=tmp_audio)
                         reply_text = "(Audio response returned)"
-                    else:
-                        reply_text = f"TTS failed: {tts_result.stderr.decode()}"
+                    except Exception as e:
+                        reply_text = f"TTS failed: {e}"
                         
+                elif SPEECH_PIPELINE_ENABLED:  # speak, sentence by sentence
+                    start_system_processing('B')
+                    reply_text = speak_streamed_reply(stream_chat_completion(model, messages, system), voice)
+                    
                 else:  # speak
                     # Direct function call + TTS + speak
                     reply = run_chat_completion(model, messages, system)
                     
                     # Generate and play TTS
-                    model_path, config_path = find_voice_files(voice)
-                    tmp_wav = f"/tmp/{uuid.uuid4().hex}.wav"
-                    
-                    tts_result = subprocess.run(
-                        ["/home/codemusic/roverseer_venv/bin/piper",
-                         "--model", model_path,
-                         "--config", config_path,
-                         "--output_file", tmp_wav],
-                        input=reply.encode(),
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                    
-                    if tts_result.returncode == 0:
-                        # Play audio
-                        subprocess.run(["aplay", "-D", AUDIO_DEVICE, tmp_wav])
-                        os.remove(tmp_wav)
+                    try:
+                        speak_text(reply, voice)
                         reply_text = reply
-                    else:
-                        reply_text = f"TTS failed: {tts_result.stderr.decode()}"
+                    except Exception as e:
+                        reply_text = f"TTS failed: {e}"
 
-                history.append((user_input, reply_text, model))
+                history.append(user_input, reply_text, model)
             except Exception as e:
                 reply_text = f"Request failed: {e}"
 
@@ -2442,11 +5102,19 @@ def text_to_speech():
               type: boolean
               default: false
               description: If true, plays audio on device; if false, returns audio file
+            stream:
+              type: boolean
+              default: false
+              description: If true, audio is sent chunked as each sentence is synthesized
+            format:
+              type: string
+              enum: ['wav', 'pcm']
+              default: wav
+              description: Streamed audio format - WAV with open-ended length, or raw 16-bit mono PCM
     responses:
       200:
         description: Audio spoken on device or WAV file returned
     """
-    global current_audio_process
     data = request.get_json(silent=True)
     if not data:
         return jsonify({"status": "error", "message": "Invalid or missing JSON body"}), 400
@@ -2456,57 +5124,32 @@ def text_to_speech():
     
     # Default to returning file for /tts endpoint
     speak = data.get("speak", False)
+    stream = data.get("stream", False)
+    audio_format = data.get("format", "wav")
 
     if not text:
         return jsonify({"status": "error", "message": "No text provided"}), 400
+    if audio_format not in AUDIO_STREAM_FORMATS:
+        return jsonify({"status": "error", "message": f"Unsupported format: {audio_format}"}), 400
 
     try:
-        model_path, config_path = find_voice_files(voice_id)
-        tmp_wav = f"/tmp/{uuid.uuid4().hex}.wav"
-
         play_sound_async(play_tts_tune, voice_id)  # Play tune before TTS asynchronously
-        tts_start_time = time.time()
-        result = subprocess.run(
-            ["/home/codemusic/roverseer_venv/bin/piper",
-             "--model", model_path,
-             "--config", config_path,
-             "--output_file", tmp_wav],
-            input=text.encode(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        tts_processing_time = time.time() - tts_start_time
-
-        if result.returncode != 0:
-            return jsonify({
-                "status": "error",
-                "message": f"Piper TTS failed: {result.stderr.decode()}"
-            }), 500
+        
+        if speak:
+            # PCM streams straight into the audio device as it is synthesized
+            speak_text(text, voice_id)
+            return jsonify({"status": "success", "message": f"Spoken with {voice_id}: {text}"})
+        
+        if stream:
+            return stream_speech_response([text], voice_id, audio_format, download_name=f"tts.{audio_format}")
+        
+        tmp_wav = f"/tmp/{uuid.uuid4().hex}.wav"
+        tts_processing_time = synthesize_to_wav(voice_id, text, tmp_wav)
 
         # Log TTS usage
         log_tts_usage(voice_id, text, tmp_wav, tts_processing_time)
         
-        if speak:
-            # Transition to audio playback stage
-            start_system_processing('aplay')
-            
-            # Play using Popen for interruptibility
-            current_audio_process = subprocess.Popen(
-                ["aplay", "-D", AUDIO_DEVICE, tmp_wav],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            current_audio_process.wait()
-            current_audio_process = None
-            
-            os.remove(tmp_wav)
-            
-            # Stop all LEDs after playback
-            stop_system_processing()
-
-            return jsonify({"status": "success", "message": f"Spoken with {voice_id}: {text}"})
-        else:
-            return send_file(tmp_wav, mimetype="audio/wav", as_attachment=True, download_name="tts.wav")
+        return send_file(tmp_wav, mimetype="audio/wav", as_attachment=True, download_name="tts.wav")
             
     except Exception as e:
         stop_system_processing()
@@ -2546,27 +5189,10 @@ def tts():
         return jsonify({"status": "error", "message": "No text provided"}), 400
 
     try:
-        model_path, config_path = find_voice_files(voice_id)
         tmp_wav = f"/tmp/{uuid.uuid4().hex}.wav"
 
         play_sound_async(play_tts_tune, voice_id)  # Play tune before TTS asynchronously
-        tts_start_time = time.time()
-        result = subprocess.run(
-            ["/home/codemusic/roverseer_venv/bin/piper",
-             "--model", model_path,
-             "--config", config_path,
-             "--output_file", tmp_wav],
-            input=text.encode(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        tts_processing_time = time.time() - tts_start_time
-
-        if result.returncode != 0:
-            return jsonify({
-                "status": "error",
-                "message": f"Piper TTS failed: {result.stderr.decode()}"
-            }), 500
+        tts_processing_time = synthesize_to_wav(voice_id, text, tmp_wav)
 
         # Log TTS usage
         log_tts_usage(voice_id, text, tmp_wav, tts_processing_time)
@@ -2595,6 +5221,11 @@ def chat_unified():
             model:
               type: string
               example: tinydolphin:1.1b
+              description: Model name, or "auto" to pick the best model expected to answer within max_latency_s
+            max_latency_s:
+              type: number
+              example: 15
+              description: Latency budget - routes to the most capable model expected to finish in time
             system:
               type: string
               example: You are RoverSeer, a helpful assistant.
@@ -2616,37 +5247,91 @@ def chat_unified():
               type: string
               enum: ['text', 'audio_file', 'speak']
               description: Output format - text only, audio file, or speak on device
+            stream:
+              type: boolean
+              default: false
+              description: With audio_file, send audio chunked as sentences are generated and synthesized
+            format:
+              type: string
+              enum: ['wav', 'pcm']
+              default: wav
+              description: Streamed audio format - WAV with open-ended length, or raw 16-bit mono PCM
+            cache:
+              type: boolean
+              default: false
+              description: For text and audio_file, reuse an identical earlier reply (send Cache-Control no-cache to refresh it)
           required:
             - messages
     responses:
       200:
         description: Response in requested format
     """
-    global current_audio_process
     data = request.get_json(silent=True)
     if not data or "messages" not in data:
         return jsonify({"error": "Missing messages"}), 400
 
-    model = data.get("model", DEFAULT_MODEL)
     messages = data.get("messages", [])
     system_message = data.get("system", "You are RoverSeer, a helpful assistant.")
     voice = data.get("voice", DEFAULT_VOICE)
     
+    try:
+        model, _ = resolve_requested_model(data, messages, system_message)
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_latency_s must be a number"}), 400
+    
     # For backward compatibility, determine output type from endpoint
     output_type = data.get("output_type")
     if not output_type:
         # Default to text output for /chat endpoint
         output_type = "text"
     
+    stream = data.get("stream", False)
+    audio_format = data.get("format", "wav")
+    if audio_format not in AUDIO_STREAM_FORMATS:
+        return jsonify({"error": f"Unsupported format: {audio_format}"}), 400
+    
     try:
         # Start LLM processing LED
         start_system_processing('B')
-        reply = run_chat_completion(model, messages, system_message)
+        
+        if output_type == "speak":
+            # Intro covers the thinking time, then the reply is spoken sentence by sentence
+            play_sound_async(play_voice_intro, voice)
+            if SPEECH_PIPELINE_ENABLED:
+                reply_source = stream_chat_completion(model, messages, system_message)
+            else:
+                reply_source = [run_chat_completion(model, messages, system_message)]
+            play_sound_async(play_tts_tune, voice)
+            reply = speak_streamed_reply(reply_source, voice)
+            
+            return jsonify({
+                "status": "success",
+                "model": model,
+                "spoken_text": reply,
+                "voice_used": voice
+            })
+        
+        if output_type == "audio_file" and stream:
+            # Audio goes out sentence by sentence while the LLM is still generating
+            if SPEECH_PIPELINE_ENABLED:
+                reply_source = stream_chat_completion(model, messages, system_message)
+            else:
+                reply_source = [run_chat_completion(model, messages, system_message)]
+            play_sound_async(play_tts_tune, voice)
+            return stream_speech_response(reply_source, voice, audio_format, download_name=f"chat_tts.{audio_format}")
+        
+        cache_read, cache_write = get_response_cache_policy(data)
+        result = run_chat_completion_with_details(
+            model, messages, system_message,
+            cache_read=cache_read, cache_write=cache_write
+        )
+        reply = result["content"]
+        cache_status = cache_status_header(cache_read, cache_write, result["cached"])
         
         # For text-only response, stop LEDs
         if output_type == "text":
             stop_system_processing()
-            return jsonify({
+            response = jsonify({
                 "id": f"chatcmpl-{uuid.uuid4().hex[:8]}",
                 "object": "chat.completion",
                 "created": int(uuid.uuid1().time),
@@ -2656,77 +5341,41 @@ def chat_unified():
                     "message": {"role": "assistant", "content": reply},
                     "finish_reason": "stop"
                 }],
-                "usage": {
-                    "prompt_tokens": len(json.dumps(messages).split()),
-                    "completion_tokens": len(reply.split()),
-                    "total_tokens": len(json.dumps(messages).split()) + len(reply.split())
-                }
+                "usage": openai_usage(result["usage"], messages, reply)
             })
+            response.headers["X-RoverSeer-Cache"] = cache_status
+            return response
         
-        # For audio outputs, generate TTS
-        if output_type in ["audio_file", "speak"]:
-            # Play voice intro before TTS (only when speaking)
-            if output_type == "speak":
-                play_sound_async(play_voice_intro, voice)
-
+        # For audio file output, generate TTS
+        if output_type == "audio_file":
             # Generate WAV with Piper
-            model_path, config_path = find_voice_files(voice)
             tmp_wav = f"/tmp/{uuid.uuid4().hex}.wav"
             
             # Transition to TTS stage
             start_system_processing('C')
             play_sound_async(play_tts_tune, voice)  # Play tune before TTS asynchronously
             
-            tts_start_time = time.time()
-            tts_result = subprocess.run(
-                ["/home/codemusic/roverseer_venv/bin/piper",
-                 "--model", model_path,
-                 "--config", config_path,
-                 "--output_file", tmp_wav],
-                input=reply.encode(),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            tts_processing_time = time.time() - tts_start_time
-
-            if tts_result.returncode != 0:
+            try:
+                tts_processing_time = synthesize_to_wav(voice, reply, tmp_wav)
+            except Exception as e:
+                stop_system_processing()
                 return jsonify({
                     "status": "error",
-                    "message": f"Piper TTS failed: {tts_result.stderr.decode()}"
+                    "message": str(e)
                 }), 500
 
             # Log TTS usage
             log_tts_usage(voice, reply, tmp_wav, tts_processing_time)
+            stop_system_processing()
 
-            if output_type == "speak":
-                # Speak on rover
-                # Transition to audio playback
-                start_system_processing('aplay')
-                
-                # Speak on rover using Popen for interruptibility
-                current_audio_process = subprocess.Popen(
-                    ["aplay", "-D", AUDIO_DEVICE, tmp_wav],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                current_audio_process.wait()
-                current_audio_process = None
-                
-                os.remove(tmp_wav)
-                
-                # Stop all LEDs after playback
-                stop_system_processing()
-
-                return jsonify({
-                    "status": "success",
-                    "model": model,
-                    "spoken_text": reply,
-                    "voice_used": voice
-                })
-            else:  # audio_file
-                # Return audio file
-                return send_file(tmp_wav, mimetype="audio/wav", as_attachment=True, download_name="chat_tts.wav")
+            # Return audio file
+            response = send_file(tmp_wav, mimetype="audio/wav", as_attachment=True, download_name="chat_tts.wav")
+            response.headers["X-RoverSeer-Cache"] = cache_status
+            return response
 
+    except SchedulerBusyError as e:
+        stop_system_processing()
+        return scheduler_busy_response(e)
     except Exception as e:
         stop_system_processing()
         return jsonify({"error": str(e)}), 500
@@ -2754,6 +5403,10 @@ def insight():
             prompt:
               type: string
               example: Tell me a weird fact about platypuses.
+            cache:
+              type: boolean
+              default: false
+              description: Reuse an identical earlier reply (send Cache-Control no-cache to refresh it)
           required:
             - prompt
     responses:
@@ -2768,10 +5421,18 @@ def insight():
     prompt = data["prompt"].strip()
     messages = [{"role": "user", "content": prompt}]
     system_message = data.get("system", "You are RoverSeer, an insightful assistant.")
+    cache_read, cache_write = get_response_cache_policy(data)
 
     try:
-        reply = run_chat_completion(model, messages, system_message)
-        return jsonify({"response": reply})
+        result = run_chat_completion_with_details(
+            model, messages, system_message,
+            cache_read=cache_read, cache_write=cache_write
+        )
+        response = jsonify({"response": result["content"]})
+        response.headers["X-RoverSeer-Cache"] = cache_status_header(cache_read, cache_write, result["cached"])
+        return response
+    except SchedulerBusyError as e:
+        return scheduler_busy_response(e)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -2795,13 +5456,12 @@ def transcribe_openai_style():
         return jsonify({"error": "No file uploaded"}), 400
 
     file = request.files['file']
-    tmp_path = f"/tmp/{uuid.uuid4().hex}.wav"
-    file.save(tmp_path)
 
     try:
-        transcript = transcribe_audio(tmp_path)
-        os.remove(tmp_path)
+        transcript = transcribe_upload(file)
         return jsonify({"text": transcript})
+    except AudioUploadError as e:
+        return audio_upload_error_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2836,11 +5496,23 @@ def transcribe_chat_voice():
         required: false
         default: true
         description: If true, speaks on device; if false, returns audio file
+      - in: formData
+        name: stream
+        type: boolean
+        required: false
+        default: false
+        description: When returning audio, send it chunked as sentences are generated and synthesized
+      - in: formData
+        name: format
+        type: string
+        enum: ['wav', 'pcm']
+        required: false
+        default: wav
+        description: Streamed audio format - WAV with open-ended length, or raw 16-bit mono PCM
     responses:
       200:
         description: Either JSON with transcript/reply or WAV audio file
     """
-    global current_audio_process
     if 'file' not in request.files:
         return jsonify({"error": "Missing audio file"}), 400
 
@@ -2850,84 +5522,76 @@ def transcribe_chat_voice():
     
     # Default to playing on device for this endpoint
     speak = request.form.get('speak', 'true').lower() == 'true'
-
-    tmp_audio = f"/tmp/{uuid.uuid4().hex}.wav"
-    file.save(tmp_audio)
+    stream = request.form.get('stream', 'false').lower() == 'true'
+    audio_format = request.form.get('format', 'wav')
+    if audio_format not in AUDIO_STREAM_FORMATS:
+        return jsonify({"error": f"Unsupported format: {audio_format}"}), 400
 
     try:
         # 1. Transcribe
-        transcript = transcribe_audio(tmp_audio)
-        os.remove(tmp_audio)
+        transcript = transcribe_upload(file)
 
         # 2. LLM reply
         # Transition to LLM stage
         start_system_processing('B')
         messages = [{"role": "user", "content": transcript}]
         system_message = "You are RoverSeer, a helpful voice assistant."
-        reply = run_chat_completion(model, messages, system_message)
-
-        # Play voice intro before TTS (only when speaking)
+        
         if speak:
+            # 3. Speak it! Sentence by sentence (while the LLM is still generating when streaming)
             play_sound_async(play_voice_intro, voice)
+            if SPEECH_PIPELINE_ENABLED:
+                reply_source = stream_chat_completion(model, messages, system_message)
+            else:
+                reply_source = [run_chat_completion(model, messages, system_message)]
+            play_sound_async(play_tts_tune, voice)
+            reply = speak_streamed_reply(reply_source, voice)
+            
+            return jsonify({
+                "transcript": transcript,
+                "reply": reply,
+                "voice": voice,
+                "model": model
+            })
+        
+        if stream:
+            # 3. Stream audio back sentence by sentence while the LLM is still generating
+            if SPEECH_PIPELINE_ENABLED:
+                reply_source = stream_chat_completion(model, messages, system_message)
+            else:
+                reply_source = [run_chat_completion(model, messages, system_message)]
+            play_sound_async(play_tts_tune, voice)
+            return stream_speech_response(reply_source, voice, audio_format, download_name=f"response.{audio_format}")
+        
+        reply = run_chat_completion(model, messages, system_message)
 
         # 3. TTS (Piper)
-        model_path, config_path = find_voice_files(voice)
         tmp_output = f"/tmp/{uuid.uuid4().hex}_spoken.wav"
         
         # Transition to TTS stage
         start_system_processing('C')
         play_sound_async(play_tts_tune, voice)  # Play TTS tune asynchronously
         
-        tts_start_time = time.time()
-        tts_result = subprocess.run(
-            ["/home/codemusic/roverseer_venv/bin/piper",
-             "--model", model_path,
-             "--config", config_path,
-             "--output_file", tmp_output],
-            input=reply.encode(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        tts_processing_time = time.time() - tts_start_time
-
-        if tts_result.returncode != 0:
-            return jsonify({
-                "error": "Piper failed",
-                "stderr": tts_result.stderr.decode()
-            }), 500
-
-        # Log TTS usage
-        log_tts_usage(voice, reply, tmp_output, tts_processing_time)
-        
-        if speak:
-            # 4. Speak it!
-            # Transition to audio playback
-            start_system_processing('aplay')
-            
-            # Speak on rover using Popen for interruptibility
-            current_audio_process = subprocess.Popen(
-                ["aplay", "-D", AUDIO_DEVICE, tmp_output],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            current_audio_process.wait()
-            current_audio_process = None
-            
-            os.remove(tmp_output)
-            
-            # Stop all LEDs
+        try:
+            tts_processing_time = synthesize_to_wav(voice, reply, tmp_output)
+        except Exception as e:
             stop_system_processing()
+            return jsonify({
+                "error": "Piper failed",
+                "stderr": str(e)
+            }), 500
+
+        # Log TTS usage
+        log_tts_usage(voice, reply, tmp_output, tts_processing_time)
+        stop_system_processing()
+        
+        # 4. Return WAV
+        return send_file(tmp_output, mimetype="audio/wav", as_attachment=True, download_name="response.wav")
 
-            return jsonify({
-                "transcript": transcript,
-                "reply": reply,
-                "voice": voice,
-                "model": model
-            })
-        else:
-            # 4. Return WAV
-            return send_file(tmp_output, mimetype="audio/wav", as_attachment=True, download_name="response.wav")
-
+    except SchedulerBusyError as e:
+        return scheduler_busy_response(e)
+    except AudioUploadError as e:
+        return audio_upload_error_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2962,13 +5626,44 @@ def bicameral_chat():
               type: boolean
               example: true
               description: If true, speaks on device; if false, returns audio file
+            minds:
+              type: array
+              description: Minds to consult in parallel (defaults to the Logical and Creative minds)
+              items:
+                type: object
+                properties:
+                  name:
+                    type: string
+                    example: Logical
+                  model:
+                    type: string
+                    example: DolphinSeek-R1:latest
+                  system:
+                    type: string
+                    example: You are the Logical Mind.
+            mind_timeout:
+              type: number
+              example: 120
+              description: Seconds after which a mind that hasn't answered is left out
+            latency_budget:
+              type: number
+              example: 30
+              description: Converge with whatever has returned after this many seconds
+            min_responses:
+              type: integer
+              default: 1
+              description: Minimum answers to wait for before the latency budget applies
+            convergence:
+              type: string
+              enum: ['synthesize', 'fastest']
+              default: synthesize
+              description: synthesize merges all answers with one more generation; fastest returns the quickest answer
           required:
             - prompt
     responses:
       200:
         description: Either JSON with spoken status or WAV audio file
     """
-    global current_audio_process, convergence_model
     data = request.get_json(silent=True)
     if not data or "prompt" not in data:
         return jsonify({"status": "error", "message": "Missing prompt"}), 400
@@ -2977,9 +5672,23 @@ def bicameral_chat():
     system = data.get("system", "").strip()
     voice = data.get("voice", DEFAULT_VOICE)
     speak = data.get("speak", True)
+    minds = data.get("minds") or ENSEMBLE_MINDS
+    convergence = data.get("convergence", "synthesize")
 
     if not prompt:
         return jsonify({"status": "error", "message": "No prompt provided"}), 400
+    if not isinstance(minds, list) or not all(isinstance(mind, dict) and mind.get("model") for mind in minds):
+        return jsonify({"status": "error", "message": "minds must be a list of objects with a model"}), 400
+    if convergence not in CONVERGENCE_STRATEGIES:
+        return jsonify({"status": "error", "message": f"Unknown convergence strategy: {convergence}"}), 400
+
+    try:
+        mind_timeout = float(data.get("mind_timeout", ENSEMBLE_MIND_TIMEOUT))
+        latency_budget = data.get("latency_budget", ENSEMBLE_LATENCY_BUDGET)
+        latency_budget = float(latency_budget) if latency_budget else None
+        min_responses = int(data.get("min_responses", 1))
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "mind_timeout, latency_budget and min_responses must be numbers"}), 400
 
     try:
         # Play the unique bicameral connection tune
@@ -2988,137 +5697,66 @@ def bicameral_chat():
         # Start LLM processing indicator
         start_system_processing('B')
         
-        # System message for the bicameral process
-        bicameral_system_message = f"Bicameral processing for: {prompt[:50]}..."
-        
-        # Randomly decide which model will handle convergence
-        convergence_model = random.choice([logical_model, creative_model])
-        first_model = logical_model if convergence_model == creative_model else creative_model
-        
         try:
-            # 1. Send to First Mind
-            first_start_time = time.time()
-            first_messages = [{"role": "user", "content": prompt}]
-            first_system = logical_message if first_model == logical_model else creative_message
-            
-            first_response = run_chat_completion(first_model, first_messages, first_system, skip_logging=True)
-            first_time = time.time() - first_start_time
-            
-            # Keep LLM LED state, don't stop
-            time.sleep(0.5)  # Brief pause between minds
-            
-            # 2. Send to Second Mind (which will also handle convergence)
-            second_start_time = time.time()
-            second_messages = [{"role": "user", "content": prompt}]
-            second_system = logical_message if convergence_model == logical_model else creative_message
-            
-            second_response = run_chat_completion(convergence_model, second_messages, second_system, skip_logging=True)
-            second_time = time.time() - second_start_time
-            
-            # Keep LLM LED state, don't stop
-            time.sleep(0.5)  # Brief pause before convergence
-            
-            # 3. Send all to Convergence Mind (using the same model as second mind)
-            convergence_start_time = time.time()
-            
-            # Build convergence prompt base
-            convergence_prompt_base = f"""
-                        [IMPORTANT: You are a unified intelligence — a balanced mind that merges diverse perspectives into a single, coherent, and actionable insight.
-
-                        Draw equally from all provided inputs, honoring each viewpoint without bias or preference. Your goal is not to summarize or compare, but to integrate — forming a new whole that speaks with clarity, depth, and nuance.
-
-                        Respond as a single voice. 
-                        Do not mention or describe the original perspectives. 
-                        Do not reflect on your own reasoning process. 
-                        Simply provide the final, synthesized insight as your complete response.]
-
-                    [Original request:
-                    {prompt}
-
-                    Input 1:
-                    {first_response}
-
-                    Input 2:
-                    {second_response}]"""
-            
-            # If system message provided, prepend it
-            if system:
-                convergence_prompt = system + ". " + convergence_prompt_base
-            else:
-                convergence_prompt = convergence_prompt_base
-            
-            convergence_messages = [{"role": "user", "content": convergence_prompt}]
-
-            final_response = run_chat_completion(convergence_model, convergence_messages, convergence_message, skip_logging=True)
-            convergence_time = time.time() - convergence_start_time
-            
-            # Log PenphinMind usage
-            log_penphin_mind_usage(
-                first_model, convergence_model, convergence_model,
-                bicameral_system_message, prompt,
-                first_response, first_time,
-                second_response, second_time,
-                final_response, convergence_time
+            # Every mind answers in parallel, then the answers are converged
+            ensemble = run_ensemble(
+                prompt, system, minds,
+                mind_timeout=mind_timeout,
+                latency_budget=latency_budget,
+                min_responses=min_responses,
+                convergence=convergence
             )
+            final_response = ensemble["final_response"]
+            # The original two-mind response fields, kept alongside the full minds list
+            mind_results = ensemble["minds"]
+            first_response = mind_results[0]["response"] if len(mind_results) > 0 else None
+            second_response = mind_results[1]["response"] if len(mind_results) > 1 else None
+            
+            if speak:
+                # Introduce the voice, then stream the synthesis sentence by sentence
+                play_sound_async(play_voice_intro, voice)
+                play_sound_async(play_tts_tune, voice)
+                speak_streamed_reply([final_response], voice)
+                
+                return jsonify({
+                    "status": "success",
+                    "original_prompt": prompt,
+                    "first_response": first_response,
+                    "second_response": second_response,
+                    "minds": ensemble["minds"],
+                    "convergence_model": ensemble["convergence_model"],
+                    "total_time": ensemble["total_time"],
+                    "final_synthesis": final_response,
+                    "voice_used": voice,
+                    "spoken": True
+                })
             
             # Generate TTS for final response
-            model_path, config_path = find_voice_files(voice)
             tmp_wav = f"/tmp/{uuid.uuid4().hex}.wav"
             
             # Transition to TTS stage
             start_system_processing('C')
             play_sound_async(play_tts_tune, voice)  # Play TTS tune asynchronously
             
-            tts_start_time = time.time()
-            tts_result = subprocess.run(
-                ["/home/codemusic/roverseer_venv/bin/piper",
-                 "--model", model_path,
-                 "--config", config_path,
-                 "--output_file", tmp_wav],
-                input=final_response.encode(),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            tts_processing_time = time.time() - tts_start_time
-
-            if tts_result.returncode != 0:
+            try:
+                tts_processing_time = synthesize_to_wav(voice, final_response, tmp_wav)
+            except Exception as e:
                 stop_system_processing()
                 return jsonify({
                     "status": "error",
-                    "message": f"Text-to-speech conversion failed: {tts_result.stderr.decode()}"
+                    "message": f"Text-to-speech conversion failed: {e}"
                 }), 500
 
             # Log TTS usage
             log_tts_usage(voice, final_response, tmp_wav, tts_processing_time)
             
-            if speak:
-                # Play voice intro before speaking
-                play_sound_async(play_voice_intro, voice)
-                
-                # Transition to audio playback
-                start_system_processing('aplay')
-                
-                # Speak on rover
-                subprocess.run(["aplay", "-D", AUDIO_DEVICE, tmp_wav])
-                os.remove(tmp_wav)
-                
-                # Stop all LEDs
-                stop_system_processing()
-                
-                return jsonify({
-                    "status": "success",
-                    "original_prompt": prompt,
-                    "first_response": first_response,
-                    "second_response": second_response,
-                    "final_synthesis": final_response,
-                    "voice_used": voice,
-                    "spoken": True
-                })
-            else:
-                # Return audio file
-                stop_system_processing()
-                return send_file(tmp_wav, mimetype="audio/wav", as_attachment=True, download_name="bicameral_synthesis.wav")
+            # Return audio file
+            stop_system_processing()
+            return send_file(tmp_wav, mimetype="audio/wav", as_attachment=True, download_name="bicameral_synthesis.wav")
                 
+        except SchedulerBusyError as e:
+            stop_system_processing()
+            return scheduler_busy_response(e)
         except Exception as e:
             stop_system_processing()
             error_msg = str(e)
@@ -3333,13 +5971,9 @@ def transcribe_and_chat():
     model = request.form.get('model', DEFAULT_MODEL)
     voice = request.form.get('voice', DEFAULT_VOICE)
 
-    tmp_path = f"/tmp/{uuid.uuid4().hex}.wav"
-    file.save(tmp_path)
-
     try:
         # Transcribe audio
-        transcript = transcribe_audio(tmp_path)
-        os.remove(tmp_path)
+        transcript = transcribe_upload(file)
 
         # Send to LLM
         messages = [{"role": "user", "content": transcript}]
@@ -3354,6 +5988,10 @@ def transcribe_and_chat():
             "reply": reply
         })
 
+    except SchedulerBusyError as e:
+        return scheduler_busy_response(e)
+    except AudioUploadError as e:
+        return audio_upload_error_response(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -3374,7 +6012,11 @@ def openai_compatible_chat():
             model:
               type: string
               example: tinydolphin:1.1b
-              description: The model to use for completion
+              description: The model to use for completion, or "auto" to pick one within max_latency_s
+            max_latency_s:
+              type: number
+              example: 15
+              description: Latency budget - routes to the most capable model expected to finish in time
             messages:
               type: array
               items:
@@ -3393,12 +6035,16 @@ def openai_compatible_chat():
             max_tokens:
               type: integer
               description: Maximum tokens to generate (ignored in current implementation)
+            stream:
+              type: boolean
+              default: false
+              description: If true, tokens are sent as OpenAI-style Server-Sent Events (chat.completion.chunk)
           required:
             - model
             - messages
     responses:
       200:
-        description: OpenAI-compatible chat completion response
+        description: OpenAI-compatible chat completion response (text/event-stream if stream is true)
         schema:
           type: object
           properties:
@@ -3447,52 +6093,35 @@ def openai_compatible_chat():
     if not data or "messages" not in data:
         return jsonify({"error": {"message": "Missing messages", "type": "invalid_request_error"}}), 400
 
-    model = data.get("model", DEFAULT_MODEL)
-    messages = data.get("messages", [])
-    
-    # Extract system message if present
-    system_message = None
-    filtered_messages = []
-    
-    for msg in messages:
-        if msg.get("role") == "system":
-            system_message = msg.get("content", "")
-        else:
-            filtered_messages.append(msg)
-    
-    # Use default system message if none provided
-    if not system_message:
-        system_message = "You are RoverSeer, a helpful assistant."
+    filtered_messages, system_message = split_system_message(data.get("messages", []))
+
+    try:
+        model, _ = resolve_requested_model(data, filtered_messages, system_message)
+    except (TypeError, ValueError):
+        return jsonify({"error": {"message": "max_latency_s must be a number", "type": "invalid_request_error"}}), 400
+
+    if data.get("stream", False):
+        return stream_openai_chat_response(model, filtered_messages, system_message)
 
     try:
         # Start LLM processing LED if this is from the recording pipeline
         if not any(stage for stage in pipeline_stages.values() if stage):
             start_system_processing('B')
         
-        reply = run_chat_completion(model, filtered_messages, system_message)
+        result = run_chat_completion_with_details(model, filtered_messages, system_message)
+        reply = result["content"]
         
         # Stop LED processing if we started it
         if pipeline_stages.get('llm_active'):
             stop_system_processing()
         
         # Return OpenAI-compatible response format
-        return jsonify({
-            "id": f"chatcmpl-{uuid.uuid4().hex[:8]}",
-            "object": "chat.completion",
-            "created": int(time.time()),
-            "model": model,
-            "choices": [{
-                "index": 0,
-                "message": {"role": "assistant", "content": reply},
-                "finish_reason": "stop"
-            }],
-            "usage": {
-                "prompt_tokens": len(json.dumps(filtered_messages).split()),
-                "completion_tokens": len(reply.split()),
-                "total_tokens": len(json.dumps(filtered_messages).split()) + len(reply.split())
-            }
-        })
+        return jsonify(openai_completion(model, filtered_messages, reply, result["usage"]))
         
+    except SchedulerBusyError as e:
+        if pipeline_stages.get('llm_active'):
+            stop_system_processing()
+        return scheduler_busy_response(e)
     except Exception as e:
         # Stop LED processing on error
         if pipeline_stages.get('llm_active'):
@@ -3505,16 +6134,103 @@ def openai_compatible_chat():
             }
         }), 500
     
-# Initialize Rainbow Driver before running the app
+def split_system_message(messages, default="You are RoverSeer, a helpful assistant."):
+    """Separate OpenAI-style messages into (non-system messages, system message or default)"""
+    system_message = None
+    filtered_messages = []
+    for msg in messages:
+        if msg.get("role") == "system":
+            system_message = msg.get("content", "")
+        else:
+            filtered_messages.append(msg)
+    return filtered_messages, system_message or default
+
+def openai_completion(model, messages, reply, usage):
+    """OpenAI-compatible chat.completion body"""
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:8]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": reply},
+            "finish_reason": "stop"
+        }],
+        "usage": openai_usage(usage, messages, reply)
+    }
+
+def openai_stream_chunk(completion_id, created, model, delta, finish_reason=None):
+    """One Server-Sent-Events chat.completion.chunk line"""
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "delta": delta,
+            "finish_reason": finish_reason
+        }]
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+def stream_openai_chat_response(model, messages, system_message):
+    """Wrap stream_chat_completion as an OpenAI-compatible Server-Sent-Events response"""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
+    created = int(time.time())
+    
+    # Created up front so an over-budget queue is a 429, not an error inside the stream
+    token_stream = stream_chat_completion(model, messages, system_message)
+    
+    def sse_chunk(delta, finish_reason=None):
+        return openai_stream_chunk(completion_id, created, model, delta, finish_reason)
+    
+    def generate():
+        # Start LLM processing LED if nothing else is running
+        started_led = False
+        if not any(stage for stage in pipeline_stages.values() if stage):
+            start_system_processing('B')
+            started_led = True
+        
+        try:
+            yield sse_chunk({"role": "assistant"})
+            for token in token_stream:
+                yield sse_chunk({"content": token})
+            yield sse_chunk({}, finish_reason="stop")
+        except Exception as e:
+            error_payload = {"error": {"message": str(e), "type": "internal_server_error"}}
+            yield f"data: {json.dumps(error_payload)}\n\n"
+        finally:
+            token_stream.close()
+            if started_led and pipeline_stages.get('llm_active'):
+                stop_system_processing()
+        
+        yield "data: [DONE]\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Initialize Rainbow Driver before running the app (only the hardware owner touches GPIO)
 rainbow = None
-try:
-    rainbow = RainbowDriver(num_leds=7, brightness=2)
-    setup_button_handlers()  # Setup button handlers after initialization
-    start_sound_queue_worker()  # Start the sound queue worker
-    print("✅ Rainbow Driver initialized successfully")
-except Exception as e:
-    print(f"❌ Failed to initialize Rainbow Driver: {e}")
-    rainbow = None
+if ROVERSEER_ROLE == "http":
+    start_sound_queue_worker()  # Queued tunes are forwarded to the hardware owner in order
+    print(f"HTTP worker {os.getpid()}: hardware calls go to the owner at {hardware_client.address}")
+else:
+    try:
+        rainbow = RainbowDriver(num_leds=7, brightness=2)
+        setup_button_handlers()  # Setup button handlers after initialization
+        start_sound_queue_worker()  # Start the sound queue worker
+        print("✅ Rainbow Driver initialized successfully")
+    except Exception as e:
+        print(f"❌ Failed to initialize Rainbow Driver: {e}")
+        rainbow = None
+
+# Keep the default voice resident so the first spoken reply doesn't pay the model load
+preload_voice_async(DEFAULT_VOICE)
 
 
 
@@ -3569,15 +6285,15 @@ def list_models():
     """
     try:
         # Get models from Ollama
-        res = requests.get("http://roverseer.local:11434/api/tags")
-        if not res.ok:
+        try:
+            tags = ollama.list_models(timeout=OLLAMA_TAGS_TIMEOUT)
+        except Exception:
             return jsonify({"error": "Failed to fetch models from Ollama"}), 500
             
-        tags_data = res.json()
         models_info = []
         
         # Process each model
-        for model in tags_data.get("models", []):
+        for model in tags:
             model_name = model.get("name", "")
             model_size_bytes = model.get("size", 0)
             details = model.get("details", {})
@@ -3619,7 +6335,7 @@ def list_models():
         # Add runtime info to each model
         for model in models_info:
             model_name = model["name"]
-            if model_name in model_stats:
+            if model_stats.get(model_name, {}).get("run_count"):
                 model["average_runtime"] = round(model_stats[model_name]["average_runtime"], 2)
                 model["run_count"] = model_stats[model_name]["run_count"]
                 model["last_runtime"] = round(model_stats[model_name]["last_runtime"], 2)
@@ -3658,13 +6374,499 @@ def list_models():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/stats', methods=['GET'])
+def stats():
+    """
+    Runtime performance counters for the speech and LLM layers.
+    ---
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Cache and engine statistics
+        schema:
+          type: object
+          properties:
+            tts_cache:
+              type: object
+              description: TTS audio cache size, hit/miss counters and evictions
+            voice_engine:
+              type: object
+              description: Piper voices currently loaded in memory
+            ollama:
+              type: object
+              description: Ollama base URL (or each pooled backend's health, load and models), timeouts and per-endpoint call latency
+            response_cache:
+              type: object
+              description: LLM response cache size and hit/miss/bypass counters
+            request_coalescing:
+              type: object
+              description: Chat requests seen, how many joined an identical in-flight request, and how many are in flight
+            llm_scheduler:
+              type: object
+              description: LLM slots in use, queue depth per priority, grants, 429 rejections and queue wait times
+            model_throughput:
+              type: object
+              description: Per-model prompt and generation tokens/sec and cold-load overhead from Ollama timings
+            model_residency:
+              type: object
+              description: Models loaded in Ollama, the rover's selected model, keep_alive per model, warm-ups and evictions
+            conversation_context:
+              type: object
+              description: Web and button conversation history size, estimated tokens and summary compactions
+            asr:
+              type: object
+              description: The machine's Whisper worker pool (from the hardware owner in the http role) - queue depth and per-worker state, jobs, errors and utilization (null when transcribing in-process)
+            shared_state:
+              type: object
+              description: Process role and pid, state store backend, audio output in use and the last convergence model
+            hardware:
+              type: object
+              description: Hardware owner IPC calls and failures (http role) or connected clients and audio streams (hardware role)
+    """
+    return jsonify({
+        "tts_cache": tts_cache.stats(),
+        "voice_engine": {
+            "in_process": PiperVoice is not None,
+            "resident_voices": voice_engine.resident_voices(),
+            "max_voices": voice_engine.max_voices
+        },
+        "ollama": ollama.stats(),
+        "response_cache": response_cache.stats(),
+        "request_coalescing": chat_flights.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "model_throughput": get_model_throughput(),
+        "model_residency": model_residency.stats(),
+        "conversation_context": {
+            "web": history.stats(),
+            "button": button_history.stats()
+        },
+        "asr": asr_stats(),
+        "shared_state": {
+            "role": ROVERSEER_ROLE,
+            "pid": os.getpid(),
+            "store": state_store.stats(),
+            "audio_output": state_store.get("audio_output"),
+            "convergence_model": state_store.get("convergence_model")
+        },
+        "hardware": (hardware_client or hardware_server).stats() if (hardware_client or hardware_server) else None
+    })
+
+# -------- ASGI SERVING -------- #
+# ROVERSEER_SERVER=asgi serves the API with uvicorn. Chat completions
+# (/v1/chat/completions, /insight and text replies from /chat) run on the event
+# loop: the LLM queue is awaited and Ollama is streamed over httpx, so a client
+# waiting on a slow model doesn't hold a thread. Every other route goes to the
+# Flask app through asgiref's WsgiToAsgi, whose thread pool keeps ASR, TTS and
+# the hardware off the loop.
+try:
+    import httpx
+    import uvicorn
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:
+    httpx = uvicorn = WsgiToAsgi = None
+
+ROVERSEER_SERVER = os.environ.get("ROVERSEER_SERVER", "flask")  # "flask" or "asgi"
+ASGI_THREADS = int(os.environ.get("ROVERSEER_ASGI_THREADS", "16"))  # Flask routes and blocking helpers
+
+async_ollama_client = None
+
+def get_async_ollama_client():
+    global async_ollama_client
+    if async_ollama_client is None:
+        connect_timeout, read_timeout = ollama.timeout
+        async_ollama_client = httpx.AsyncClient(timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+    return async_ollama_client
+
+@asynccontextmanager
+async def async_ollama_stream(model, payload):
+    """
+    Streaming POST /api/chat over httpx. With a backend pool, a host that refuses
+    the connection is marked down and the next one tried, as OllamaBackendPool.request does.
+    """
+    client = get_async_ollama_client()
+    pooled = hasattr(ollama, "choose")
+    tried = []
+    last_error = None
+    
+    async with AsyncExitStack() as stack:
+        while True:
+            if pooled:
+                backend = ollama.choose(model, exclude=tried)
+                if backend is None:
+                    raise last_error
+                tried.append(backend)
+                base_url = backend.base_url
+            else:
+                backend, base_url = None, ollama.base_url
+            
+            try:
+                response = await stack.enter_async_context(client.stream("POST", f"{base_url}/api/chat", json=payload))
+            except httpx.ConnectError as e:
+                if not pooled:
+                    raise
+                # Never reached the host, so nothing ran there - try the next one
+                ollama.finish(backend)
+                ollama.mark_down(backend, e)
+                last_error = e
+                continue
+            except BaseException:
+                # Timeouts, read errors, or cancellation while waiting for the headers
+                if pooled:
+                    ollama.finish(backend)
+                raise
+            
+            if pooled:
+                stack.callback(ollama.finish, backend)
+            yield response
+            return
+
+async def async_ollama_chat(model, messages, system_message=None, priority=PRIORITY_API):
+    """
+    Event-loop counterpart of request_chat_stream: awaits a scheduler slot and
+    yields Ollama's chunk dicts (the final one carries the token counts).
+    Cancelling the task closes the Ollama response, which stops the generation.
+    """
+    ticket = await llm_scheduler.acquire_async(model, priority)
+    stop_timer = None
+    parts = []
+    finished = False
+    try:
+        # The tune and display may be IPC calls to the hardware owner
+        start_time, stop_timer = await asyncio.to_thread(begin_llm_feedback, model)
+        
+        user_prompt = ""
+        if messages and messages[-1].get("role") == "user":
+            user_prompt = messages[-1].get("content", "")
+        
+        if system_message and not any(msg.get("role") == "system" for msg in messages):
+            messages = [{"role": "system", "content": system_message}] + list(messages)
+        
+        model_residency.record_use(model)
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": True,
+            "keep_alive": model_residency.keep_alive_for(model)
+        }
+        async with async_ollama_stream(model, payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                chunk = parse_ollama_line(line, model)
+                if chunk is None:
+                    continue
+                parts.append(chunk.get("message", {}).get("content", ""))
+                yield chunk
+                if chunk.get("done"):
+                    finished = True
+                    break
+        
+        if not finished:
+            raise Exception(f"Ollama stream for model {model} ended before completion")
+        
+        # Stats and logs are file writes - keep them off the loop
+        await asyncio.to_thread(update_model_throughput, model, parse_ollama_usage(chunk))
+        await asyncio.to_thread(finish_llm_feedback, model, system_message, user_prompt, "".join(parts),
+                                start_time, stop_timer, False, count_prompt_chars(messages))
+    except (GeneratorExit, asyncio.CancelledError):
+        # Consumer or client went away - stop the display without waiting on it
+        if stop_timer is not None:
+            asyncio.get_running_loop().run_in_executor(None, stop_timer.set)
+        raise
+    except Exception:
+        if stop_timer is not None:
+            await asyncio.to_thread(stop_timer.set)
+        await asyncio.to_thread(stop_system_processing)
+        raise
+    finally:
+        llm_scheduler.release(ticket)
+
+async def async_chat_completion(model, messages, system_message=None, cache_read=False, cache_write=False):
+    """Event-loop counterpart of run_chat_completion_with_details (without coalescing)"""
+    request_key = make_chat_request_key(model, messages, system_message)
+    if cache_read:
+        cached_entry = response_cache.get(request_key)
+        if cached_entry is not None:
+            return {"content": cached_entry["response"], "usage": cached_entry.get("usage"), "cached": True}
+    
+    parts = []
+    usage = None
+    async for chunk in async_ollama_chat(model, messages, system_message):
+        parts.append(chunk.get("message", {}).get("content", ""))
+        if chunk.get("done"):
+            usage = parse_ollama_usage(chunk)
+    content = "".join(parts)
+    
+    if cache_write:
+        await asyncio.to_thread(response_cache.put, request_key, model, content, usage=usage)
+    return {"content": content, "usage": usage, "cached": False}
+
+async def read_asgi_body(receive):
+    """The whole request body, or None if the client disconnected first"""
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+async def send_asgi_json(send, payload, status=200, headers=None):
+    body = json.dumps(payload).encode()
+    response_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    for name, value in (headers or {}).items():
+        response_headers.append((name.lower().encode(), str(value).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": response_headers})
+    await send({"type": "http.response.body", "body": body})
+
+async def send_asgi_busy(send, error, payload):
+    """429 for a request rejected by the LLM scheduler"""
+    await send_asgi_json(send, payload, status=429, headers={"Retry-After": error.retry_after})
+
+async def run_until_disconnect(receive, handler):
+    """Run a handler coroutine, cancelling it (and its Ollama call) if the client disconnects"""
+    async def watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+    
+    task = asyncio.ensure_future(handler)
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        # Keep cancelling: a cancel that lands inside httpx's read timeout handling can be swallowed
+        while not task.done():
+            task.cancel()
+            await asyncio.wait({task}, timeout=0.1)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+async def asgi_openai_chat(data, headers, send):
+    """/v1/chat/completions on the event loop (see openai_compatible_chat)"""
+    if not data or "messages" not in data:
+        await send_asgi_json(send, {"error": {"message": "Missing messages", "type": "invalid_request_error"}}, status=400)
+        return
+    
+    filtered_messages, system_message = split_system_message(data.get("messages", []))
+    try:
+        model, _ = await asyncio.to_thread(resolve_requested_model, data, filtered_messages, system_message)
+    except (TypeError, ValueError):
+        await send_asgi_json(send, {"error": {"message": "max_latency_s must be a number", "type": "invalid_request_error"}}, status=400)
+        return
+    
+    if data.get("stream", False):
+        await asgi_openai_stream(model, filtered_messages, system_message, send)
+        return
+    
+    started_led = False
+    try:
+        if not any(stage for stage in pipeline_stages.values() if stage):
+            await asyncio.to_thread(start_system_processing, 'B')
+            started_led = True
+        result = await async_chat_completion(model, filtered_messages, system_message)
+        await send_asgi_json(send, openai_completion(model, filtered_messages, result["content"], result["usage"]))
+    except SchedulerBusyError as e:
+        await send_asgi_busy(send, e, {"status": "error", "message": str(e)})
+    except Exception as e:
+        await send_asgi_json(send, {"error": {"message": str(e), "type": "internal_server_error"}}, status=500)
+    finally:
+        if started_led and pipeline_stages.get('llm_active'):
+            await asyncio.to_thread(stop_system_processing)
+
+async def asgi_openai_stream(model, messages, system_message, send):
+    """OpenAI-compatible Server-Sent-Events stream (see stream_openai_chat_response)"""
+    try:
+        llm_scheduler.check_admission(model, PRIORITY_API)
+    except SchedulerBusyError as e:
+        await send_asgi_busy(send, e, {"status": "error", "message": str(e)})
+        return
+    
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
+    created = int(time.time())
+    
+    async def send_event(event):
+        await send({"type": "http.response.body", "body": event.encode(), "more_body": True})
+    
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")]
+    })
+    
+    started_led = False
+    if not any(stage for stage in pipeline_stages.values() if stage):
+        await asyncio.to_thread(start_system_processing, 'B')
+        started_led = True
+    
+    chunks = async_ollama_chat(model, messages, system_message)
+    try:
+        await send_event(openai_stream_chunk(completion_id, created, model, {"role": "assistant"}))
+        async for chunk in chunks:
+            content = chunk.get("message", {}).get("content", "")
+            if content:
+                await send_event(openai_stream_chunk(completion_id, created, model, {"content": content}))
+        await send_event(openai_stream_chunk(completion_id, created, model, {}, finish_reason="stop"))
+    except Exception as e:
+        error_payload = {"error": {"message": str(e), "type": "internal_server_error"}}
+        await send_event(f"data: {json.dumps(error_payload)}\n\n")
+    finally:
+        await chunks.aclose()
+        if started_led and pipeline_stages.get('llm_active'):
+            await asyncio.to_thread(stop_system_processing)
+    
+    await send({"type": "http.response.body", "body": b"data: [DONE]\n\n"})
+
+async def asgi_insight(data, headers, send):
+    """/insight on the event loop (see insight)"""
+    if not data or "prompt" not in data:
+        await send_asgi_json(send, {"status": "error", "message": "Missing prompt"}, status=400)
+        return
+    
+    model = data.get("model", DEFAULT_MODEL)
+    messages = [{"role": "user", "content": data["prompt"].strip()}]
+    system_message = data.get("system", "You are RoverSeer, an insightful assistant.")
+    cache_read, cache_write = get_response_cache_policy(data, headers)
+    
+    try:
+        result = await async_chat_completion(model, messages, system_message, cache_read, cache_write)
+        await send_asgi_json(
+            send, {"response": result["content"]},
+            headers={"X-RoverSeer-Cache": cache_status_header(cache_read, cache_write, result["cached"])}
+        )
+    except SchedulerBusyError as e:
+        await send_asgi_busy(send, e, {"status": "error", "message": str(e)})
+    except Exception as e:
+        await send_asgi_json(send, {"status": "error", "message": str(e)}, status=500)
+
+async def asgi_chat_text(data, headers, send):
+    """/chat with output_type "text" on the event loop (see chat_unified)"""
+    if not data or "messages" not in data:
+        await send_asgi_json(send, {"error": "Missing messages"}, status=400)
+        return
+    
+    messages = data.get("messages", [])
+    system_message = data.get("system", "You are RoverSeer, a helpful assistant.")
+    try:
+        model, _ = await asyncio.to_thread(resolve_requested_model, data, messages, system_message)
+    except (TypeError, ValueError):
+        await send_asgi_json(send, {"error": "max_latency_s must be a number"}, status=400)
+        return
+    
+    audio_format = data.get("format", "wav")
+    if audio_format not in AUDIO_STREAM_FORMATS:
+        await send_asgi_json(send, {"error": f"Unsupported format: {audio_format}"}, status=400)
+        return
+    
+    cache_read, cache_write = get_response_cache_policy(data, headers)
+    await asyncio.to_thread(start_system_processing, 'B')
+    try:
+        result = await async_chat_completion(model, messages, system_message, cache_read, cache_write)
+        await send_asgi_json(
+            send, openai_completion(model, messages, result["content"], result["usage"]),
+            headers={"X-RoverSeer-Cache": cache_status_header(cache_read, cache_write, result["cached"])}
+        )
+    except SchedulerBusyError as e:
+        await send_asgi_busy(send, e, {"status": "error", "message": str(e)})
+    except Exception as e:
+        await send_asgi_json(send, {"error": str(e)}, status=500)
+    finally:
+        await asyncio.to_thread(stop_system_processing)
+
+# (method, path) -> (handler(data, headers, send), predicate(data) for requests it serves)
+ASGI_NATIVE_ROUTES = {
+    ("POST", "/v1/chat/completions"): (asgi_openai_chat, lambda data: True),
+    ("POST", "/insight"): (asgi_insight, lambda data: True),
+    ("POST", "/chat"): (asgi_chat_text, lambda data: (data or {}).get("output_type") in (None, "text")),
+}
+
+def create_asgi_app():
+    """ASGI app serving ASGI_NATIVE_ROUTES on the event loop and everything else through Flask"""
+    flask_asgi = WsgiToAsgi(app)
+    
+    async def asgi_app(scope, receive, send):
+        route = ASGI_NATIVE_ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if route is None:
+            await flask_asgi(scope, receive, send)
+            return
+        
+        body = await read_asgi_body(receive)
+        if body is None:
+            return
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+        
+        handler, serves = route
+        if not isinstance(data, dict) or not serves(data):
+            # Hand the already-read body to Flask (e.g. /chat audio output)
+            replayed = False
+            
+            async def replay_receive():
+                nonlocal replayed
+                if not replayed:
+                    replayed = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                return await receive()
+            
+            await flask_asgi(scope, replay_receive, send)
+            return
+        
+        headers = {name.decode("latin-1").title(): value.decode("latin-1") for name, value in scope["headers"]}
+        await run_until_disconnect(receive, handler(data, headers, send))
+    
+    return asgi_app
+
+def run_asgi_server(host="0.0.0.0", port=5000):
+    """Serve with uvicorn, or fall back to the Flask server if the ASGI packages are missing"""
+    if uvicorn is None:
+        print("ASGI mode needs uvicorn, httpx and asgiref - falling back to the Flask server")
+        app.run(host=host, port=port)
+        return
+    
+    async def serve():
+        # WsgiToAsgi and asyncio.to_thread both run on the loop's default executor
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=ASGI_THREADS))
+        config = uvicorn.Config(create_asgi_app(), host=host, port=port, lifespan="off")
+        await uvicorn.Server(config).serve()
+    
+    asyncio.run(serve())
+
+# -------- HARDWARE OWNER -------- #
+def run_hardware_owner():
+    """Serve HARDWARE_FUNCTIONS and the audio device to HTTP workers until interrupted"""
+    global hardware_server
+    # Remote speech queues behind local replies on the same lock
+    hardware_server = HardwareServer(HARDWARE_FUNCTIONS, PCMAudioSink, audio_lock=audio_output_lock)
+    hardware_server.start()
+    print("Hardware owner running - buttons and audio here, HTTP in the http role workers")
+    try:
+        while True:
+            time.sleep(1)
+    finally:
+        hardware_server.stop()
+
 # -------- MAIN -------- #
 if __name__ == '__main__':
     try:
-        app.run(host="0.0.0.0", port=5000)
+        if ROVERSEER_ROLE == "hardware":
+            run_hardware_owner()
+        elif ROVERSEER_SERVER == "asgi":
+            run_asgi_server(host="0.0.0.0", port=5000)
+        else:
+            app.run(host="0.0.0.0", port=5000)
     finally:
         # Cleanup on exit
         stop_sound_queue_worker()
+        if mic_ring is not None:
+            mic_ring.stop()
+        if asr_pool is not None:
+            asr_pool.stop()
         if rainbow:
             # Turn off all LEDs
             for led in ['A', 'B', 'C']:
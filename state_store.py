@@ -0,0 +1,207 @@
+# state_store.py
+"""
+Shared mutable state for RoverSeer.
+Conversation histories, pipeline stages, the model list and the like live
+behind a small key/value interface instead of module globals, so several
+API processes can serve requests against the same state.
+Values must be JSON-serializable; readers always get their own copy.
+
+ROVERSEER_STATE_STORE picks the backend:
+  memory              - a dict in this process (default, single process)
+  sqlite              - SQLite on /dev/shm when available (shared memory), else ~/roverseer_api_logs
+  sqlite:/path/to.db  - SQLite at an explicit path
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from pathlib import Path
+
+STATE_STORE_SPEC = os.environ.get("ROVERSEER_STATE_STORE", "memory")
+SHM_DIR = Path("/dev/shm")
+STATE_DB_NAME = "roverseer_state.db"
+SQLITE_BUSY_TIMEOUT = 5.0  # Seconds to wait for another process's write transaction
+
+
+def default_sqlite_path():
+    """A RAM-backed file when /dev/shm exists, so every process maps the same pages"""
+    if SHM_DIR.is_dir() and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR / STATE_DB_NAME
+    return Path.home() / "roverseer_api_logs" / STATE_DB_NAME
+
+
+class StateStore:
+    """
+    Key/value store interface.
+    update(key, fn, default) is the only read-modify-write primitive: fn gets a
+    copy of the current value (or default) and returns the new one, atomically
+    with respect to every other process sharing the store.
+    """
+
+    backend = "base"
+
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def update(self, key, fn, default=None):
+        raise NotImplementedError
+
+    def stats(self):
+        return {"backend": self.backend}
+
+
+class InProcessStateStore(StateStore):
+    """Dict-backed store for a single process; values are copied like the SQLite backend"""
+
+    backend = "memory"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}  # key -> JSON text
+
+    def get(self, key, default=None):
+        with self.lock:
+            raw = self.values.get(key)
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key, value):
+        raw = json.dumps(value)
+        with self.lock:
+            self.values[key] = raw
+
+    def delete(self, key):
+        with self.lock:
+            self.values.pop(key, None)
+
+    def update(self, key, fn, default=None):
+        with self.lock:
+            raw = self.values.get(key)
+            current = json.loads(raw) if raw is not None else json.loads(json.dumps(default))
+            value = fn(current)
+            self.values[key] = json.dumps(value)
+        return value
+
+    def stats(self):
+        with self.lock:
+            return {"backend": self.backend, "keys": len(self.values)}
+
+
+class SQLiteStateStore(StateStore):
+    """
+    SQLite-backed store shared by every process that opens the same file.
+    WAL mode lets readers proceed during writes; update() runs in a
+    BEGIN IMMEDIATE transaction so read-modify-write is atomic across processes.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path=None):
+        self.path = str(path or default_sqlite_path())
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.local = threading.local()
+        conn = self.connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def connection(self):
+        """One connection per thread, reopened after a fork"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get(self, key, default=None):
+        row = self.connection().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key, value):
+        self.connection().execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    def delete(self, key):
+        self.connection().execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def update(self, key, fn, default=None):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+            current = json.loads(row[0]) if row is not None else json.loads(json.dumps(default))
+            value = fn(current)
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def stats(self):
+        keys = self.connection().execute("SELECT COUNT(*) FROM state").fetchone()[0]
+        return {"backend": self.backend, "path": self.path, "keys": keys}
+
+
+class StoredDict(MutableMapping):
+    """
+    A dict kept under one store key, for state that used to be a module-level dict.
+    Every access goes to the store, so all processes see the same contents.
+    """
+
+    def __init__(self, store, key, initial=None):
+        self.store = store
+        self.key = key
+        if initial:
+            # Another process may already have filled in real values
+            self.store.update(key, lambda current: {**initial, **current}, {})
+
+    def snapshot(self):
+        return self.store.get(self.key, {})
+
+    def __getitem__(self, name):
+        return self.snapshot()[name]
+
+    def __setitem__(self, name, value):
+        def assign(current):
+            current[name] = value
+            return current
+        self.store.update(self.key, assign, {})
+
+    def __delitem__(self, name):
+        def remove(current):
+            del current[name]
+            return current
+        self.store.update(self.key, remove, {})
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def __len__(self):
+        return len(self.snapshot())
+
+    def values(self):
+        return list(self.snapshot().values())
+
+    def set_all(self, value):
+        """Set every entry to value in one write"""
+        self.store.update(self.key, lambda current: {name: value for name in current}, {})
+
+
+def create_state_store(spec=STATE_STORE_SPEC):
+    """Build the store named by ROVERSEER_STATE_STORE ("memory", "sqlite" or "sqlite:<path>")"""
+    backend, _, path = spec.partition(":")
+    if backend == "sqlite":
+        return SQLiteStateStore(path or None)
+    if backend != "memory":
+        print(f"Unknown state store '{spec}', keeping state in this process")
+    return InProcessStateStore()
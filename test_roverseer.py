@@ -5,6 +5,11 @@ Test script for RoverSeer API with Rainbow Driver integration
 import requests
 import json
 import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ollama_client import OllamaBackendPool
 
 BASE_URL = "http://localhost:5000"
 
@@ -42,6 +47,43 @@ def test_tts():
     else:
         print(f"Error: {response.status_code} - {response.text}")
 
+def test_streaming_chat():
+    """Test the OpenAI-compatible endpoint with stream: true (Server-Sent Events)"""
+    print("\nTesting streaming chat completions...")
+    
+    payload = {
+        "model": "tinydolphin:1.1b",
+        "messages": [
+            {"role": "user", "content": "Count from one to five."}
+        ],
+        "stream": True
+    }
+    
+    start = time.time()
+    first_token_time = None
+    reply = ""
+    response = requests.post(f"{BASE_URL}/v1/chat/completions", json=payload, stream=True)
+    if not response.ok:
+        print(f"Error: {response.status_code} - {response.text}")
+        return
+    
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data: "):
+            continue
+        data = line[len("data: "):]
+        if data == "[DONE]":
+            break
+        chunk = json.loads(data)
+        content = chunk["choices"][0]["delta"].get("content", "")
+        if content and first_token_time is None:
+            first_token_time = time.time() - start
+        reply += content
+    
+    total_time = time.time() - start
+    print(f"Success! Response: {reply}")
+    if first_token_time is not None:
+        print(f"Time to first token: {first_token_time:.2f}s, total: {total_time:.2f}s")
+
 def test_sensor_status():
     """Test the home page to check sensor data"""
     print("\nChecking sensor data on home page...")
@@ -53,6 +95,91 @@ def test_sensor_status():
     else:
         print(f"Error: {response.status_code}")
 
+def start_fake_ollama(name, models, drop_chat=False):
+    """
+    Stand-in Ollama host: canned /api/tags, and /api/chat replies naming the host
+    (or, with drop_chat, the connection closed after the request arrives)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, data):
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.send_json({"models": [{"name": model, "size": 1000} for model in models]})
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if drop_chat:
+                self.close_connection = True
+                return
+            self.send_json({"model": payload["model"], "message": {"role": "assistant", "content": name}, "done": True})
+
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def unused_port_url():
+    """A URL nothing listens on, for a backend that is down"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+def test_backend_pool():
+    """Test OllamaBackendPool routing, failover and merged model list against stand-in hosts"""
+    print("\nTesting Ollama backend pool...")
+    
+    server_a, url_a = start_fake_ollama("a", ["tinydolphin:1.1b", "llama3.2:1b"])
+    server_b, url_b = start_fake_ollama("b", ["tinydolphin:1.1b", "qwen2.5:0.5b"])
+    server_c, url_c = start_fake_ollama("c", ["mistral:7b"], drop_chat=True)
+    down_url = unused_port_url()
+    pool = OllamaBackendPool([down_url, url_a, url_b, url_c], health_interval=3600)
+    try:
+        pool.check_health()
+        health = {backend["base_url"]: backend["healthy"] for backend in pool.stats()["backends"]}
+        assert health == {down_url: False, url_a: True, url_b: True, url_c: True}, health
+        
+        # Each model goes to a host that has it
+        def chat(model):
+            response = pool.post("/api/chat", json={"model": model, "messages": [], "stream": False})
+            return response.json()["message"]["content"]
+        assert chat("qwen2.5:0.5b") == "b"
+        assert chat("llama3.2:1b") == "a"
+        # Loading/unloading goes to the host the model's requests went to
+        assert pool.client_for("qwen2.5:0.5b").base_url == url_b
+        
+        # Merged list, one entry per model name
+        names = sorted(tag["name"] for tag in pool.list_models())
+        assert names == ["llama3.2:1b", "mistral:7b", "qwen2.5:0.5b", "tinydolphin:1.1b"], names
+        
+        # A host that refuses the connection is skipped and marked down
+        pool.backends[0].healthy = True
+        assert chat("unknown:model") in ("a", "b")
+        assert not pool.backends[0].healthy
+        
+        # A host that drops the connection after getting the request may have run it,
+        # so the error is raised instead of sending the request again elsewhere
+        try:
+            chat("mistral:7b")
+            raise AssertionError("dropped connection was retried on another host")
+        except requests.ConnectionError:
+            pass
+        assert pool.backends[3].healthy
+        assert all(backend.outstanding == 0 for backend in pool.backends)
+        print("Success! Routing, failover and model listing work")
+    finally:
+        pool.stop()
+        server_a.shutdown()
+        server_b.shutdown()
+        server_c.shutdown()
+
 if __name__ == "__main__":
     print("RoverSeer API Test Suite")
     print("========================")
@@ -61,9 +188,11 @@ if __name__ == "__main__":
     time.sleep(1)
     
     try:
+        test_backend_pool()
         test_chat()
         time.sleep(2)  # Wait between tests
         test_tts()
+        test_streaming_chat()
         test_sensor_status()
     except Exception as e:
         print(f"Test failed with error: {e}")